@@ -1,19 +1,27 @@
 import json
 import os
+import re
 import glob
 import pandas as pd
+import underthesea
 from underthesea import ner
-from rapidfuzz import process, fuzz
 from tqdm import tqdm
 from collections import Counter
 from multiprocessing import Pool, cpu_count
+from article_store import read_records, list_tickers
+from ticker_resolver import TickerResolver
+from ner_cache import NerCache
 import warnings
 warnings.filterwarnings('ignore')
 
 # --- CẤU HÌNH ---
 INPUT_DIR = "data/interim"      
+INPUT_STORE = "data/interim/articles"  # Parquet store (ticker/month) do preprocessing.ipynb ghi
 OUTPUT_DIR = "data/NER_processed"     
 MAP_FILE = "data/ticker_map.json" 
+FUZZY_MEMO_FILE = "data/NER_processed/fuzzy_memo.json"  # entity -> kết quả fuzzy, dùng lại giữa các lần chạy
+NER_CACHE_FILE = "data/NER_processed/ner_cache.db"  # span NER theo hash(title + content); None = tắt cache
+NER_CHUNKING = True  # NER từng câu có ứng viên (nhanh hơn nhiều); False = NER cả bài một lần như cũ
 NUM_WORKERS = max(1, cpu_count() - 1)  # Số CPU cores - 1
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -32,65 +40,207 @@ TICKER_MAP = load_ticker_map()
 print(f"Loaded {len(TICKER_MAP)} mappings from ticker_map.json")
 
 # 2. Hàm trích xuất entities từ text (dùng NER)
-def extract_companies(text):
+NER_TAGS = {'B-ORG', 'I-ORG', 'B-LOC', 'I-LOC', 'B-PER', 'I-PER'}  # ORG, LOC, PER (có thể là tên công ty)
+# Đổi cách gom span (NER_TAGS, cách nối từ) thì tăng "spans-N", đổi cách tách / lọc câu thì tăng "sentences-N",
+# để cache cũ tự mất hiệu lực
+NER_VERSION = f"underthesea {getattr(underthesea, '__version__', '?')}/spans-1" + ("/sentences-1" if NER_CHUNKING else "")
+
+# Blacklist: Từ quá chung chung, không phải tên công ty
+BLACKLIST = {
+    'việt nam', 'hà nội', 'hồ chí minh', 'tp.hcm', 'sài gòn',
+    'hoàn', 'phí', 'link', 'ngóng', 'ott', 'casa', 'việc',
+    'big', 'top', 'vn-index', 'vnindex', 'hnx', 'upcom'
+}
+
+NOISE_KEYWORDS = ['ngày', 'tháng', 'năm', 'quý', 'mức', 'tỷ lệ', 'cuối', 'đầu', 'nửa', 'cột mốc']
+
+def is_valid_entity(text):
+    """Kiểm tra xem entity có hợp lệ không"""
+    if len(text) < 3:
+        return False
+    text_lower = text.lower()
+    # Loại noise keywords
+    if any(kw in text_lower for kw in NOISE_KEYWORDS):
+        return False
+    # Loại toàn số
+    if text.replace(' ', '').replace('/', '').replace('-', '').replace('.', '').replace(',', '').isdigit():
+        return False
+    # Loại blacklist
+    if text_lower.strip() in BLACKLIST:
+        return False
+    return True
+
+def ner_spans(text, skip=0):
+    """Chạy NER (bước đắt), trả về mọi span ORG/LOC/PER thô, chưa lọc - đây là thứ được cache.
+    skip: bỏ qua bao nhiêu token đầu (phần ngữ cảnh ghép thêm ở sentence_spans)"""
     if not text: 
         return []
     
     try:
-        tokens = ner(text)
+        tokens = ner(text)[skip:]
     except:
         return []
 
-    entities = []
+    spans = []
     current_entity = []
-    
-    # Blacklist: Từ quá chung chung, không phải tên công ty
-    blacklist = {
-        'việt nam', 'hà nội', 'hồ chí minh', 'tp.hcm', 'sài gòn',
-        'hoàn', 'phí', 'link', 'ngóng', 'ott', 'casa', 'việc',
-        'big', 'top', 'vn-index', 'vnindex', 'hnx', 'upcom'
-    }
-    
-    noise_keywords = ['ngày', 'tháng', 'năm', 'quý', 'mức', 'tỷ lệ', 'cuối', 'đầu', 'nửa', 'cột mốc']
-    
-    def is_valid_entity(text):
-        """Kiểm tra xem entity có hợp lệ không"""
-        if len(text) < 3:
-            return False
-        text_lower = text.lower()
-        # Loại noise keywords
-        if any(kw in text_lower for kw in noise_keywords):
-            return False
-        # Loại toàn số
-        if text.replace(' ', '').replace('/', '').replace('-', '').replace('.', '').replace(',', '').isdigit():
-            return False
-        # Loại blacklist
-        if text_lower.strip() in blacklist:
-            return False
-        return True
-    
     for token in tokens:
         word, pos_tag, chunk_tag, ner_tag = token
         
-        # Chỉ chấp nhận ORG, LOC, PER (có thể là tên công ty)
-        if ner_tag in ['B-ORG', 'I-ORG', 'B-LOC', 'I-LOC', 'B-PER', 'I-PER']:
+        if ner_tag in NER_TAGS:
             current_entity.append(word)
         else:
             if current_entity:
-                entity_text = " ".join(current_entity)
-                if is_valid_entity(entity_text):
-                    entities.append(entity_text)
+                spans.append(" ".join(current_entity))
                 current_entity = []
     
     # Xử lý entity cuối cùng nếu còn sót
     if current_entity:
-        entity_text = " ".join(current_entity)
-        if is_valid_entity(entity_text):
-            entities.append(entity_text)
+        spans.append(" ".join(current_entity))
     
-    return entities
+    return spans
+
+# Tách câu sau . ! ? … và ở mỗi xuống dòng; không tách sau viết tắt kiểu "TP. HCM", "TS. Nguyễn"
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?…])\s+|\s*\n\s*')
+ABBREVIATIONS = {'tp.', 'tx.', 'q.', 'p.', 'ts.', 'ths.', 'gs.', 'pgs.', 'bs.', 'ks.', 'th.', 'st.'}
+SENTENCE_CONTEXT = "x. "
+SENTENCE_CONTEXT_TOKENS = 2  # "x", "."
+EDGE_PUNCT = '"“”\'‘’()[]-–,.:;!?…'
+
+def split_sentences(text):
+    sentences = []
+    for piece in SENTENCE_SPLIT.split(text):
+        if not piece.strip():
+            continue
+        if sentences and sentences[-1].split()[-1].lower() in ABBREVIATIONS:
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
 
-# 3. Hàm Map entities sang Tickers dùng Fuzzy Matching
+def is_candidate_sentence(sentence):
+    """Lọc rẻ trước NER: tên riêng tiếng Việt viết hoa, nên câu không có chữ hoa nào ngoài từ đầu câu
+    (và không có từ viết tắt kiểu FPT, HĐQT) gần như không bao giờ có entity"""
+    words = [w.strip(EDGE_PUNCT) for w in sentence.split()]
+    words = [w for w in words if w]
+    if not words:
+        return False
+    if any(w[0].isupper() for w in words[1:]):
+        return True
+    first = words[0]
+    # Từ đầu câu luôn viết hoa: chỉ tính khi là từ viết tắt hoặc tên đã biết (Vinamilk, Techcombank, ...)
+    return (len(first) >= 2 and first.isupper()) or first.lower() in KNOWN_FIRST_WORDS
+
+def candidate_sentences(text):
+    return [s for s in split_sentences(text) if is_candidate_sentence(s)]
+
+def sentence_spans(sentence):
+    # Trong cả bài, từ đầu câu luôn đứng sau dấu chấm của câu trước; thiếu ngữ cảnh đó CRF hay bỏ sót
+    # tên ở đầu câu ("Chứng Khoán Sài Gòn cho biết..."), nên ghép lại một câu giả rồi bỏ token của nó
+    return ner_spans(SENTENCE_CONTEXT + sentence, skip=SENTENCE_CONTEXT_TOKENS)
+
+def chunked_spans(text):
+    """Như ner_spans, nhưng NER từng câu ứng viên - thời gian NER tăng nhanh hơn tuyến tính theo độ dài"""
+    return [span for sentence in candidate_sentences(text) for span in sentence_spans(sentence)]
+
+def filter_entities(spans):
+    return [span for span in spans if is_valid_entity(span)]
+
+def extract_companies(text):
+    return filter_entities(chunked_spans(text) if NER_CHUNKING else ner_spans(text))
+
+# 3. Aliases cho các ngân hàng/công ty lớn (tên viết tắt -> ticker) và resolver dựng sẵn
+ALIASES = {
+    # Ngân hàng Big 4
+    'bidv': 'BID',
+    'vietinbank': 'CTG',
+    'vietcombank': 'VCB',
+    'vcb': 'VCB',
+    'agribank': 'None',  # Không niêm yết
+
+    # Ngân hàng tư nhân lớn
+    'techcombank': 'TCB',
+    'mbbank': 'MBB',
+    'mb': 'MBB',
+    'vpbank': 'VPB',
+    'acb': 'ACB',
+    'á châu': 'ACB',
+    'sacombank': 'STB',
+    'sài gòn thương tín': 'STB',
+    'stb': 'STB',
+    'vib': 'VIB',
+    'quốc tế': 'VIB',
+    'tpbank': 'TPB',
+    'tiên phong': 'TPB',
+    'hdbank': 'HDB',
+    'phát triển tp.hcm': 'HDB',
+    'msb': 'MSB',
+    'hàng hải': 'MSB',
+    'lpb': 'LPB',
+    'bưu điện liên việt': 'LPB',
+    'liên việt': 'LPB',
+    'seabank': 'SSB',
+    'đông nam á': 'SSB',
+    'ssb': 'SSB',
+    'shb': 'SHB',
+    'sài gòn - hà nội': 'SHB',
+    'eximbank': 'EIB',
+    'xuất nhập khẩu': 'EIB',
+    'eib': 'EIB',
+    'ocb': 'OCB',
+    'phương đông': 'OCB',
+    'vietcapitalbank': 'BVB',
+    'bản việt': 'BVB',
+    'bvb': 'BVB',
+    'vietbank': 'VBB',
+    'việt nam thương tín': 'VBB',
+    'vbb': 'VBB',
+    'abbank': 'ABB',
+    'an bình': 'ABB',
+    'ncb': 'NVB',
+    'quốc dân': 'NVB',
+    'navibank': 'NVB',
+    'pvcombank': 'PVB',
+    'đại chúng': 'PVB',
+    'pgbank': 'PGB',
+    'xăng dầu petrolimex': 'PGB',
+    'kienlongbank': 'KLB',
+    'kiên long': 'KLB',
+    'klb': 'KLB',
+    'baovietbank': 'BVB',
+    'bảo việt': 'BVB',
+    'vietabank': 'VAB',
+    'việt á': 'VAB',
+    'oceanbank': 'None',  # Đã sáp nhập vào VPBank
+    'gpbank': 'GPB',
+    'dầu khí toàn cầu': 'GPB',
+
+    # Công ty chứng khoán
+    'ssi': 'SSI',
+    'chứng khoán sài gòn': 'SSI',
+    'vci': 'VCI',
+    'vietcap': 'VCI',
+    'vcbs': 'None',  # Chứng khoán Vietcombank, không niêm yết
+    'bsc': 'BVS',
+    'bidv securities': 'BVS',
+    'hsc': 'HCM',
+    'thành phố hồ chí minh': 'HCM',
+    'vps': 'VPS',
+    'vndirect': 'VND',
+    'vds': 'VDS',
+    'fpts': 'FTS',
+    'fpt securities': 'FTS',
+    'bsi': 'BSI',
+    'agriseco': 'AGR',
+}
+
+# Dựng index một lần cho mỗi process (worker của Pool kế thừa hoặc tự import lại)
+RESOLVER = TickerResolver(TICKER_MAP, ALIASES)
+# Tên một từ đứng đầu câu mà lọc chữ hoa bỏ sót: từ đầu tiên của alias / tên công ty / mã ticker
+KNOWN_FIRST_WORDS = {name.split()[0].lower() for name in list(TICKER_MAP) + list(ALIASES) if name.split()}
+KNOWN_FIRST_WORDS |= {t.lower() for t in RESOLVER.tickers if t}
+NER_CACHE = None  # mở trong __main__, chỉ process chính đọc/ghi
+
+# 4. Hàm Map entities sang Tickers dùng Fuzzy Matching
 def map_to_tickers(entities, target_ticker, threshold=90, debug=False):
     """
     Map các entities đã trích xuất sang ticker symbols
@@ -105,189 +255,62 @@ def map_to_tickers(entities, target_ticker, threshold=90, debug=False):
     """
     found_tickers = set()
     
-    # Aliases cho các ngân hàng/công ty lớn (tên viết tắt -> ticker)
-    aliases = {
-        # Ngân hàng Big 4
-        'bidv': 'BID',
-        'vietinbank': 'CTG',
-        'vietcombank': 'VCB',
-        'vcb': 'VCB',
-        'agribank': 'None',  # Không niêm yết
-        
-        # Ngân hàng tư nhân lớn
-        'techcombank': 'TCB',
-        'mbbank': 'MBB',
-        'mb': 'MBB',
-        'vpbank': 'VPB',
-        'acb': 'ACB',
-        'á châu': 'ACB',
-        'sacombank': 'STB',
-        'sài gòn thương tín': 'STB',
-        'stb': 'STB',
-        'vib': 'VIB',
-        'quốc tế': 'VIB',
-        'tpbank': 'TPB',
-        'tiên phong': 'TPB',
-        'hdbank': 'HDB',
-        'phát triển tp.hcm': 'HDB',
-        'msb': 'MSB',
-        'hàng hải': 'MSB',
-        'lpb': 'LPB',
-        'bưu điện liên việt': 'LPB',
-        'liên việt': 'LPB',
-        'seabank': 'SSB',
-        'đông nam á': 'SSB',
-        'ssb': 'SSB',
-        'shb': 'SHB',
-        'sài gòn - hà nội': 'SHB',
-        'eximbank': 'EIB',
-        'xuất nhập khẩu': 'EIB',
-        'eib': 'EIB',
-        'ocb': 'OCB',
-        'phương đông': 'OCB',
-        'vietcapitalbank': 'BVB',
-        'bản việt': 'BVB',
-        'bvb': 'BVB',
-        'vietbank': 'VBB',
-        'việt nam thương tín': 'VBB',
-        'vbb': 'VBB',
-        'abbank': 'ABB',
-        'an bình': 'ABB',
-        'ncb': 'NVB',
-        'quốc dân': 'NVB',
-        'navibank': 'NVB',
-        'pvcombank': 'PVB',
-        'đại chúng': 'PVB',
-        'pgbank': 'PGB',
-        'xăng dầu petrolimex': 'PGB',
-        'kienlongbank': 'KLB',
-        'kiên long': 'KLB',
-        'klb': 'KLB',
-        'baovietbank': 'BVB',
-        'bảo việt': 'BVB',
-        'vietabank': 'VAB',
-        'việt á': 'VAB',
-        'oceanbank': 'None',  # Đã sáp nhập vào VPBank
-        'gpbank': 'GPB',
-        'dầu khí toàn cầu': 'GPB',
-        
-        # Công ty chứng khoán
-        'ssi': 'SSI',
-        'chứng khoán sài gòn': 'SSI',
-        'vci': 'VCI',
-        'vietcap': 'VCI',
-        'vcbs': 'None',  # Chứng khoán Vietcombank, không niêm yết
-        'bsc': 'BVS',
-        'bidv securities': 'BVS',
-        'hsc': 'HCM',
-        'thành phố hồ chí minh': 'HCM',
-        'vps': 'VPS',
-        'vndirect': 'VND',
-        'vds': 'VDS',
-        'fpts': 'FTS',
-        'fpt securities': 'FTS',
-        'bsi': 'BSI',
-        'agriseco': 'AGR',
-    }
-    
-    # Lấy danh sách tên công ty từ map
-    company_names = list(TICKER_MAP.keys())
-    all_tickers = set(TICKER_MAP.values())
-    
+    # Alias -> exact -> substring -> fuzzy/ticker, xem ticker_resolver.py
     for entity in entities:
-        entity_lower = entity.lower().strip()
-        
-        # Cách 0: Kiểm tra aliases trước
-        if entity_lower in aliases:
-            ticker = aliases[entity_lower]
-            # Bỏ qua nếu ticker là None hoặc 'None' (không niêm yết)
-            if ticker and ticker != 'None' and ticker != target_ticker:
-                found_tickers.add(ticker)
-                if debug:
-                    print(f"    '{entity}' -> ALIAS {ticker}")
-            continue
-        
-        # Cách 1: Exact match
-        matched = False
-        for comp_name, ticker in TICKER_MAP.items():
-            if entity_lower == comp_name.lower():
-                if ticker != target_ticker:
-                    found_tickers.add(ticker)
-                    if debug:
-                        print(f"    '{entity}' -> '{comp_name}' (EXACT) -> {ticker}")
-                matched = True
-                break
-        
-        if matched:
-            continue
-            
-        # Cách 2: Substring match (chỉ với tên dài)
-        if len(entity) >= 10:
-            for comp_name, ticker in TICKER_MAP.items():
-                if len(comp_name) >= 15:
-                    if comp_name.lower() in entity_lower or entity_lower in comp_name.lower():
-                        if ticker != target_ticker:
-                            found_tickers.add(ticker)
-                            if debug:
-                                print(f"    '{entity}' -> '{comp_name}' (SUBSTRING) -> {ticker}")
-                            matched = True
-                            break
-        
-        if matched:
-            continue
-        
-        # Cách 3: Fuzzy matching
-        match = process.extractOne(entity, company_names, scorer=fuzz.token_sort_ratio)
-        
-        if match:
-            best_match_name, score, _ = match
-            if debug and score >= 70:
-                print(f"    '{entity}' -> '{best_match_name}' (fuzzy: {score:.1f})")
-            if score >= threshold:
-                ticker = TICKER_MAP[best_match_name]
-                if ticker != target_ticker:
-                    found_tickers.add(ticker)
-        
-        # Cách 4: Kiểm tra ticker trực tiếp
-        if entity.upper() in all_tickers:
-            ticker = entity.upper()
+        for ticker in RESOLVER.resolve(entity, threshold=threshold, debug=debug):
             if ticker != target_ticker:
                 found_tickers.add(ticker)
-                if debug:
-                    print(f"    '{entity}' -> TICKER {ticker}")
                     
     return list(found_tickers)
 
-# 4. Hàm xử lý một bài báo (worker function cho multiprocessing)
-def process_single_article(args):
-    """Xử lý một bài báo - chạy song song"""
-    article, ticker_target = args
-    
-    full_text = f"{article.get('title', '')}. {article.get('content', '')}"
-    
-    # Trích xuất entities
-    extracted_entities = extract_companies(full_text)
-    
-    # Map sang tickers
-    related_tickers = map_to_tickers(extracted_entities, ticker_target, debug=False)
-    
-    # Lọc bỏ 'None'
+# 5. NER chạy song song trong Pool (run_ner), map ticker làm theo lô ở process chính (tag_article)
+def article_text(article):
+    return f"{article.get('title', '')}. {article.get('content', '')}"
+
+def tag_article(article, entities, ticker_target):
+    """Map entities sang tickers, lọc bỏ 'None' và gắn vào bài báo"""
+    related_tickers = map_to_tickers(entities, ticker_target, debug=False)
     related_tickers = [t for t in related_tickers if t and t != 'None']
-    
     article['related_tickers'] = ",".join(related_tickers)
     return article, related_tickers
 
-# 5. Hàm xử lý file
+def run_ner(texts, label):
+    """{key: text} -> {key: spans}. Chế độ câu: gom câu ứng viên của mọi bài thành một lô,
+    mỗi câu khác nhau chỉ NER một lần (câu lặp lại như tên nguồn, disclaimer chạy một lần)"""
+    with Pool(processes=NUM_WORKERS) as pool:
+        if not NER_CHUNKING:
+            return dict(zip(texts, tqdm(
+                pool.imap(ner_spans, texts.values(), chunksize=20),
+                total=len(texts),
+                desc=f"Processing {label}",
+                unit="article"
+            )))
+        sentences = {key: candidate_sentences(text) for key, text in texts.items()}
+        unique = list(dict.fromkeys(s for ss in sentences.values() for s in ss))
+        spans = dict(zip(unique, tqdm(
+            pool.imap(sentence_spans, unique, chunksize=64),
+            total=len(unique),
+            desc=f"Processing {label}",
+            unit="sentence"
+        )))
+    return {key: [span for s in ss for span in spans[s]] for key, ss in sentences.items()}
+
+# 6. Hàm đọc input: mã ticker trong INPUT_STORE, hoặc file *_clean.json kiểu cũ
+def load_input(item):
+    if item.endswith(".json"):
+        # File input dạng: VIC_clean.json -> lấy VIC
+        with open(item, 'r', encoding='utf-8') as f:
+            return os.path.basename(item).split('_')[0], json.load(f)
+    return item, read_records(INPUT_STORE, tickers=[item])
+
+# 7. Hàm xử lý file
 def process_file(filepath):
-    filename = os.path.basename(filepath)
-    # File input dạng: VIC_clean.json -> lấy VIC
-    ticker_target = filename.split('_')[0]
+    ticker_target = os.path.basename(filepath).split('_')[0]
     
     print(f"\n🚀 Processing: {ticker_target}")
     
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            articles = json.load(f)
+        ticker_target, articles = load_input(filepath)
     except Exception as e:
         print(f"  ❌ Lỗi đọc file: {e}")
         return
@@ -302,20 +325,29 @@ def process_file(filepath):
     final_data = []
     related_counter = Counter()
     
-    # Chuẩn bị args cho multiprocessing
-    args_list = [(article, ticker_target) for article in articles]
+    # Chỉ chạy NER cho các bài chưa có trong cache (bài trùng nội dung chỉ chạy một lần)
+    texts = [article_text(article) for article in articles]
+    keys = [NER_CACHE.key(text) for text in texts] if NER_CACHE else list(range(len(texts)))
+    spans_by_key = NER_CACHE.get_many(keys) if NER_CACHE else {}
+    todo = {key: text for key, text in zip(keys, texts) if key not in spans_by_key}
+    print(f"  🗃️ NER cache: {len(set(keys)) - len(todo)} cached, {len(todo)} to run")
     
-    # Xử lý song song với multiprocessing Pool
-    with Pool(processes=NUM_WORKERS) as pool:
-        results = list(tqdm(
-            pool.imap(process_single_article, args_list, chunksize=20),
-            total=len(articles),
-            desc=f"Processing {ticker_target}",
-            unit="article"
-        ))
+    # NER song song với multiprocessing Pool
+    if todo:
+        computed = run_ner(todo, ticker_target)
+        if NER_CACHE: NER_CACHE.put_many(computed)
+        spans_by_key.update(computed)
+    
+    # Blacklist / noise lọc lại mỗi lần chạy, nên sửa chúng không cần chạy lại NER
+    entity_lists = [filter_entities(spans_by_key[key]) for key in keys]
+    
+    # Fuzzy cho mọi entity khác nhau của cả file trong một lần cdist, rồi map từng bài từ memo
+    pending = RESOLVER.prefetch(e for entities in entity_lists for e in entities)
+    print(f"  🔎 Fuzzy-matched {pending} new entities in batch")
     
     # Thu thập kết quả
-    for article, related_tickers in results:
+    for article, entities in zip(articles, entity_lists):
+        article, related_tickers = tag_article(article, entities, ticker_target)
         final_data.append(article)
         related_counter.update(related_tickers)
     
@@ -351,10 +383,12 @@ if __name__ == "__main__":
     print(f"Loaded {len(TICKER_MAP)} mappings from ticker_map.json")
     print(f"🚀 Using {NUM_WORKERS} CPU workers for parallel processing\n")
     
-    files = glob.glob(os.path.join(INPUT_DIR, "*_clean.json"))
+    files = list_tickers(INPUT_STORE) or glob.glob(os.path.join(INPUT_DIR, "*_clean.json"))
+    if NER_CACHE_FILE: NER_CACHE = NerCache(NER_CACHE_FILE, NER_VERSION)
+    print(f"🧠 Fuzzy memo: {RESOLVER.load_memo(FUZZY_MEMO_FILE)} entities from {FUZZY_MEMO_FILE}")
     
     if not files:
-        print(f"⚠️ Không tìm thấy file dữ liệu nào trong {INPUT_DIR}.")
+        print(f"⚠️ Không tìm thấy file dữ liệu nào trong {INPUT_STORE} / {INPUT_DIR}.")
     else:
         print(f"📁 Found {len(files)} files to process.\n")
         for f in files:
@@ -363,4 +397,9 @@ if __name__ == "__main__":
             except Exception as e:
                 print(f"❌ Lỗi xử lý file {f}: {e}")
                 import traceback
-                traceback.print_exc()
\ No newline at end of file
+                traceback.print_exc()
+            RESOLVER.save_memo(FUZZY_MEMO_FILE)
+        RESOLVER.report()
+        if NER_CACHE:
+            NER_CACHE.report()
+            NER_CACHE.close()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = {"fbclid", "gclid", "zarsrc", "gidzl", "utm_source", "utm_medium", "utm_campaign", "utm_content", "utm_term"}
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."): host = host[4:]
+    if parts.port and parts.port not in (80, 443): host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k.lower() not in TRACKING_PARAMS))
+    return urlunsplit(("https", host, path, query, ""))
+
+class ArticleMemo:
+    """Fetch-and-parse memo shared by every spider of a PipelineManager run, keyed by normalized URL.
+
+    The first spider to claim a URL fetches it; later claims (another keyword, source or ticker)
+    only tag the stored record, or get a copy of it when the ticker has no record yet.
+
+    Only the max_bodies most recently used article bodies stay in memory (the records themselves
+    are streamed to disk); a copy whose body was evicted fetches the article again.
+    """
+
+    def __init__(self, max_bodies=2000):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.bodies = OrderedDict()
+        self.max_bodies = max_bodies
+        self.pending = {}
+        self.fetches = 0
+        self.refetches = 0
+        self.hits = 0
+
+    def claim(self, url, spider, keyword, retry=None):
+        """True: the caller fetches url. retry is what it would need to fetch it later, (job, ctx),
+        used if the claimant ahead of it fails."""
+        key = normalize_url(url)
+        with self.lock:
+            if key in self.pending:
+                self.pending[key].append((spider, keyword, retry))
+                self.hits += 1
+                return False
+            if key not in self.records:
+                self.pending[key] = []
+                self.fetches += 1
+                return True
+            entry = self.records[key]
+            if entry and key not in self.bodies and any(t not in entry["by_ticker"] for t in spider.tickers):
+                # A copy for a new ticker needs the body, which was evicted
+                self.pending[key] = []
+                self.refetches += 1
+                return True
+            self.hits += 1
+        self.attach(key, spider, keyword)
+        return False
+
+    def complete(self, url, item, fetched, spider, keyword):
+        """Returns (spider, keyword, job, ctx) when the fetch failed and a waiting spider should now try it."""
+        key = normalize_url(url)
+        with self.lock:
+            waiters = self.pending.pop(key, [])
+            # A failed fetch is forgotten so a later claim can retry; a filtered article is remembered as None
+            if fetched or item:
+                previous = self.records.get(key)
+                if item:
+                    self.records[key] = {"item": dict({k: v for k, v in item.items() if k != "content"}, source=spider.source_name),
+                                         "by_ticker": previous["by_ticker"] if previous else {}}
+                    self.keep_body(key, item["content"])
+                else:
+                    self.records[key] = None
+            else:
+                # The claim passes to the first waiter that can fetch; the rest keep waiting on it
+                while waiters:
+                    waiting_spider, waiting_keyword, retry = waiters.pop(0)
+                    if retry is not None:
+                        self.pending[key] = waiters
+                        self.fetches += 1
+                        return (waiting_spider, waiting_keyword) + tuple(retry)
+        if not item: return None
+        for waiting_spider, waiting_keyword, _ in [(spider, keyword, None)] + waiters:
+            self.attach(key, waiting_spider, waiting_keyword)
+        return None
+
+    def keep_body(self, key, content):
+        self.bodies[key] = content
+        self.bodies.move_to_end(key)
+        while len(self.bodies) > self.max_bodies: self.bodies.popitem(last=False)
+
+    def attach(self, key, spider, keyword):
+        # Only decides under the lock; add_item/tag_item write to disk, so they run after it is released
+        with self.lock:
+            entry = self.records.get(key)
+            if not entry: return
+            tagged = [entry["by_ticker"][t] for t in spider.tickers if t in entry["by_ticker"]]
+            missing = [t for t in spider.tickers if t not in entry["by_ticker"]] if key in self.bodies else []
+            if missing:
+                item, body = entry["item"], self.bodies[key]
+                self.bodies.move_to_end(key)
+                # Reserved now so a concurrent attach tags instead of adding the ticker twice; only
+                # what tagging needs is kept, the full record is streamed to disk by add_item
+                for ticker in missing:
+                    entry["by_ticker"][ticker] = {"url": item["url"], "keywords": [keyword], "ticker": ticker}
+        for record in tagged:
+            spider.tag_item(record, keyword)
+        if missing:
+            spider.add_item(item["title"], item["url"], item["pub_date"], body, keyword, source=item["source"], tickers=missing)
+
+    def report(self):
+        total = self.fetches + self.hits
+        rate = 100 * self.hits / total if total else 0
+        print(f"Article memo: {self.fetches} fetches, {self.hits} duplicate hits ({rate:.1f}% of article fetches saved), "
+              f"{self.refetches} refetches of evicted bodies")
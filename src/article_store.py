@@ -0,0 +1,134 @@
+"""Parquet article store, hive-partitioned by ticker and publication month.
+
+    data/articles/ticker=FPT/month=2024-06/part-0.parquet
+
+    df = read_articles("data/articles", tickers=["FPT"], columns=["url", "published_date", "title"],
+                       start="2024-01-01", end="2024-06-30")
+
+Only the requested columns are decoded; ticker/month filters prune whole folders and the date
+range is pushed down to Parquet row-group statistics (files are written sorted by date).
+"""
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PARTITIONING = ds.partitioning(pa.schema([("ticker", pa.string()), ("month", pa.string())]), flavor="hive")
+
+def month_of(date):
+    return date[:7] if isinstance(date, str) and len(date) >= 7 else "unknown"
+
+def ticker_dir(store_dir, ticker):
+    return os.path.join(store_dir, f"ticker={ticker}")
+
+def column_schema(columns, samples):
+    """Schema every month file of a ticker shares: samples maps a column to one non-null value of it."""
+    return pa.schema([(c, pa.array([samples.get(c)]).type) for c in columns])
+
+def write_ticker(store_dir, ticker, records, date_column="published_date"):
+    """Replace everything stored for ticker with records (swapped in with renames, never half-written)."""
+    # Older records lack keys newer ones carry, so the columns are the union over every record
+    columns = list(dict.fromkeys(k for r in records for k in r if k not in ("ticker", "month")))
+    samples = {}
+    for r in records:
+        for k in columns:
+            if r.get(k) is not None: samples.setdefault(k, r[k])
+    by_month = {}
+    for r in records:
+        by_month.setdefault(month_of(r.get(date_column)), []).append(r)
+    return write_ticker_months(store_dir, ticker, sorted(by_month.items()), column_schema(columns, samples), date_column)
+
+def write_ticker_months(store_dir, ticker, months, schema, date_column="published_date"):
+    """write_ticker for records that arrive one month at a time: months yields (month, records), so
+    only one month of the ticker is held in memory while the replacement is written."""
+    target = ticker_dir(store_dir, ticker)
+    tmp = os.path.join(store_dir, f".tmp-{ticker}-{time.time_ns()}")
+    os.makedirs(tmp)
+    for month, records in months:
+        if not records: continue
+        records = sorted(records, key=lambda r: r.get(date_column) or "")
+        table = pa.Table.from_pylist([{c: r.get(c) for c in schema.names} for r in records], schema=schema)
+        os.makedirs(os.path.join(tmp, f"month={month}"))
+        pq.write_table(table, os.path.join(tmp, f"month={month}", "part-0.parquet"),
+                       compression="zstd", row_group_size=10000)
+    old = None
+    if os.path.exists(target):
+        old = os.path.join(store_dir, f".old-{ticker}-{time.time_ns()}")
+        os.replace(target, old)
+    os.replace(tmp, target)
+    if old: shutil.rmtree(old)
+    return target
+
+def dataset(store_dir):
+    files = glob.glob(os.path.join(store_dir, "ticker=*", "month=*", "*.parquet"))
+    if not files: return None
+    # Tickers crawled at different times may carry different columns; read them all as one schema
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files] +
+                              [pa.schema([("ticker", pa.string()), ("month", pa.string())])])
+    return ds.dataset(files, schema=schema, format="parquet", partitioning=PARTITIONING, partition_base_dir=store_dir)
+
+def build_filter(tickers=None, start=None, end=None, date_column="published_date"):
+    expr = None
+    def add(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+    if tickers: add(ds.field("ticker").isin(list(tickers)))
+    if start:
+        add(ds.field("month") >= month_of(start))
+        add(ds.field(date_column) >= start)
+    if end:
+        add(ds.field("month") <= month_of(end))
+        add(ds.field(date_column) <= end)
+    return expr
+
+def read_table(store_dir="data/articles", tickers=None, columns=None, start=None, end=None, date_column="published_date"):
+    dset = dataset(store_dir)
+    if dset is None: return pa.table({c: pa.array([], pa.string()) for c in (columns or ["ticker"])})
+    if columns is None: columns = [name for name in dset.schema.names if name != "month"]
+    return dset.to_table(columns=columns, filter=build_filter(tickers, start, end, date_column))
+
+def read_articles(store_dir="data/articles", tickers=None, columns=None, start=None, end=None, date_column="published_date"):
+    """Articles as a pandas DataFrame; start/end are inclusive 'YYYY-MM-DD' bounds on date_column."""
+    return read_table(store_dir, tickers, columns, start, end, date_column).to_pandas()
+
+def read_records(store_dir="data/articles", tickers=None, columns=None, start=None, end=None, date_column="published_date"):
+    """Same as read_articles but as a list of dicts, the shape json.load gave for {ticker}_news.json."""
+    return read_table(store_dir, tickers, columns, start, end, date_column).to_pylist()
+
+def iter_records(store_dir, ticker, batch_size=1000):
+    """A ticker's records one file and batch at a time (a dataset scan reads ahead many batches), so its
+    whole history is never in memory at once. Keys missing from a file are absent, not None."""
+    for path in sorted(glob.glob(os.path.join(ticker_dir(store_dir, ticker), "month=*", "*.parquet"))):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            for record in batch.to_pylist():
+                record["ticker"] = ticker
+                yield record
+
+def list_tickers(store_dir="data/articles"):
+    return sorted(os.path.basename(p).split("=", 1)[1] for p in glob.glob(os.path.join(store_dir, "ticker=*")))
+
+if __name__ == "__main__":
+    # python src/article_store.py import data/output data/articles  -> convert existing {ticker}_news.json files
+    # python src/article_store.py stats data/articles
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "import":
+        source, store = sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "data/articles"
+        for path in sorted(glob.glob(os.path.join(source, "*_news.json"))):
+            ticker = os.path.basename(path).split("_")[0]
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            write_ticker(store, ticker, records)
+            print(f"{ticker}: {len(records)} articles, {os.path.getsize(path) / 1e6:.1f} MB json -> "
+                  f"{sum(os.path.getsize(p) for p in glob.glob(os.path.join(ticker_dir(store, ticker), '*', '*'))) / 1e6:.1f} MB parquet")
+    else:
+        store = sys.argv[2] if len(sys.argv) > 2 else "data/articles"
+        for ticker in list_tickers(store):
+            files = glob.glob(os.path.join(ticker_dir(store, ticker), "*", "*.parquet"))
+            rows = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+            print(f"{ticker}: {rows} articles in {len(files)} files, {sum(map(os.path.getsize, files)) / 1e6:.1f} MB")
@@ -0,0 +1,237 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from fake_useragent import UserAgent
+
+from resilience import RetryPolicy, ProxyPool, RETRYABLE_STATUS, retry_after
+from news_pipeline_multithread import (
+    load_proxies, make_response,
+    VnExpressSpider, ThanhNienSpider, VnEconomySpider,
+    VietnamnetSpider, CafeFSpider, VietstockSpider, FireAntSpider
+)
+
+class AsyncCrawlerEngine:
+    """asyncio counterpart of CrawlerEngine: same request() arguments, awaited instead of called."""
+
+    def __init__(self, use_proxy=False, proxy_file="", concurrency=200, rate_limiter=None, local_mirror="", cache=None,
+                 retry=None, breakers=None, proxy_pool=None, timeout=15, telemetry=None):
+        self.ua = UserAgent()
+        self.use_proxy = use_proxy
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool(load_proxies(proxy_file) if use_proxy else [])
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.retry = retry or RetryPolicy(max_retries=0)
+        self.breakers = breakers
+        self.timeout = timeout
+        self.telemetry = telemetry
+        self.local_mirror = local_mirror.rstrip("/")
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        # One connector caps open sockets; the semaphore caps requests in flight (and so buffered bodies)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def get_proxy(self):
+        return self.proxy_pool.pick() if self.use_proxy else None
+
+    def rewrite_url(self, url):
+        if not self.local_mirror: return url
+        parts = urlsplit(url)
+        rest = parts.path + (f"?{parts.query}" if parts.query else "")
+        return f"{self.local_mirror}/{parts.netloc}{rest}"
+
+    def cached_response(self, entry):
+        return make_response(entry["url"], 200, self.cache.load_body(entry), entry["headers"])
+
+    async def request(self, url, params=None, method="GET", headers=None, data=None, json_data=None, reauth=None):
+        if not headers: headers = {}
+        if 'User-Agent' not in headers: headers['User-Agent'] = self.ua.random
+
+        entry = None
+        if self.cache:
+            key = self.cache.key(url, params, method, data, json_data)
+            entry = self.cache.lookup(key)
+            if self.cache.replay:
+                self.cache.count("hits" if entry else "misses")
+                if self.telemetry: self.telemetry.record_request(url, "cache" if entry else "cache_miss")
+                return self.cached_response(entry) if entry else None
+            if entry and method == "GET": headers.update(self.cache.conditional_headers(entry))
+
+        original_url, url = url, self.rewrite_url(url)
+        breaker = self.breakers.breaker(original_url) if self.breakers else None
+
+        for attempt in self.retry.attempts():
+            if attempt:
+                self.retry.count("retried")
+                if self.telemetry: self.telemetry.record_retry(original_url)
+                await asyncio.sleep(self.retry.delay(attempt - 1))
+            while breaker and (wait := breaker.wait_time()) > 0:
+                await asyncio.sleep(wait)
+            if self.rate_limiter: await self.rate_limiter.acquire_async(original_url)
+
+            proxy = self.get_proxy()
+            async with self.semaphore:
+                start = time.monotonic()
+                try:
+                    async with self.session.request(
+                        method, url, params=params, data=data, json=json_data,
+                        headers=headers, proxy=f"http://{proxy}" if proxy else None
+                    ) as response:
+                        status = response.status
+                        content = await response.read() if status == 200 else b""
+                        res_headers = dict(response.headers)
+                        final_url, encoding = str(response.url), response.get_encoding() if status == 200 else None
+                except Exception:
+                    self.proxy_pool.report_result(proxy, False, time.monotonic() - start)
+                    if breaker: breaker.record("neutral" if proxy else "fail")
+                    if self.telemetry: self.telemetry.record_request(original_url, "error", time.monotonic() - start)
+                    continue
+
+            self.proxy_pool.report_result(proxy, True, time.monotonic() - start)
+            if self.telemetry: self.telemetry.record_request(original_url, status, time.monotonic() - start, len(content))
+            if breaker: breaker.record("fail" if status in RETRYABLE_STATUS else "ok", retry_after(res_headers))
+            if status in RETRYABLE_STATUS: continue
+            if status in (401, 403) and reauth:
+                fresh = await reauth()
+                return await self.request(**fresh) if fresh else None
+            if status == 304 and entry:
+                self.cache.count("revalidated")
+                return self.cached_response(entry)
+            if status != 200: return None
+            if self.cache:
+                self.cache.count("misses")
+                self.cache.store(key, original_url, 200, content, res_headers)
+            return make_response(final_url, status, content, res_headers, encoding)
+
+        self.retry.count("gave_up")
+        return None
+
+class AsyncSpiderMixin:
+    """Drives the BaseSpider hooks with coroutines instead of nested thread pools."""
+
+    async def fetch_auth(self, keyword):
+        res = await self.engine.request(**self.auth_request(keyword))
+        return self.timed("auth", self.parse_auth, res, keyword) if res else None
+
+    async def prepare(self, keyword):
+        if self.auth_request(keyword) is None: return {}
+        fetch = lambda: self.fetch_auth(keyword)
+        return self.with_auth(await self.tokens.get_async(self.source_name, fetch) if self.tokens else await fetch(), keyword)
+
+    def reauth(self, keyword, ctx, rebuild):
+        if "auth" not in ctx: return None
+        async def retry():
+            fetch = lambda: self.fetch_auth(keyword)
+            auth = await self.tokens.refresh_async(self.source_name, ctx["auth"], fetch) if self.tokens else await fetch()
+            fresh = self.with_auth(auth, keyword)
+            if not fresh: return None
+            ctx.update(fresh)
+            return rebuild()
+        return retry
+
+    async def crawl(self, keyword):
+        self.keyword = keyword
+        ctx = await self.prepare(keyword)
+        if ctx is None: return
+        self.page_iter = iter(self.pages())
+        await asyncio.gather(*(self.crawl_pages(keyword, ctx) for _ in range(self.page_window())))
+
+    def page_window(self):
+        return max(1, self.config.get("PAGE_WINDOW", 2))
+
+    async def crawl_pages(self, keyword, ctx):
+        # Each of the PAGE_WINDOW lanes takes the next page until the listing is exhausted;
+        # articles run in the background so a lane never waits on them before paginating
+        articles = []
+        for page in iter(self.next_page, None):
+            articles += await self.crawl_page(keyword, page, ctx)
+        if articles: await asyncio.gather(*articles)
+
+    async def crawl_page(self, keyword, page, ctx):
+        if self.exhausted: return []
+        rebuild = lambda: self.page_request(keyword, page, ctx)
+        res = await self.engine.request(**rebuild(), reauth=self.reauth(keyword, ctx, rebuild))
+        jobs = self.timed("page", self.parse_page, res, keyword, ctx) if res else []
+        self.page_done(res, jobs)
+        return [asyncio.ensure_future(self.process(job, keyword, ctx)) for job in jobs]
+
+    async def process(self, job, keyword, ctx):
+        if self.memo and not self.memo.claim(job["url"], self, keyword, (job, ctx)): return
+        await self.fetch_article(job, keyword, ctx)
+
+    async def fetch_article(self, job, keyword, ctx):
+        rebuild = lambda: self.article_request(job, ctx)
+        res = await self.engine.request(**rebuild(), reauth=self.reauth(keyword, ctx, rebuild))
+        if res and self.parse_pool: handoff = self.complete(job, await self.parse_pool.parse_async(self, job, res), True, keyword)
+        else: handoff = self.finish(job, res, keyword)
+        if handoff:
+            # Awaited here rather than spawned, so the crawl does not finish before the retry
+            spider, keyword, job, ctx = handoff
+            await spider.fetch_article(job, keyword, ctx)
+
+class AsyncVnExpressSpider(AsyncSpiderMixin, VnExpressSpider): pass
+class AsyncThanhNienSpider(AsyncSpiderMixin, ThanhNienSpider): pass
+class AsyncVnEconomySpider(AsyncSpiderMixin, VnEconomySpider): pass
+class AsyncVietnamnetSpider(AsyncSpiderMixin, VietnamnetSpider): pass
+class AsyncCafeFSpider(AsyncSpiderMixin, CafeFSpider): pass
+class AsyncVietstockSpider(AsyncSpiderMixin, VietstockSpider): pass
+class AsyncFireAntSpider(AsyncSpiderMixin, FireAntSpider): pass
+
+ASYNC_SPIDER_CLASSES = [
+    AsyncVnExpressSpider, AsyncThanhNienSpider, AsyncVnEconomySpider,
+    AsyncVietnamnetSpider, AsyncCafeFSpider, AsyncVietstockSpider, AsyncFireAntSpider
+]
+
+async def crawl_plan(engine, config, spider_classes, plan, spider_kwargs=None, budget=None):
+    async def run_spider(SpiderClass, keyword, tickers):
+        spider = SpiderClass(engine, config, tickers=tickers, **(spider_kwargs or {}))
+        try:
+            await spider.crawl(keyword)
+        except asyncio.CancelledError:
+            spider.cut_short()
+            raise
+        except Exception as e:
+            print(f"Error {spider.source_name} - {keyword}: {e}")
+        return spider.crawled_data
+
+    tasks = [asyncio.ensure_future(run_spider(S, k, t)) for k, t in plan for S in spider_classes]
+    if budget:
+        # Everything runs at once here, so the budget is a hard stop: unfinished spiders are cancelled
+        done, pending = await asyncio.wait(tasks, timeout=max(0.0, budget.remaining()))
+        for task in pending: task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"Deadline reached: {len(pending)}/{len(tasks)} spider tasks cancelled")
+        return [record for task in done for record in task.result()]
+    results = []
+    completed = 0
+    for task in asyncio.as_completed(tasks):
+        results.extend(await task)
+        completed += 1
+        if completed % 10 == 0:
+            print(f"Progress: {completed}/{len(tasks)} tasks completed")
+    return results
+
+def run_plan(config, spider_classes, plan, engine_kwargs=None, spider_kwargs=None, budget=None):
+    async def main():
+        kwargs = dict(
+            use_proxy=config.get("USE_PROXY", False),
+            proxy_file=config.get("PROXY_FILE", ""),
+            concurrency=config.get("ASYNC_CONCURRENCY", 200),
+            local_mirror=config.get("LOCAL_MIRROR", ""),
+            timeout=config.get("REQUEST_TIMEOUT", 15)
+        )
+        kwargs.update(engine_kwargs or {})
+        async with AsyncCrawlerEngine(**kwargs) as engine:
+            return await crawl_plan(engine, config, spider_classes, plan, spider_kwargs, budget)
+    return asyncio.run(main())
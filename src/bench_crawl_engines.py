@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import multiprocessing
+import threading
+import time
+
+from aiohttp import web
+
+from news_pipeline_multithread import CrawlerEngine, VnExpressSpider
+from crawl_scheduler import CrawlScheduler, PRIORITY_SEED
+import async_crawler
+
+# Stand-in for timkiem.vnexpress.net + vnexpress.net, served under LOCAL_MIRROR/<host>/...
+LISTING_HTML = """<html><body><div class="width_common list-news-subfolder">{items}</div></body></html>"""
+LISTING_ITEM = """<article class="item-news"><h3 class="title-news"><a href="https://vnexpress.net/{slug}.html">Bai {slug}</a></h3>
+<p class="description"><span class="time">01/06/2024</span></p></article>"""
+ARTICLE_HTML = """<html><body><span class="date">Thứ bảy, 1/6/2024, 08:00 (GMT+7)</span>
+<h1 class="title-detail">Bài viết {slug}</h1><article class="fck_detail">{paragraphs}</article></body></html>"""
+
+def build_app(latency, per_page, results, listing_hits):
+    async def listing(request):
+        await asyncio.sleep(latency)
+        with listing_hits.get_lock():
+            listing_hits.value += 1
+        kw = request.query.get("q", "kw").replace(" ", "-")
+        page = request.query.get("page", "1")
+        first = (int(page) - 1) * per_page
+        items = "".join(LISTING_ITEM.format(slug=f"{kw}-{page}-{i}") for i in range(max(0, min(per_page, results - first))))
+        return web.Response(text=LISTING_HTML.format(items=items), content_type="text/html")
+
+    async def article(request):
+        await asyncio.sleep(latency)
+        slug = request.match_info["slug"]
+        paragraphs = "".join(f"<p>Đoạn {i} của {slug}.</p>" for i in range(20))
+        return web.Response(text=ARTICLE_HTML.format(slug=slug, paragraphs=paragraphs), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/timkiem.vnexpress.net/", listing)
+    app.router.add_get("/vnexpress.net/{slug}.html", article)
+    return app
+
+def serve(port, latency, per_page, results, listing_hits):
+    web.run_app(build_app(latency, per_page, results, listing_hits), host="127.0.0.1", port=port, print=None, backlog=4096)
+
+class ThreadSampler:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+
+    def loop(self):
+        while not self.stop.wait(0.05):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+def bench_thread(config, mirror, keywords, workers):
+    engine = CrawlerEngine(local_mirror=mirror)
+    scheduler = CrawlScheduler(num_workers=workers, report_interval=0)
+
+    with ThreadSampler() as sampler:
+        start = time.time()
+        scheduler.start()
+        spiders = [VnExpressSpider(engine, config, scheduler=scheduler) for _ in keywords]
+        for spider, keyword in zip(spiders, keywords):
+            scheduler.submit(PRIORITY_SEED, spider.crawl, keyword)
+        scheduler.shutdown()
+        elapsed = time.time() - start
+    return sum(len(s.crawled_data) for s in spiders), elapsed, sampler.peak
+
+def bench_async(config, mirror, keywords, concurrency):
+    with ThreadSampler() as sampler:
+        start = time.time()
+        results = async_crawler.run_plan(
+            config, [async_crawler.AsyncVnExpressSpider], [(keyword, ["BENCH"]) for keyword in keywords],
+            engine_kwargs={"local_mirror": mirror, "concurrency": concurrency}
+        )
+        elapsed = time.time() - start
+    return len(results), elapsed, sampler.peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio CrawlerEngine on a local VnExpress stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="server-side delay per response (s)")
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--results", type=int, default=0, help="search results per keyword (default: every page full)")
+    parser.add_argument("--window", type=int, default=2, help="PAGE_WINDOW: listing pages fetched ahead")
+    parser.add_argument("--workers", type=int, default=20, help="scheduler threads for the threaded engine")
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args()
+
+    results = args.results or args.pages * args.per_page
+    listing_hits = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=serve, args=(args.port, args.latency, args.per_page, results, listing_hits), daemon=True)
+    server.start()
+    time.sleep(1.5)
+
+    mirror = f"http://127.0.0.1:{args.port}"
+    config = {"MAX_PAGES": args.pages, "START_YEAR": 2022, "PAGE_WINDOW": args.window}
+    keywords = [f"bench {i}" for i in range(args.keywords)]
+
+    try:
+        print(f"{'engine':<8} {'articles':>9} {'listings':>9} {'seconds':>8} {'req/s':>8} {'peak threads':>13}")
+        for name, fn in [("thread", lambda: bench_thread(config, mirror, keywords, args.workers)),
+                         ("async", lambda: bench_async(config, mirror, keywords, args.concurrency))]:
+            listing_hits.value = 0
+            articles, elapsed, peak = fn()
+            requests_total = articles + listing_hits.value
+            print(f"{name:<8} {articles:>9} {listing_hits.value:>9} {elapsed:>8.2f} {requests_total / elapsed:>8.1f} {peak:>13}")
+    finally:
+        server.terminate()
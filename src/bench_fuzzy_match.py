@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from rapidfuzz import process, fuzz
+
+from ticker_resolver import TickerResolver
+
+MAP_FILE = "data/ticker_map.json"
+NOISE = ("ông bà anh chị đại hội cổ đông quỹ đầu tư ủy ban chứng khoán nhà nước bộ tài chính ngân hàng nhà nước "
+         "tổng cục thống kê sở giao dịch hiệp hội doanh nghiệp thành phố tỉnh miền bắc nam trung khu công nghiệp").split()
+
+def variant(rng, name):
+    # What NER hands back for a company: a partial name, shuffled words, a dropped diacritic-free typo
+    words = name.split()
+    kind = rng.randrange(4)
+    if kind == 0 and len(words) > 2: words = words[rng.randrange(2):len(words) - rng.randrange(2)]
+    elif kind == 1: rng.shuffle(words)
+    elif kind == 2:
+        i = rng.randrange(len(words))
+        if len(words[i]) > 3: words[i] = words[i][:-1]
+    return " ".join(words)
+
+def entity_stream(names, articles, per_article, distinct, seed):
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        if rng.random() < 0.5: pool.append(variant(rng, rng.choice(names)))
+        else: pool.append(" ".join(rng.choice(NOISE).title() for _ in range(rng.randint(2, 4))))
+    # Zipf-like: a few entities recur across thousands of articles, most are rare
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return [rng.choices(pool, weights, k=per_article) for _ in range(articles)]
+
+def before(resolver, names, batches, threshold):
+    # The old per-entity path: extractOne over the raw choices for every entity that reaches the fuzzy rule
+    out = []
+    for batch in batches:
+        for entities in batch:
+            found = set()
+            for entity in entities:
+                hit = resolver.rule_match(entity)
+                if hit is None:
+                    hit = []
+                    best = process.extractOne(entity, names, scorer=fuzz.token_sort_ratio)
+                    if best and best[1] >= threshold: hit.append(resolver.ticker_map[best[0]])
+                    if entity.upper() in resolver.tickers: hit.append(entity.upper())
+                found.update(hit)
+            out.append(found)
+    return out
+
+def after(resolver, batches, threshold):
+    out = []
+    for batch in batches:
+        resolver.prefetch((e for entities in batch for e in entities), threshold)
+        for entities in batch:
+            out.append({t for e in entities for t in resolver.resolve(e, threshold)})
+    return out
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entities/s of fuzzy ticker resolution: per-entity extractOne vs batched cdist + memo")
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--entities", type=int, default=8, help="entities per article")
+    parser.add_argument("--distinct", type=int, default=6000, help="distinct entity strings in the stream")
+    parser.add_argument("--batch", type=int, default=500, help="articles per prefetch batch")
+    parser.add_argument("--threshold", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=403)
+    args = parser.parse_args()
+
+    with open(MAP_FILE, "r", encoding="utf-8") as f:
+        ticker_map = json.load(f)
+    names = list(ticker_map)
+    stream = entity_stream(names, args.articles, args.entities, args.distinct, args.seed)
+    batches = [stream[i:i + args.batch] for i in range(0, len(stream), args.batch)]
+    total = args.articles * args.entities
+    print(f"{total} entities ({len({e for a in stream for e in a})} distinct) over {args.articles} articles, "
+          f"{len(names)} company names, threshold {args.threshold}")
+
+    resolver = TickerResolver(ticker_map)
+    t_before, expected = timed(before, resolver, names, batches, args.threshold)
+    t_cold, got = timed(after, resolver, batches, args.threshold)
+    mismatches = sum(a != b for a, b in zip(expected, got))
+    print(f"  per-entity extractOne : {t_before:7.2f}s  {total / t_before:10.0f} entities/s")
+    print(f"  batched cdist + memo  : {t_cold:7.2f}s  {total / t_cold:10.0f} entities/s  ({t_before / t_cold:.1f}x)")
+
+    # A later run that starts from the memo saved by this one
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fuzzy_memo.json")
+        resolver.save_memo(path)
+        warm = TickerResolver(ticker_map)
+        warm.load_memo(path)
+        t_warm, got_warm = timed(after, warm, batches, args.threshold)
+    mismatches += sum(a != b for a, b in zip(expected, got_warm))
+    print(f"  persisted memo, rerun : {t_warm:7.2f}s  {total / t_warm:10.0f} entities/s  ({t_before / t_warm:.1f}x)")
+    print(f"  articles with different tickers than before: {mismatches}")
+    resolver.report()
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from news_pipeline_multithread import SPIDER_CLASSES, make_response
+from html_parser import available_backends
+from response_cache import ResponseCache
+import site_fixtures
+
+SPIDERS = {cls.source_name: cls for cls in SPIDER_CLASSES}
+
+def classify(url):
+    if "tin-tuc-su-kien" in url or "/ma-chung-khoan/" in url: return "auth"
+    if any(p in url for p in ("timkiem.", "/timelinesearch/", "/tim-kiem", "PagingNewsContent")): return "page"
+    if url.rstrip("/").endswith("restv2.fireant.vn/posts"): return "page"
+    return "article"
+
+def source_for(url):
+    for name, cls in SPIDERS.items():
+        if any(h in url for h in cls.hosts): return name
+    return None
+
+def cached_pages(cache_dir, limit):
+    cache = ResponseCache(cache_dir, mode="replay")
+    pages = []
+    for entry in cache.iter_entries():
+        source = source_for(entry["url"])
+        if source: pages.append((source, classify(entry["url"]), entry["url"], cache.load_body(entry)))
+        if len(pages) >= limit: break
+    return pages
+
+def extract(source, kind, url, body, backend, start_year):
+    spider = SPIDERS[source](None, {"START_YEAR": start_year, "MAX_PAGES": 5, "HTML_PARSER": backend})
+    res = make_response(url, 200, body.encode("utf-8") if isinstance(body, str) else body,
+                        {"Content-Type": "text/html; charset=utf-8"})
+    if kind == "auth": return spider.parse_auth(res, "FPT")
+    if kind == "page": return spider.parse_page(res, "FPT", {})
+    job = {"url": url, "date": site_fixtures.BASE_DATE, "title": "t", "post_id": 1}
+    return spider.parse_article(res, job)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse throughput of each HTML backend on per-source fixture pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cache", default="", help="also use pages saved by ResponseCache in this folder")
+    parser.add_argument("--cache-limit", type=int, default=500)
+    parser.add_argument("--start-year", type=int, default=2022)
+    args = parser.parse_args()
+
+    pages = [(s, k, u, b) for s, k, u, b in site_fixtures.sample_pages()]
+    if args.cache: pages += cached_pages(args.cache, args.cache_limit)
+    backends = available_backends()
+    print(f"{len(pages)} pages, backends: {', '.join(backends)}\n")
+
+    reference = {i: extract(*page, "bs4", args.start_year) for i, page in enumerate(pages)}
+    print(f"{'source':<11} {'kind':<8} " + " ".join(f"{b + ' p/s':>14}" for b in backends) + "  same output")
+    totals = {b: 0.0 for b in backends}
+    for source in SPIDERS:
+        for kind in ("auth", "page", "article"):
+            group = [(i, p) for i, p in enumerate(pages) if p[0] == source and p[1] == kind]
+            if not group: continue
+            cells, same = [], True
+            for backend in backends:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    for i, page in group:
+                        out = extract(*page, backend, args.start_year)
+                        same = same and out == reference[i]
+                elapsed = time.perf_counter() - start
+                totals[backend] += elapsed
+                cells.append(f"{len(group) * args.repeat / elapsed:>14.1f}")
+            print(f"{source:<11} {kind:<8} " + " ".join(cells) + f"  {'yes' if same else 'NO'}")
+
+    print("\nTotal time: " + ", ".join(f"{b} {t:.2f}s ({totals['bs4'] / t:.1f}x vs bs4)" for b, t in totals.items()))
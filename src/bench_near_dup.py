@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from near_dup import NearDupIndex
+
+# Syllable pool so synthetic bodies look like Vietnamese news text to the shingler
+SYLLABLES = ("cổ phiếu ngân hàng lợi nhuận quý tăng giảm thị trường doanh nghiệp vốn điều lệ cổ đông hội đồng quản trị "
+             "kế hoạch kinh doanh năm nay tỷ đồng so với cùng kỳ chứng khoán giao dịch phiên sáng chiều khối ngoại mua "
+             "bán ròng dự án bất động sản xuất khẩu lãi suất tín dụng nợ xấu trái phiếu phát hành chia cổ tức tiền mặt").split()
+
+def make_body(rng, words):
+    return " ".join(rng.choice(SYLLABLES) + str(rng.randrange(50)) for _ in range(words))
+
+def republish(rng, body, edits):
+    # What another site does to a press release: its own byline, a few swapped words, a trimmed ending
+    words = body.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(SYLLABLES)
+    return f"Theo {rng.choice(['CafeF', 'Vietstock', 'VnEconomy'])} - " + " ".join(words[:len(words) - rng.randrange(10)])
+
+def corpus(n, dup_rate, words, edits, seed):
+    rng = random.Random(seed)
+    articles, originals = [], []
+    for i in range(n):
+        if originals and rng.random() < dup_rate:
+            source = rng.choice(originals)
+            articles.append((f"https://dup.example/{i}", republish(rng, articles[source][1], edits), source))
+        else:
+            originals.append(i)
+            articles.append((f"https://news.example/{i}", make_body(rng, words), i))
+    return articles
+
+def run(index, articles, offset=0):
+    # Returns (seconds, {article index: cluster id})
+    clusters, start = {}, time.perf_counter()
+    for i, (url, text, _) in enumerate(articles):
+        clusters[offset + i] = index.assign(url, text)["cluster_id"]
+    return time.perf_counter() - start, clusters
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Insert throughput and accuracy of NearDupIndex on synthetic republished news")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=403)
+    args = parser.parse_args()
+
+    articles = corpus(args.articles, args.dup_rate, args.words, args.edits, args.seed)
+    half = len(articles) // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "near_dup.db")
+        # Two runs over one database: the second half must find clusters created by the first
+        index = NearDupIndex(path, threshold=args.threshold)
+        first, clusters = run(index, articles[:half])
+        index.close()
+        index = NearDupIndex(path, threshold=args.threshold)
+        second, more = run(index, articles[half:], offset=half)
+        index.close()
+        size = os.path.getsize(path)
+    clusters.update(more)
+
+    pairs = [(clusters[i], clusters[orig]) for i, (_, _, orig) in enumerate(articles) if orig != i]
+    found = sum(a == b for a, b in pairs)
+    canonical = {clusters[i] for i, (_, _, orig) in enumerate(articles) if orig == i}
+    merged = sum(1 for i, (_, _, orig) in enumerate(articles) if orig == i) - len(canonical)
+    print(f"{len(articles)} articles, {len(pairs)} republished copies, threshold {args.threshold}")
+    print(f"run 1: {half / first:,.0f} articles/s   run 2 (reopened index): {(len(articles) - half) / second:,.0f} articles/s")
+    print(f"recall: {100 * found / max(1, len(pairs)):.2f}% of copies joined their original's cluster")
+    print(f"false merges: {merged} distinct originals put in another original's cluster")
+    print(f"index size: {size / 1e6:.1f} MB ({size / len(articles):.0f} B/article)")
@@ -0,0 +1,113 @@
+import argparse
+import glob
+import os
+import random
+import time
+from collections import Counter
+
+import NER
+
+NAMES = [name for name in NER.TICKER_MAP if len(name) > 10]
+TICKERS = sorted(t for t in NER.RESOLVER.tickers if t and t.isalpha())
+ALIASES = [alias.title() for alias in NER.ALIASES if len(alias) > 3]
+PEOPLE = ["Trần Đình Long", "Nguyễn Thị Phương Thảo", "Phạm Nhật Vượng", "Trương Gia Bình", "Nguyễn Đăng Quang", "Lê Thị Hoa"]
+
+# Câu có tên công ty / người / địa danh, và câu số liệu thuần chữ thường như phần lớn thân bài báo tài chính
+NAMED = [
+    "{name} vừa công bố báo cáo tài chính quý {q} với doanh thu đạt {x} tỷ đồng.",
+    "Cổ phiếu {ticker} của {name} tăng {p}% trong phiên sáng nay.",
+    "Theo ông {person}, chủ tịch HĐQT {name}, kế hoạch năm 2024 là lãi {x} tỷ đồng.",
+    "Trong khi đó, {alias} và {alias2} dẫn đầu nhóm ngân hàng về tăng trưởng tín dụng.",
+    "Khối ngoại bán ròng mạnh tại {ticker}, {ticker2} và {ticker3}.",
+    "Tại Hà Nội, {name} khởi công dự án mới với tổng vốn đầu tư {x} tỷ đồng.",
+    "{alias} cho biết sẽ tăng vốn điều lệ thêm {x} tỷ đồng.",
+]
+PLAIN = [
+    "Lợi nhuận sau thuế tăng {p}% so với cùng kỳ năm trước nhờ giá vốn giảm.",
+    "Biên lợi nhuận gộp cải thiện đáng kể trong bối cảnh chi phí đầu vào hạ nhiệt.",
+    "Thanh khoản thị trường tiếp tục ở mức thấp khi nhà đầu tư thận trọng chờ thông tin mới.",
+    "Dòng tiền tập trung vào nhóm cổ phiếu vốn hóa lớn trong phần lớn thời gian của phiên.",
+    "Doanh nghiệp cho biết sẽ chia cổ tức bằng tiền mặt với tỷ lệ {p}% trong năm nay.",
+    "Nợ xấu được kiểm soát dưới mức {p}% theo quy định của cơ quan quản lý.",
+    "Các chuyên gia nhận định xu hướng tăng vẫn được duy trì trong ngắn hạn nhưng rủi ro điều chỉnh là có.",
+    "Giá thép xây dựng giảm lần thứ {q} liên tiếp kể từ đầu năm do nhu cầu yếu.",
+    "Lãi suất huy động tại nhiều ngân hàng đã giảm từ 0,2 đến 0,5 điểm phần trăm.",
+    "Tổng tài sản cuối kỳ đạt {x} tỷ đồng, tăng {p}% so với đầu năm.",
+    "Chỉ số VN-Index đóng cửa tăng {q} điểm với thanh khoản đạt {x} tỷ đồng.",
+    "Chi phí tài chính giảm mạnh nhờ doanh nghiệp đã tất toán phần lớn các khoản vay ngắn hạn.",
+]
+
+def fill(rng, template):
+    return template.format(
+        name=rng.choice(NAMES), ticker=rng.choice(TICKERS), ticker2=rng.choice(TICKERS), ticker3=rng.choice(TICKERS),
+        alias=rng.choice(ALIASES), alias2=rng.choice(ALIASES), person=rng.choice(PEOPLE),
+        q=rng.randint(1, 4), p=rng.randint(1, 60), x=rng.randint(10, 9000))
+
+def synthetic_articles(n, seed):
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(n):
+        body = [fill(rng, rng.choice(NAMED if rng.random() < 0.25 else PLAIN)) for _ in range(rng.randint(15, 35))]
+        articles.append({"title": fill(rng, rng.choice(NAMED)).rstrip("."), "content": " ".join(body)})
+    return articles
+
+def real_articles(n, seed):
+    articles = []
+    for item in NER.list_tickers(NER.INPUT_STORE) or glob.glob(os.path.join(NER.INPUT_DIR, "*_clean.json")):
+        articles.extend(NER.load_input(item)[1])
+    random.Random(seed).shuffle(articles)
+    return articles[:n]
+
+def tickers_of(entities):
+    return {t for e in entities for t in NER.RESOLVER.resolve(e) if t and t != 'None'}
+
+def recall(reference, candidate):
+    # Micro-averaged: share of the reference's (article, item) pairs that candidate also finds
+    total = sum(len(r) for r in reference)
+    kept = sum(len(r & c) for r, c in zip(reference, candidate))
+    return 100 * kept / total if total else 100.0
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed and entity recall of sentence-chunked, prefiltered NER vs full-text NER")
+    parser.add_argument("--sample", type=int, default=60, help="articles")
+    parser.add_argument("--synthetic", action="store_true", help="generated articles even when *_clean.json data exists")
+    parser.add_argument("--seed", type=int, default=403)
+    args = parser.parse_args()
+
+    articles = [] if args.synthetic else real_articles(args.sample, args.seed)
+    source = "*_clean.json sample"
+    if not articles:
+        articles, source = synthetic_articles(args.sample, args.seed), "synthetic articles"
+    texts = [NER.article_text(a) for a in articles]
+    sentences = [NER.split_sentences(t) for t in texts]
+    n_sentences = sum(len(s) for s in sentences)
+    t_filter, candidates = timed(lambda: [[s for s in ss if NER.is_candidate_sentence(s)] for ss in sentences])
+    n_candidates = sum(len(c) for c in candidates)
+    unique = list(dict.fromkeys(s for cs in candidates for s in cs))
+    print(f"{len(articles)} {source}, {n_sentences} sentences, {n_candidates} pass the prefilter "
+          f"({len(unique)} distinct; prefilter {1000 * t_filter:.0f} ms)")
+
+    # Single process throughout, so the ratios are the NER work itself
+    t_full, full = timed(lambda: [NER.filter_entities(NER.ner_spans(t)) for t in texts])
+    t_split, split = timed(lambda: [NER.filter_entities([e for s in ss for e in NER.sentence_spans(s)]) for ss in sentences])
+
+    def chunked():
+        spans = {s: NER.sentence_spans(s) for s in unique}
+        return [NER.filter_entities([e for s in cs for e in spans[s]]) for cs in candidates]
+    t_chunked, chunk = timed(chunked)
+    t_chunked += t_filter
+
+    full_sets = [set(e) for e in full]
+    full_tickers = [tickers_of(e) for e in full]
+    print(f"  {'':<32}{'seconds':>9}{'articles/s':>12}{'speedup':>9}{'entity recall':>15}{'ticker recall':>15}")
+    for label, seconds, result in [("full text (current)", t_full, full), ("all sentences", t_split, split),
+                                   ("prefiltered sentences, batched", t_chunked, chunk)]:
+        print(f"  {label:<32}{seconds:9.2f}{len(articles) / seconds:12.1f}{t_full / seconds:8.1f}x"
+              f"{recall(full_sets, [set(e) for e in result]):14.1f}%{recall(full_tickers, [tickers_of(e) for e in result]):14.1f}%")
+    lost = Counter(e for f, c in zip(full_sets, chunk) for e in f - set(c))
+    if lost: print(f"  entities most often lost vs full text: {lost.most_common(8)}")
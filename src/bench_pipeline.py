@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from news_pipeline_multithread import PipelineManager
+from bench_crawl_engines import ThreadSampler
+from response_cache import ResponseCache
+import site_fixtures
+
+# Every source's hosts served under one origin, the layout CrawlerEngine uses for LOCAL_MIRROR:
+#   http://127.0.0.1:8766/<original host>/<original path>?<original query>
+def recorded_pages(cache_dir):
+    # Bodies saved by ResponseCache (CACHE_MODE=on during a live crawl) replace the synthetic fixture of the same URL
+    if not cache_dir: return {}
+    cache = ResponseCache(cache_dir, mode="replay")
+    pages = {}
+    for entry in cache.iter_entries():
+        parts = urlsplit(entry["url"])
+        content_type = {k.lower(): v for k, v in (entry.get("headers") or {}).items()}.get("content-type", "text/html; charset=utf-8")
+        pages[(parts.netloc, parts.path, parts.query)] = (content_type, cache.load_body(entry))
+    return pages
+
+def build_app(args, counters):
+    rng = random.Random(args.seed)
+    recorded = recorded_pages(args.cache)
+
+    async def handle(request):
+        host, _, path = request.match_info["rest"].partition("/")
+        form = dict(await request.post()) if request.method == "POST" else {}
+        with counters.get_lock():
+            counters[0] += 1
+        await asyncio.sleep(args.latency)
+        roll = rng.random()
+        if roll < args.error_rate:
+            with counters.get_lock():
+                counters[1] += 1
+            return web.Response(status=503, text="injected error")
+        if roll < args.error_rate + args.slow_rate:
+            # Longer than REQUEST_TIMEOUT, so the client times out and the retry/breaker path runs
+            await asyncio.sleep(args.timeout + 1)
+        page = recorded.get((host, "/" + path, request.query_string))
+        if page:
+            content_type, body = page
+            status = 200
+        else:
+            status, content_type, body = site_fixtures.fixture_response(host, "/" + path, dict(request.query), form)
+        mime, _, charset = content_type.partition(";")
+        return web.Response(status=status, body=body.encode("utf-8") if isinstance(body, str) else body,
+                            content_type=mime.strip(), charset=charset.partition("=")[2].strip() or None)
+
+    app = web.Application()
+    app.router.add_route("*", "/{rest:.*}", handle)
+    return app
+
+def serve(args, counters):
+    web.run_app(build_app(args, counters), host="127.0.0.1", port=args.port, print=None, backlog=4096)
+
+def write_workspace(folder, args):
+    keywords_folder = os.path.join(folder, "keywords")
+    os.makedirs(keywords_folder)
+    for t in range(args.tickers):
+        ticker = f"B{t:02d}"
+        # Neighbouring tickers share half their keywords, like competitors/macro lists in data/keywords
+        keywords = [f"bench {(t * args.keywords // 2) + k}" for k in range(args.keywords)]
+        with open(os.path.join(keywords_folder, f"{ticker}_keywords.json"), "w", encoding="utf-8") as f:
+            json.dump({"ticker": ticker, "keywords_direct": keywords}, f)
+    config = {
+        "START_YEAR": 2022, "MAX_PAGES": site_fixtures.PAGES, "CRAWL_BACKEND": args.backend,
+        "LOCAL_MIRROR": f"http://127.0.0.1:{args.port}", "KEYWORDS_FOLDER": keywords_folder,
+        "OUTPUT_FOLDER": os.path.join(folder, "output"), "ARTICLE_STORE": os.path.join(folder, "articles"),
+        "FRONTIER_DB": os.path.join(folder, "frontier.db"), "NEAR_DUP_DB": os.path.join(folder, "near_dup.db"),
+        "TELEMETRY_DIR": os.path.join(folder, "telemetry"), "CACHE_MODE": "off",
+        "RATE_LIMIT_DEFAULT": args.rate_limit, "REQUEST_TIMEOUT": args.timeout,
+    }
+    for item in args.set:
+        key, _, value = item.partition("=")
+        config[key.strip()] = value.strip()
+    config_file = os.path.join(folder, "config.txt")
+    with open(config_file, "w", encoding="utf-8") as f:
+        f.write("".join(f"{k} = {v}\n" for k, v in config.items()))
+    return config_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end PipelineManager run against local stand-ins for all seven sources")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--backend", default="thread", choices=["thread", "async"])
+    parser.add_argument("--tickers", type=int, default=3)
+    parser.add_argument("--keywords", type=int, default=4, help="keywords per ticker")
+    parser.add_argument("--latency", type=float, default=0.05, help="server-side delay per response (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of responses replaced by a 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of responses held past REQUEST_TIMEOUT")
+    parser.add_argument("--timeout", type=int, default=5, help="REQUEST_TIMEOUT for the run")
+    parser.add_argument("--rate-limit", default="1000,1000", help="RATE_LIMIT_DEFAULT for the run")
+    parser.add_argument("--cache", default="", help="serve pages recorded by ResponseCache in this folder where available")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="extra config.txt line, repeatable")
+    parser.add_argument("--seed", type=int, default=403)
+    parser.add_argument("--json", default="", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    counters = multiprocessing.Array("l", 2)  # requests served, injected errors
+    server = multiprocessing.Process(target=serve, args=(args, counters), daemon=True)
+    server.start()
+    time.sleep(1.5)
+
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            manager = PipelineManager(write_workspace(folder, args))
+            with ThreadSampler() as sampler:
+                start = time.time()
+                manager.run()
+                elapsed = time.time() - start
+            snapshot = manager.telemetry.snapshot()
+    finally:
+        server.terminate()
+        server.join()
+
+    served, injected = counters[0], counters[1]
+    summary = {
+        "backend": args.backend, "seconds": round(elapsed, 2),
+        "requests_served": served, "injected_errors": injected,
+        "pages_per_sec": round(served / elapsed, 1),
+        "articles": snapshot["articles"], "articles_per_sec": round(snapshot["articles"] / elapsed, 1),
+        "peak_threads": sampler.peak,
+        # ru_maxrss is in KiB on Linux; children are the parse pool workers and the fixture server
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "sources": {name: {k: s[k] for k in ("requests", "error_rate", "retries", "latency_p50", "articles")}
+                    for name, s in snapshot["sources"].items()},
+    }
+
+    print(f"\n{'source':<12} {'requests':>9} {'errors':>7} {'retries':>8} {'p50 s':>7} {'articles':>9}")
+    for name, s in summary["sources"].items():
+        print(f"{name:<12} {s['requests']:>9} {s['error_rate']:>7.1%} {s['retries']:>8} {s['latency_p50']:>7} {s['articles']:>9}")
+    print(f"\n{args.backend}: {elapsed:.2f}s, {summary['pages_per_sec']} pages/s ({served} served, {injected} injected errors), "
+          f"{summary['articles_per_sec']} articles/s ({summary['articles']}), peak {sampler.peak} threads, "
+          f"peak RSS {summary['peak_rss_mb']} MB (children {summary['peak_child_rss_mb']} MB)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
@@ -0,0 +1,140 @@
+import math
+import threading
+from collections import defaultdict
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager, ProxyManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+from rate_limiter import host_source_map, source_for_host, parse_rate_limit, DEFAULT_RATE_LIMIT
+
+# config.txt:
+#   CONNECTIONS_DEFAULT = 8         -> keep-alive connections per host (default: the source's rate-limit burst, at least 2)
+#   CONNECTIONS_CafeF = 16          -> per-source override (key suffix = spider source_name)
+
+class ConnectionStats:
+    def __init__(self, host_sources):
+        self.host_sources = host_sources
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.new = defaultdict(int)
+
+    def record(self, host, new):
+        source = source_for_host(self.host_sources, f"//{host}")
+        with self.lock:
+            if new: self.new[source] += 1
+            else: self.requests[source] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {name: {"requests": n, "new_connections": self.new[name],
+                           "reuse_ratio": round(1 - min(self.new[name], n) / n, 4) if n else 0.0}
+                    for name, n in sorted(self.requests.items())}
+
+def counting_pool(base):
+    class CountingPool(base):
+        # stats is set by HostPoolManager right after the pool is built
+        stats = None
+
+        def _new_conn(self):
+            if self.stats: self.stats.record(self.host, True)
+            return super()._new_conn()
+
+        def urlopen(self, *args, **kwargs):
+            if self.stats: self.stats.record(self.host, False)
+            return super().urlopen(*args, **kwargs)
+    return CountingPool
+
+class HostSizedPools:
+    """Pool size from size_for(host) instead of one global maxsize; mixed into PoolManager and ProxyManager."""
+
+    def host_pools(self, size_for, stats):
+        self.size_for = size_for
+        self.stats = stats
+        self.pool_classes_by_scheme = {"http": counting_pool(HTTPConnectionPool), "https": counting_pool(HTTPSConnectionPool)}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        context = dict(request_context if request_context is not None else self.connection_pool_kw, maxsize=self.size_for(host))
+        pool = super()._new_pool(scheme, host, port, context)
+        pool.stats = self.stats
+        return pool
+
+class HostPoolManager(HostSizedPools, PoolManager):
+    def __init__(self, size_for, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.host_pools(size_for, stats)
+
+class HostProxyManager(HostSizedPools, ProxyManager):
+    # HTTPS through the proxy tunnels per target host, so those pools get the target's size;
+    # plain HTTP shares the pool of the proxy itself (size_for falls back to the default)
+    def __init__(self, size_for, stats, proxy_url, **kwargs):
+        super().__init__(proxy_url, **kwargs)
+        self.host_pools(size_for, stats)
+
+class HostAwareAdapter(HTTPAdapter):
+    def __init__(self, size_for, stats, **kwargs):
+        self.size_for = size_for
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections, self._pool_maxsize, self._pool_block = connections, maxsize, block
+        self.poolmanager = HostPoolManager(self.size_for, self.stats, num_pools=connections, maxsize=maxsize,
+                                           block=block, **pool_kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        # USE_PROXY traffic gets the same per-host pool sizes (one set per proxy) as direct traffic
+        if proxy not in self.proxy_manager and not proxy.lower().startswith("socks"):
+            self.proxy_manager[proxy] = HostProxyManager(
+                self.size_for, self.stats, proxy, proxy_headers=self.proxy_headers(proxy), num_pools=self._pool_connections,
+                maxsize=self._pool_maxsize, block=self._pool_block, **proxy_kwargs)
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+class HostConnectionManager:
+    """One requests.Session shared by every crawl thread, with a keep-alive pool per host.
+
+    Each host's pool holds as many connections as that source may use at once; a thread that finds
+    them all busy waits for one (pool_block) instead of opening a throwaway connection and TLS handshake.
+
+    The session keeps no cookies: one jar would be shared by every source, keyword and thread.
+    A response's own cookies are still in response.cookies, and a credential that needs its cookie
+    carries it in the auth context (see VietstockSpider.parse_auth).
+    """
+
+    def __init__(self, host_sources=None, limits=None, default_size=8):
+        self.host_sources = host_sources or {}
+        self.limits = limits or {}
+        self.default_size = default_size
+        self.stats = ConnectionStats(self.host_sources)
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # gzip/deflate always; br and zstd only when urllib3 can import brotli / zstandard here
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        adapter = HostAwareAdapter(self.size_for, self.stats, pool_connections=32, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, config, spider_classes):
+        default_burst = parse_rate_limit(config.get("RATE_LIMIT_DEFAULT", DEFAULT_RATE_LIMIT))[1]
+        default = int(config.get("CONNECTIONS_DEFAULT", max(2, math.ceil(default_burst))))
+        limits = {}
+        for S in spider_classes:
+            burst = parse_rate_limit(config.get(f"RATE_LIMIT_{S.source_name}", config.get("RATE_LIMIT_DEFAULT", DEFAULT_RATE_LIMIT)))[1]
+            limits[S.source_name] = int(config.get(f"CONNECTIONS_{S.source_name}", max(2, math.ceil(burst))))
+        return cls(host_source_map(spider_classes), limits, default)
+
+    def size_for(self, host):
+        return self.limits.get(source_for_host(self.host_sources, f"//{host}"), self.default_size)
+
+    def report(self):
+        stats = self.stats.snapshot()
+        requests_total = sum(s["requests"] for s in stats.values())
+        new = sum(s["new_connections"] for s in stats.values())
+        if not requests_total: return
+        print(f"Connections: {requests_total} requests over {new} connections "
+              f"({100 * (1 - min(new, requests_total) / requests_total):.1f}% reused), Accept-Encoding: {ACCEPT_ENCODING}"
+              + ("" if "br" in ACCEPT_ENCODING else " (pip install brotli for br)"))
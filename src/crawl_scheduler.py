@@ -0,0 +1,126 @@
+import itertools
+import threading
+import time
+from queue import PriorityQueue, Full
+
+# Lower value runs first: finishing articles before opening new listing pages keeps the queue shallow
+PRIORITY_ARTICLE = 0
+PRIORITY_LISTING = 1
+PRIORITY_SEED = 2
+
+class CrawlBudget:
+    """Global deadline of a time-budgeted crawl; reserve is the time a listing needs to still pay off
+    (its own request plus its articles), so deeper pages stop being opened that long before the end."""
+
+    def __init__(self, seconds, reserve=0.0):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.reserve = reserve
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def allows_deeper(self):
+        return self.remaining() > self.reserve
+
+class CrawlScheduler:
+    """Fixed pool of crawl threads fed by one bounded priority queue shared by every spider.
+
+    Producers outside the pool block when the queue is full (backpressure). A worker that
+    hits a full queue runs the task itself instead, so the pool can never deadlock on put().
+    """
+
+    def __init__(self, num_workers=20, max_queue=1000, report_interval=10, budget=None):
+        self.num_workers = num_workers
+        self.queue = PriorityQueue(maxsize=max_queue)
+        self.counter = itertools.count()
+        self.report_interval = report_interval
+        self.budget = budget
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.stopped = threading.Event()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "inline": 0, "expired": 0, "peak_depth": 0}
+
+    def start(self):
+        for i in range(self.num_workers):
+            t = threading.Thread(target=self.worker_loop, name=f"crawl-worker-{i}", daemon=True)
+            t.start()
+            self.workers.append(t)
+        if self.report_interval:
+            threading.Thread(target=self.report_loop, name="crawl-reporter", daemon=True).start()
+        return self
+
+    def submit(self, priority, fn, *args):
+        with self.lock:
+            self.stats["submitted"] += 1
+        entry = (priority, next(self.counter), fn, args)
+        if getattr(self.local, "is_worker", False):
+            try:
+                self.queue.put_nowait(entry)
+            except Full:
+                with self.lock:
+                    self.stats["inline"] += 1
+                self.run_task(fn, args)
+                return
+        else:
+            self.queue.put(entry)
+        with self.lock:
+            self.stats["peak_depth"] = max(self.stats["peak_depth"], self.queue.qsize())
+
+    def run_task(self, fn, args):
+        # Past the budget's deadline queued work is dropped, so the queue drains and the run can flush
+        if self.budget and self.budget.expired():
+            with self.lock:
+                self.stats["expired"] += 1
+            # A spider losing a page or article this way is told, so it can keep its watermark back
+            owner = getattr(fn, "__self__", None)
+            if hasattr(owner, "cut_short"): owner.cut_short()
+            return
+        try:
+            fn(*args)
+            ok = True
+        except Exception as e:
+            print(f"Task error {getattr(fn, '__qualname__', fn)}: {e}")
+            ok = False
+        with self.lock:
+            self.stats["completed" if ok else "failed"] += 1
+
+    def worker_loop(self):
+        self.local.is_worker = True
+        while True:
+            _, _, fn, args = self.queue.get()
+            try:
+                if fn is None: return
+                self.run_task(fn, args)
+            finally:
+                self.queue.task_done()
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def report(self):
+        with self.lock:
+            s = dict(self.stats)
+        print(f"Scheduler: queue depth {self.depth()} (peak {s['peak_depth']}), "
+              f"{s['completed']}/{s['submitted']} tasks done, {s['failed']} failed, {s['inline']} run inline"
+              + (f", {s['expired']} dropped at the deadline" if s["expired"] else ""))
+
+    def report_loop(self):
+        while not self.stopped.wait(self.report_interval):
+            self.report()
+
+    def join(self):
+        self.queue.join()
+
+    def shutdown(self):
+        self.join()
+        self.stopped.set()
+        for _ in self.workers:
+            self.queue.put((float("inf"), next(self.counter), None, ()))
+        for t in self.workers:
+            t.join()
+        self.workers = []
@@ -1,75 +1,60 @@
 import json
 import os
 import glob
-import re
 import pandas as pd
 from tqdm import tqdm
 from collections import Counter
+from article_store import read_records, list_tickers
+from ticker_matcher import KeywordMatcher
 
 # --- CẤU HÌNH ---
 INPUT_DIR = "data/interim"      
+INPUT_STORE = "data/interim/articles"  # Parquet store (ticker/month) do preprocessing.ipynb ghi
 OUTPUT_DIR = "data/processed"     
 MAP_FILE = "data/ticker_map.json" 
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# 1. Load Ticker Map và Tối ưu hóa cho tìm kiếm
+# 1. Load Ticker Map và dựng automaton Aho-Corasick (một lần)
 def load_ticker_map():
     if not os.path.exists(MAP_FILE):
         print(f"❌ Lỗi: Không tìm thấy {MAP_FILE}.")
-        return {}
+        return {}, KeywordMatcher({})
     
     with open(MAP_FILE, 'r', encoding='utf-8') as f:
         raw_map = json.load(f)
         
-    # Chuẩn bị map: Chuyển key về chữ thường để so khớp với văn bản
-    # Sắp xếp key theo độ dài giảm dần (để ưu tiên bắt từ dài trước, tránh bắt nhầm từ ngắn)
-    # Ví dụ: Ưu tiên bắt "Ngân hàng Tiên Phong" trước khi bắt "Tiên Phong"
+    # Key chữ thường; automaton ưu tiên từ dài nhất khi chồng lấn
+    # Ví dụ: bắt "Ngân hàng Tiên Phong" thay vì "Tiên Phong" nằm bên trong
     cleaned_map = {k.lower().strip(): v for k, v in raw_map.items()}
-    sorted_keys = sorted(cleaned_map.keys(), key=len, reverse=True)
     
-    return cleaned_map, sorted_keys
+    return cleaned_map, KeywordMatcher(cleaned_map)
 
-TICKER_MAP, SORTED_KEYS = load_ticker_map()
+TICKER_MAP, MATCHER = load_ticker_map()
 
 # 2. Hàm Quét Từ Điển (Thay thế cho NER)
 def scan_tickers_from_text(text, target_ticker):
     if not text: return []
     
-    # Chuyển văn bản về chữ thường để so sánh
-    text_lower = text.lower()
-    found_tickers = set()
-    
-    # Duyệt qua từng từ khóa trong từ điển
-    # (Cách này hơi chậm nếu từ điển quá lớn, nhưng với 2000 key thì chạy vèo vèo)
-    for key in SORTED_KEYS:
-        # Bỏ qua các key quá ngắn (dưới 3 ký tự) để tránh nhiễu (trừ khi là mã 3 chữ cái)
-        if len(key) < 3: 
-            # Nếu key chính là mã chứng khoán (VD: "fpt", "vic") thì dùng regex word boundary để bắt chính xác
-            # Tránh bắt "vic" trong từ "victory"
-            if re.search(r'\b' + re.escape(key) + r'\b', text_lower):
-                 if TICKER_MAP[key] != target_ticker:
-                    found_tickers.add(TICKER_MAP[key])
-            continue
-
-        # Với các tên dài (VD: "vietcombank", "hòa phát"), dùng `in` là đủ nhanh
-        if key in text_lower:
-            # Map sang mã
-            ticker = TICKER_MAP[key]
-            if ticker != target_ticker: # Không tính chính mình là related
-                found_tickers.add(ticker)
+    # Một lần duyệt văn bản cho mọi key (thời gian tuyến tính theo độ dài bài, không theo số key).
+    # Mọi key đều phải đứng trọn từ: tránh bắt "vic" trong "victory"
+    found_tickers = MATCHER.values_in(text)
+    found_tickers.discard(target_ticker)  # Không tính chính mình là related
                 
     return list(found_tickers)
 
-# 3. Hàm xử lý file
+# 3. Hàm đọc input: mã ticker trong INPUT_STORE, hoặc file *_clean.json kiểu cũ
+def load_input(item):
+    if item.endswith(".json"):
+        with open(item, 'r', encoding='utf-8') as f:
+            return os.path.basename(item).split('_')[0], json.load(f)
+    return item, read_records(INPUT_STORE, tickers=[item])
+
+# 4. Hàm xử lý file
 def process_file(filepath):
-    filename = os.path.basename(filepath)
-    ticker_target = filename.split('_')[0] 
+    ticker_target, articles = load_input(filepath)
     
     print(f"🚀 Scanning keywords for: {ticker_target}...")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        articles = json.load(f)
         
     final_data = []
     related_counter = Counter()
@@ -110,12 +95,12 @@ def process_file(filepath):
         
     print(f"   ✅ Done. Top related: {top_10}")
 
-# 4. Main
+# 5. Main
 if __name__ == "__main__":
-    files = glob.glob(os.path.join(INPUT_DIR, "*_clean.json"))
+    files = list_tickers(INPUT_STORE) or glob.glob(os.path.join(INPUT_DIR, "*_clean.json"))
     
     if not files:
-        print(f"⚠️ Không tìm thấy file dữ liệu nào trong {INPUT_DIR}.")
+        print(f"⚠️ Không tìm thấy file dữ liệu nào trong {INPUT_STORE} / {INPUT_DIR}.")
     else:
         print(f"Tìm thấy {len(files)} file cần xử lý.")
         for f in files:
@@ -0,0 +1,163 @@
+"""Crawl with several worker processes on one host, coordinated through a durable job queue.
+
+    python src/distributed_crawl.py enqueue [RUN]    # coordinator: page-1 job per (keyword, source) of the plan
+    python src/distributed_crawl.py worker [THREADS] # start as many as you like, on the same host
+    python src/distributed_crawl.py status
+    python src/distributed_crawl.py finalize         # once drained: compact every ticker's shards
+
+A job is one listing page: (source, keyword, page, tickers). The worker that runs it enqueues
+the next page as soon as the listing shows there is one, then fetches the page's articles, so
+one keyword's pages spread over workers as they go. Results are streamed as NDJSON shards into
+the shared OUTPUT_FOLDER (one file set per worker process) and folded together by finalize.
+Each enqueue starts a new run (RUN, default the current time), so the same pages are queued
+again on the next nightly crawl instead of being skipped as already done.
+
+Every worker process writes to the same FRONTIER_DB, so each of its writes is committed on its
+own (DB_COMMIT_EVERY = 1) rather than holding the file's write lock for a batch. Near-duplicate
+clustering (NEAR_DUP_DB) runs only in finalize.
+
+Single host only: the job queue, FRONTIER_DB and NEAR_DUP_DB are SQLite files in WAL mode, which
+needs shared memory and does not work on network filesystems. Several hosts need a network-safe
+backend in job_queue.QUEUE_BACKENDS and for the frontier first.
+
+config.txt (one file and keywords folder shared by every worker):
+    JOB_QUEUE = sqlite:///data/crawl_jobs.db
+    JOB_LEASE_SECONDS = 120        -> a job not renewed for this long goes back to the queue
+    JOB_MAX_ATTEMPTS = 5
+    WORKER_THREADS = 8
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+from news_pipeline_multithread import PipelineManager, build_keyword_plan, SPIDER_CLASSES
+from job_queue import open_queue
+
+class DistributedCrawl(PipelineManager):
+    def __init__(self, config_file="config.txt"):
+        # Worker processes are the unit of parallelism here, so articles are parsed inline
+        super().__init__(config_file, overrides={"CRAWL_BACKEND": "thread", "PARSE_WORKERS": 0, "DB_COMMIT_EVERY": 1})
+        if not self.config: return
+        self.queue = open_queue(
+            self.config.get("JOB_QUEUE", "sqlite:///data/crawl_jobs.db"),
+            lease_seconds=self.config.get("JOB_LEASE_SECONDS", 120),
+            max_attempts=self.config.get("JOB_MAX_ATTEMPTS", 5)
+        )
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.spider_classes = {cls.source_name: cls for cls in SPIDER_CLASSES}
+        self.active = {}
+        self.active_lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def enqueue(self, run=None):
+        run = run or time.strftime("%Y%m%d-%H%M%S")
+        plan = build_keyword_plan(self.keywords_data)
+        jobs = []
+        for keyword, tickers in plan:
+            for name, SpiderClass in self.spider_classes.items():
+                first = next(iter(SpiderClass(None, self.config).pages()), None)
+                if first is not None:
+                    jobs.append({"run": run, "source": name, "keyword": keyword, "page": first, "tickers": tickers})
+        added = self.queue.put(jobs)
+        print(f"Enqueued {added} new jobs for run {run} ({len(plan)} keywords x {len(self.spider_classes)} sources)")
+
+    def run_job(self, job):
+        keyword, page = job["keyword"], job["page"]
+        spider = self.spider_classes[job["source"]](
+            self.engine, self.config, frontier=self.frontier, memo=self.memo, sink=self.writer,
+            tickers=job["tickers"], telemetry=self.telemetry, tokens=self.tokens
+        )
+        ctx = spider.prepare(keyword)
+        if ctx is None: raise RuntimeError("auth failed")
+        res, articles = spider.fetch_listing(keyword, page, ctx)
+        if res is None: raise RuntimeError("listing request failed")
+        pages = list(spider.pages())
+        position = pages.index(page) if page in pages else len(pages)
+        if not spider.exhausted and position + 1 < len(pages):
+            self.queue.put([{"run": job.get("run", ""), "source": job["source"], "keyword": keyword,
+                             "page": pages[position + 1], "tickers": job["tickers"]}])
+        # A re-run after a lost lease fetches these again; compaction drops the repeated URLs
+        for article in articles:
+            spider.process(article, keyword, ctx)
+
+    def worker_loop(self, poll_seconds):
+        while not self.stopped.is_set():
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                if self.queue.drained(): return
+                time.sleep(poll_seconds)
+                continue
+            with self.active_lock:
+                self.active[job["id"]] = job
+            try:
+                self.run_job(job)
+                self.queue.complete(job["id"], self.worker_id)
+            except Exception as e:
+                print(f"Job {job['source']} - {job['keyword']} p{job['page']} failed (attempt {job['attempts']}): {e}")
+                self.queue.fail(job["id"], self.worker_id, e)
+            finally:
+                with self.active_lock:
+                    self.active.pop(job["id"], None)
+
+    def heartbeat(self):
+        interval = max(1, self.queue.lease_seconds / 3)
+        while not self.stopped.wait(interval):
+            with self.active_lock:
+                job_ids = list(self.active)
+            for job_id in job_ids:
+                if not self.queue.renew(job_id, self.worker_id):
+                    print(f"Lease on job {job_id} lost; another worker may run it again")
+
+    def work(self, threads=None):
+        threads = threads or self.config.get("WORKER_THREADS", 8)
+        print(f"Worker {self.worker_id}: {threads} threads on {self.config.get('JOB_QUEUE', 'sqlite:///data/crawl_jobs.db')}")
+        self.telemetry.start()
+        beat = threading.Thread(target=self.heartbeat, name="lease-heartbeat", daemon=True)
+        beat.start()
+        start_time = time.time()
+        pool = [threading.Thread(target=self.worker_loop, args=(1.0,), name=f"crawl-worker-{i}") for i in range(threads)]
+        try:
+            for t in pool: t.start()
+            for t in pool: t.join()
+        except KeyboardInterrupt:
+            # Leases of the jobs in flight simply expire and other workers pick them up
+            self.stopped.set()
+            for t in pool: t.join()
+        self.stopped.set()
+        print(f"\nWorker {self.worker_id} finished in {time.time() - start_time:.2f}s")
+        self.memo.report()
+        self.retry.report()
+        self.breakers.report()
+        self.connections.report()
+        self.telemetry.report()
+        self.writer.close_all()
+        self.frontier.close()
+        if self.cache: self.cache.close()
+        self.telemetry.close()
+        self.queue.close()
+
+    def status(self):
+        counts = self.queue.counts()
+        print(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "queue is empty")
+        return counts
+
+    def finalize(self):
+        if not self.queue.drained():
+            print("Jobs are still pending or leased; run finalize after the workers are done.")
+            return
+        for ticker_data in self.keywords_data:
+            self.save_results(ticker_data["ticker"])
+        if self.near_dup: self.near_dup.report()
+        self.frontier.close()
+        if self.near_dup: self.near_dup.close()
+        self.queue.close()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    crawl = DistributedCrawl()
+    if command == "enqueue": crawl.enqueue(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == "worker": crawl.work(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    elif command == "finalize": crawl.finalize()
+    else: crawl.status()
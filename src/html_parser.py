@@ -0,0 +1,185 @@
+"""Small parsing facade for the spiders' extractors.
+
+    doc = parse_html(res.content, "lxml")
+    doc.select(".item"), doc.select_one("h1.title"), node.find_next("span.time"),
+    node.text(), node.get_text("\\n"), node.get("href"), node.decompose()
+
+Backends: "selectolax" (lexbor), "lxml" (needs cssselect) and "bs4" (html.parser, always available).
+Text follows BeautifulSoup's get_text(): comments and <script>/<style>/<template> contents are skipped.
+"""
+from bs4 import BeautifulSoup
+import soupsieve
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from cssselect import GenericTranslator
+except ImportError:
+    GenericTranslator = None
+
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+def decode(content):
+    if isinstance(content, str): return content
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+class Bs4Node:
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        return [Bs4Node(t) for t in self.el.select(css)]
+
+    def select_one(self, css):
+        t = self.el.select_one(css)
+        return Bs4Node(t) if t is not None else None
+
+    def find_next(self, css):
+        matcher = soupsieve.compile(css)
+        t = self.el.find_next(lambda tag: matcher.match(tag))
+        return Bs4Node(t) if t is not None else None
+
+    @property
+    def parent(self):
+        return Bs4Node(self.el.parent) if self.el.parent is not None else None
+
+    def text(self):
+        return self.el.get_text()
+
+    def get_text(self, separator=""):
+        return self.el.get_text(separator=separator)
+
+    def get(self, name, default=None):
+        return self.el.get(name, default)
+
+    def decompose(self):
+        self.el.decompose()
+
+class LxmlNode:
+    translator = GenericTranslator() if GenericTranslator else None
+    xpath_cache = {}
+
+    def __init__(self, el):
+        self.el = el
+
+    @classmethod
+    def xpath(cls, css, prefix="descendant-or-self::"):
+        key = (css, prefix)
+        if key not in cls.xpath_cache:
+            cls.xpath_cache[key] = lxml.etree.XPath(cls.translator.css_to_xpath(css, prefix=prefix))
+        return cls.xpath_cache[key]
+
+    def select(self, css):
+        return [LxmlNode(t) for t in self.xpath(css, "descendant::")(self.el)]
+
+    def select_one(self, css):
+        found = self.xpath(css, "descendant::")(self.el)
+        return LxmlNode(found[0]) if found else None
+
+    def find_next(self, css):
+        # Same order as bs4's find_next: descendants first, then everything after the element
+        found = self.xpath(css, "descendant::")(self.el) or self.xpath(css, "following::")(self.el)
+        return LxmlNode(found[0]) if found else None
+
+    @property
+    def parent(self):
+        p = self.el.getparent()
+        return LxmlNode(p) if p is not None else None
+
+    def strings(self, el):
+        if el.text: yield el.text
+        for child in el:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:
+                yield from self.strings(child)
+            if child.tail: yield child.tail
+
+    def text(self):
+        return "".join(self.strings(self.el))
+
+    def get_text(self, separator=""):
+        return separator.join(self.strings(self.el))
+
+    def get(self, name, default=None):
+        return self.el.get(name, default)
+
+    def decompose(self):
+        self.el.drop_tree()
+
+class SelectolaxNode:
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        return [SelectolaxNode(t) for t in self.el.css(css)]
+
+    def select_one(self, css):
+        t = self.el.css_first(css)
+        return SelectolaxNode(t) if t is not None else None
+
+    def find_next(self, css):
+        t = self.el.css_first(css)
+        node = self.el
+        while t is None and node is not None:
+            sibling = node.next
+            while t is None and sibling is not None:
+                if sibling.is_element_node:
+                    t = sibling if sibling.css_matches(css) else sibling.css_first(css)
+                sibling = sibling.next
+            node = node.parent
+        return SelectolaxNode(t) if t is not None else None
+
+    @property
+    def parent(self):
+        p = self.el.parent
+        return SelectolaxNode(p) if p is not None else None
+
+    def strings(self, el):
+        child = el.child
+        while child is not None:
+            if child.is_text_node:
+                yield child.text_content
+            elif child.is_element_node and child.tag not in SKIP_TEXT_TAGS:
+                yield from self.strings(child)
+            child = child.next
+
+    def text(self):
+        return "".join(self.strings(self.el))
+
+    def get_text(self, separator=""):
+        return separator.join(self.strings(self.el))
+
+    def get(self, name, default=None):
+        value = self.el.attributes.get(name, default)
+        return default if value is None else value
+
+    def decompose(self):
+        self.el.decompose()
+
+def available_backends():
+    backends = []
+    if LexborHTMLParser: backends.append("selectolax")
+    if GenericTranslator: backends.append("lxml")
+    return backends + ["bs4"]
+
+def default_backend():
+    return available_backends()[0]
+
+def parse_html(content, backend=None):
+    backend = backend or default_backend()
+    if backend == "selectolax" and LexborHTMLParser:
+        text = decode(content)
+        return SelectolaxNode(LexborHTMLParser(text if text is not None else content).root)
+    if backend == "lxml" and GenericTranslator:
+        text = decode(content)
+        try:
+            return LxmlNode(lxml.html.document_fromstring(text if text is not None else content))
+        except (ValueError, lxml.etree.ParserError):
+            pass  # empty body or an XML encoding declaration lxml refuses in str input
+    return Bs4Node(BeautifulSoup(content, "html.parser"))
@@ -0,0 +1,114 @@
+"""Durable crawl job queue with leases, shared by the crawl worker processes of one host.
+
+    queue = open_queue("sqlite:///data/crawl_jobs.db", lease_seconds=120)
+    queue.put([{"run": "20240601", "source": "CafeF", "keyword": "FPT", "page": 1, "tickers": ["FPT"]}])
+    job = queue.claim("worker-1234")       # {"id", "attempts", "source", "keyword", "page", "tickers"}
+    queue.renew(job["id"], "worker-1234")  # heartbeat while the job runs
+    queue.complete(job["id"], "worker-1234")
+
+A job whose lease runs out (worker crashed or was cut off) is handed to the next claim.
+Backends register in QUEUE_BACKENDS under their URL scheme; a plain path means SQLite.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class SqliteJobQueue:
+    """One SQLite file in WAL mode: for the worker processes of a single host only, since WAL needs
+    shared memory and does not work on network filesystems. Spread over hosts with a backend of its own."""
+
+    def __init__(self, path="data/crawl_jobs.db", lease_seconds=120, max_attempts=5):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # Autocommit mode, so claim() can take the write lock up front with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY, key TEXT UNIQUE, payload TEXT, status TEXT DEFAULT 'pending',
+            worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, error TEXT, updated REAL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)")
+
+    def put(self, jobs):
+        """Enqueue jobs; a job with the same (run, source, keyword, page) as an existing one is ignored.
+        Returns the number added; a new run id queues every page again."""
+        rows = [(f"{j.get('run', '')}|{j['source']}|{j['keyword']}|{j['page']}", json.dumps(j, ensure_ascii=False), time.time()) for j in jobs]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("INSERT OR IGNORE INTO jobs (key, payload, updated) VALUES (?, ?, ?)", rows)
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def claim(self, worker):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Leased and lost too often (e.g. it crashes every worker that runs it): park it
+                self.conn.execute(
+                    """UPDATE jobs SET status = 'failed', error = 'lease lost', updated = ?
+                       WHERE status = 'leased' AND lease_until < ? AND attempts >= ?""", (now, now, self.max_attempts))
+                row = self.conn.execute(
+                    """SELECT id, payload, attempts FROM jobs
+                       WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?)
+                       ORDER BY attempts, id LIMIT 1""", (now,)).fetchone()
+                if row is None: return None
+                job_id, payload, attempts = row
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, job_id))
+            finally:
+                self.conn.execute("COMMIT")
+        return dict(json.loads(payload), id=job_id, attempts=attempts + 1)
+
+    def renew(self, job_id, worker):
+        """Extend the lease; False means it expired and another worker may own the job now."""
+        with self.lock:
+            cur = self.conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker))
+            return cur.rowcount == 1
+
+    def complete(self, job_id, worker):
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET status = 'done', lease_until = NULL, updated = ? WHERE id = ? AND worker = ?",
+                              (time.time(), job_id, worker))
+
+    def fail(self, job_id, worker, error):
+        # Back to pending for another try, until max_attempts
+        with self.lock:
+            self.conn.execute(
+                """UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   lease_until = NULL, error = ?, updated = ? WHERE id = ? AND worker = ?""",
+                (self.max_attempts, str(error)[:500], time.time(), job_id, worker))
+
+    def counts(self):
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'expired' ELSE status END, COUNT(*)
+                   FROM jobs GROUP BY 1""", (now,)).fetchall()
+        return dict(rows)
+
+    def drained(self):
+        counts = self.counts()
+        return not counts.get("pending") and not counts.get("leased") and not counts.get("expired")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+QUEUE_BACKENDS = {"sqlite": SqliteJobQueue}
+
+def open_queue(spec="data/crawl_jobs.db", **kwargs):
+    """'sqlite:///data/crawl_jobs.db', or '<scheme>://...' for a backend registered in QUEUE_BACKENDS."""
+    scheme, sep, rest = spec.partition("://")
+    if not sep: return SqliteJobQueue(spec, **kwargs)
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown job queue backend '{scheme}' (known: {', '.join(QUEUE_BACKENDS)})")
+    if scheme == "sqlite": rest = rest[1:] if rest.startswith("/") else rest
+    return QUEUE_BACKENDS[scheme](rest, **kwargs)
@@ -0,0 +1,327 @@
+import glob
+import gzip
+import itertools
+import json
+import os
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import article_store
+
+class TickerShardWriter:
+    """Append-only NDJSON shards for one ticker: part-<run>-<n>.ndjson[.gz], rotated by size."""
+
+    def __init__(self, folder, run_id, max_bytes, compress, checkpoint_seconds):
+        self.folder = folder
+        self.run_id = run_id
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.checkpoint_seconds = checkpoint_seconds
+        self.lock = threading.Lock()
+        self.index = 0
+        self.records = 0
+        self.fh = None
+        self.shards = []
+        self.last_checkpoint = time.time()
+        os.makedirs(folder, exist_ok=True)
+        self.open_next()
+
+    def open_next(self):
+        if self.fh: self.fh.close()
+        self.index += 1
+        path = os.path.join(self.folder, f"part-{self.run_id}-{self.index:04d}.ndjson" + (".gz" if self.compress else ""))
+        self.fh = gzip.open(path, "at", encoding="utf-8") if self.compress else open(path, "a", encoding="utf-8")
+        self.bytes = 0
+        self.shards.append(os.path.basename(path))
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.fh.write(line)
+            self.bytes += len(line)
+            self.records += 1
+            if self.bytes >= self.max_bytes: self.open_next()
+            if time.time() - self.last_checkpoint >= self.checkpoint_seconds: self.checkpoint()
+
+    def checkpoint(self):
+        # Everything written before the checkpoint survives a crash (gzip is sync-flushed)
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        name = os.path.join(self.folder, f"_checkpoint-{self.run_id}.json")
+        tmp = name + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"run_id": self.run_id, "records": self.records, "shards": self.shards, "updated": time.time()}, f)
+        os.replace(tmp, name)
+        self.last_checkpoint = time.time()
+
+    def close(self):
+        with self.lock:
+            self.checkpoint()
+            self.fh.close()
+
+class ShardedNDJSONWriter:
+    def __init__(self, output_folder="data/output", max_bytes=64 * 1024 * 1024, compress=False, checkpoint_seconds=30):
+        self.shard_root = os.path.join(output_folder, "shards")
+        # Unique per process, so several crawl workers can stream into one shared output folder
+        self.run_id = f"{time.strftime('%Y%m%d%H%M%S')}-{socket.gethostname()}-{os.getpid()}"
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.checkpoint_seconds = checkpoint_seconds
+        self.lock = threading.Lock()
+        self.writers = {}
+
+    def writer(self, ticker):
+        with self.lock:
+            if ticker not in self.writers:
+                self.writers[ticker] = TickerShardWriter(
+                    os.path.join(self.shard_root, ticker), self.run_id,
+                    self.max_bytes, self.compress, self.checkpoint_seconds)
+            return self.writers[ticker]
+
+    def write(self, ticker, record):
+        self.writer(ticker).write(record)
+
+    def close(self, ticker):
+        with self.lock:
+            writer = self.writers.pop(ticker, None)
+        if writer: writer.close()
+        return writer.records if writer else 0
+
+    def close_all(self):
+        for ticker in list(self.writers):
+            self.close(ticker)
+
+def iter_shard(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # half-written last line of a crashed run
+    except (EOFError, gzip.BadGzipFile):
+        return  # gzip shard cut off after its last sync flush
+
+def merge_record(merged, record):
+    # Records of one URL are folded into one; "_tag" lines only carry extra keywords for it
+    url = record["url"]
+    keywords = record.get("keywords") or ([record["keyword"]] if record.get("keyword") else [])
+    current = merged.get(url)
+    if current is None:
+        merged[url] = dict(record, keywords=list(keywords))
+        return
+    combined = current["keywords"] + [k for k in keywords if k not in current["keywords"]]
+    if current.get("_tag") and not record.get("_tag"):
+        merged[url] = dict(record, keywords=combined)
+    else:
+        current["keywords"] = combined
+
+def collapse_clusters(records):
+    """Keep one record per near-duplicate cluster: the canonical copy if present, else the oldest.
+
+    The kept record gets the union of the cluster's keywords and the other URLs in duplicate_urls.
+    """
+    clusters, results = {}, []
+    for record in sorted(records, key=lambda r: (bool(r.get("duplicate_of")), r.get("published_date", ""))):
+        cluster_id = record.get("cluster_id")
+        if cluster_id is None:
+            results.append(record)
+            continue
+        kept = clusters.get(cluster_id)
+        if kept is None:
+            clusters[cluster_id] = record
+            results.append(record)
+            continue
+        kept["keywords"] = kept["keywords"] + [k for k in record["keywords"] if k not in kept["keywords"]]
+        urls = kept.get("duplicate_urls") or []
+        kept["duplicate_urls"] = urls + [u for u in [record["url"]] + (record.get("duplicate_urls") or []) if u not in urls]
+    return results
+
+JSON_SKIP = re.compile(r"[\s,]*")
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """The objects of a JSON array file (e.g. {ticker}_news.json) decoded one by one, not json.load-ed at once."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos = f.read(chunk_size).lstrip(), 0
+        if not buf.startswith("["): raise ValueError(f"{path} is not a JSON array")
+        pos = 1
+        while True:
+            pos = JSON_SKIP.match(buf, pos).end()
+            if buf.startswith("]", pos): return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = f.read(chunk_size)
+                if not more: raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+def write_json_array(path, records):
+    """json.dump(list(records), indent=4) without the list: records are written as they come."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for record in records:
+            f.write(("\n" if first else ",\n") + "\n".join("    " + line for line in
+                                                            json.dumps(record, ensure_ascii=False, indent=4).split("\n")))
+            first = False
+        f.write("]" if first else "\n]")
+    os.replace(tmp, path)
+
+class MonthSpill:
+    """Records of one ticker bucketed into one NDJSON file per publication month, so compaction
+    holds a single month of bodies in memory instead of the ticker's whole history."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.files = {}
+
+    def path(self, month):
+        return os.path.join(self.folder, f"month={month}.ndjson")
+
+    def write(self, month, record):
+        if month not in self.files: self.files[month] = open(self.path(month), "a", encoding="utf-8")
+        self.files[month].write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def months(self, reverse=False):
+        # Undated records ("unknown") sort as the oldest, as their empty date did in the old full sort
+        for fh in self.files.values(): fh.close()
+        return sorted(self.files, key=lambda m: "" if m == "unknown" else m, reverse=reverse)
+
+    def read(self, month):
+        return list(iter_shard(self.path(month)))
+
+    def replace(self, month, records):
+        with open(self.path(month), "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def compact(output_folder, ticker, merge_existing=False, remove_shards=True, store_dir=None, write_json=True,
+            near_dup=None, collapse=False):
+    """Fold a ticker's shards into the sorted, URL-deduplicated {ticker}_news.json and/or the
+    ticker's partitions of the Parquet article store.
+
+    With a NearDupIndex, records not clustered yet get cluster_id / duplicate_of (oldest first, so
+    the earliest copy is canonical); collapse then also folds each near-duplicate cluster.
+
+    Records are spilled to one file per publication month and merged a month at a time; only the
+    URL -> month map, tag keywords and (for collapse) each record's cluster and keywords stay in memory.
+    """
+    shard_folder = os.path.join(output_folder, "shards", ticker)
+    shard_paths = sorted(glob.glob(os.path.join(shard_folder, "part-*.ndjson*")))
+    output_file = os.path.join(output_folder, f"{ticker}_news.json")
+
+    sources = []
+    if merge_existing and os.path.exists(output_file): sources.append(iter_json_array(output_file))
+    if merge_existing and store_dir: sources.append(article_store.iter_records(store_dir, ticker))
+    sources.extend(iter_shard(path) for path in shard_paths)
+
+    os.makedirs(output_folder, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=f".compact-{ticker}-", dir=output_folder) as tmp:
+        spill = MonthSpill(tmp)
+        # A URL stays in the month of its first full record; "_tag" lines only carry extra keywords for it
+        url_month, tags = {}, {}
+        for record in itertools.chain.from_iterable(sources):
+            if record.get("_tag"):
+                keywords = tags.setdefault(record["url"], [])
+                keywords.extend(k for k in record.get("keywords") or [] if k not in keywords)
+            else:
+                month = url_month.setdefault(record["url"], article_store.month_of(record.get("published_date")))
+                spill.write(month, record)
+
+        # Oldest month first: merge each month's copies of a URL, cluster, and note what collapse needs
+        columns, samples, clusters = {}, {}, []
+        for month in spill.months():
+            merged = {}
+            for record in spill.read(month):
+                merge_record(merged, record)
+            results = sorted(merged.values(), key=lambda r: r.get("published_date", "") or "")
+            for record in results:
+                extra = [k for k in tags.get(record["url"], []) if k not in record["keywords"]]
+                if extra: record["keywords"] = record["keywords"] + extra
+                if near_dup and record.get("cluster_id") is None:
+                    record.update(near_dup.assign(record["url"], record.get("content")) or {})
+                for k, v in record.items():
+                    columns.setdefault(k, None)
+                    if v is not None: samples.setdefault(k, v)
+                if collapse:
+                    clusters.append({k: record.get(k) for k in
+                                     ("url", "cluster_id", "duplicate_of", "published_date", "keywords", "duplicate_urls")})
+            spill.replace(month, results)
+        kept = None
+        if collapse:
+            kept = {r["url"]: r for r in collapse_clusters(clusters)}
+            for r in kept.values():
+                if r.get("duplicate_urls"):
+                    columns.setdefault("duplicate_urls", None)
+                    samples.setdefault("duplicate_urls", r["duplicate_urls"])
+        del clusters, url_month, tags
+
+        counts = {}
+        def final(month):
+            records = []
+            for record in spill.read(month):
+                if kept is not None:
+                    if record["url"] not in kept: continue
+                    record["keywords"] = kept[record["url"]]["keywords"]
+                    if kept[record["url"]].get("duplicate_urls"): record["duplicate_urls"] = kept[record["url"]]["duplicate_urls"]
+                records.append(record)
+            counts[month] = len(records)
+            return records
+
+        def newest_first():
+            for month in spill.months(reverse=True):
+                yield from sorted(final(month), key=lambda x: x.get("published_date", "") or "", reverse=True)
+
+        if write_json:
+            write_json_array(os.path.join(output_folder, f"{ticker}_news.json"), newest_first())
+        if store_dir:
+            schema = article_store.column_schema([c for c in columns if c not in ("ticker", "month")], samples)
+            output_file = article_store.write_ticker_months(
+                store_dir, ticker, ((month, final(month)) for month in spill.months()), schema)
+        total = sum(counts.values())
+
+    if remove_shards:
+        for path in shard_paths + glob.glob(os.path.join(shard_folder, "_checkpoint*.json")):
+            os.remove(path)
+    return output_file, total
+
+def compact_options(config):
+    """compact() keyword arguments for a pipeline config (OUTPUT_FORMAT, ARTICLE_STORE, NEAR_DUP);
+    the NearDupIndex itself is passed separately."""
+    output_format = config.get("OUTPUT_FORMAT", "parquet").lower()
+    return {
+        "store_dir": config.get("ARTICLE_STORE", "data/articles") if output_format in ("parquet", "both") else None,
+        "write_json": output_format in ("json", "both"),
+        "collapse": config.get("NEAR_DUP", "off").lower() == "collapse",
+    }
+
+if __name__ == "__main__":
+    # python src/ndjson_store.py [--config config.txt] [TICKER ...]  -> compact leftover shards (e.g. after a crash)
+    # into the same outputs a finished run writes, merged with what is already saved
+    import argparse
+    from news_pipeline_multithread import load_config
+    from near_dup import NearDupIndex
+    parser = argparse.ArgumentParser(description="Compact leftover NDJSON shards into the configured outputs")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--config", default="config.txt")
+    parser.add_argument("--folder", default="", help="shard output folder (default: OUTPUT_FOLDER)")
+    args = parser.parse_args()
+    config = load_config(args.config)
+    if config is None: sys.exit(1)
+    folder = args.folder or config.get("OUTPUT_FOLDER", "data/output")
+    tickers = args.tickers or sorted(os.listdir(os.path.join(folder, "shards")))
+    near_dup = NearDupIndex.from_config(config)
+    for t in tickers:
+        out, n = compact(folder, t, merge_existing=True, near_dup=near_dup, **compact_options(config))
+        print(f"{t}: {n} articles -> {out}")
+    if near_dup: near_dup.close()
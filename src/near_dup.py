@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+from article_memo import normalize_url
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+class MinHasher:
+    """MinHash signatures over word shingles, with multiply-shift hashing so signatures are stable across runs."""
+
+    def __init__(self, num_perm=128, shingle=3, seed=403):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.shingle = shingle
+
+    def shingles(self, text):
+        words = WORD_RE.findall(text.lower())
+        if not words: return set()
+        n = min(self.shingle, len(words))
+        return {zlib.crc32(" ".join(words[i:i + n]).encode("utf-8")) for i in range(len(words) - n + 1)}
+
+    def signature(self, text):
+        hashes = self.shingles(text)
+        if not hashes: return None
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        # uint64 products wrap around on purpose: ((a * x + b) mod 2^64) >> 32 is the multiply-shift family
+        return ((np.outer(x, self.a) + self.b) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+class NearDupIndex:
+    """SQLite-backed MinHash + LSH index that clusters republished copies of the same article.
+
+    The first article of a cluster is its canonical copy and the cluster id is that article's row id,
+    so clusters keep growing across runs. A new article joins the cluster of its most similar
+    LSH candidate when their estimated Jaccard similarity reaches threshold.
+
+    Articles are assigned when a ticker's shards are compacted, not while they are crawled.
+    Inserts are committed commit_every at a time, holding the write lock in between.
+    """
+
+    def __init__(self, path="data/near_dup.db", threshold=0.7, num_perm=128, bands=32, shingle=3, commit_every=200, timeout=60):
+        if num_perm % bands: raise ValueError("num_perm must be a multiple of bands")
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.hasher = MinHasher(num_perm, shingle)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.commit_every = commit_every
+        self.pending = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS docs (
+            id INTEGER PRIMARY KEY, url TEXT UNIQUE, cluster_id INTEGER, signature BLOB)""")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS buckets (key INTEGER, doc INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key)")
+        self.conn.commit()
+
+    @classmethod
+    def from_config(cls, config):
+        if config.get("NEAR_DUP", "off").lower() == "off": return None
+        return cls(config.get("NEAR_DUP_DB", "data/near_dup.db"), threshold=float(config.get("NEAR_DUP_THRESHOLD", 0.7)),
+                   commit_every=config.get("DB_COMMIT_EVERY", 200))
+
+    def band_keys(self, signature):
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8, person=band.to_bytes(2, "little")).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def lookup(self, key):
+        row = self.conn.execute(
+            "SELECT d.cluster_id, c.url FROM docs d JOIN docs c ON c.id = d.cluster_id WHERE d.url = ?", (key,)).fetchone()
+        return row and {"cluster_id": row[0], "duplicate_of": "" if row[1] == key else row[1]}
+
+    def best_match(self, signature, keys):
+        marks = ",".join("?" * len(keys))
+        candidates = self.conn.execute(
+            f"SELECT cluster_id, signature FROM docs WHERE id IN (SELECT doc FROM buckets WHERE key IN ({marks}))",
+            keys).fetchall()
+        if not candidates: return None
+        # All candidates scored in one array op; boilerplate-heavy sources put hundreds in the same buckets
+        signatures = np.frombuffer(b"".join(blob for _, blob in candidates), dtype=np.uint32).reshape(len(candidates), -1)
+        scores = (signatures == signature).mean(axis=1)
+        best = int(np.argmax(scores))
+        return candidates[best][0] if scores[best] >= self.threshold else None
+
+    def assign(self, url, text):
+        """Cluster of the article at url: {"cluster_id", "duplicate_of"} ("" for the canonical copy), or None without text."""
+        key = normalize_url(url)
+        with self.lock:
+            known = self.lookup(key)
+        if known: return known
+        signature = self.hasher.signature(text or "")
+        if signature is None: return None
+        keys = self.band_keys(signature)
+        with self.lock:
+            # Write lock first, so the lookup, match and insert below see every other process's commits
+            if not self.conn.in_transaction: self.conn.execute("BEGIN IMMEDIATE")
+            # Another thread or process may have stored the same URL while the signature was computed
+            known = self.lookup(key)
+            if known:
+                if not self.pending: self.conn.commit()
+                return known
+            cluster_id = self.best_match(signature, keys)
+            cur = self.conn.execute("INSERT INTO docs (url, cluster_id, signature) VALUES (?, ?, ?)",
+                                    (key, cluster_id, signature.tobytes()))
+            doc = cur.lastrowid
+            if cluster_id is None:
+                self.conn.execute("UPDATE docs SET cluster_id = ? WHERE id = ?", (doc, doc))
+                result = {"cluster_id": doc, "duplicate_of": ""}
+            else:
+                self.duplicates += 1
+                result = {"cluster_id": cluster_id,
+                          "duplicate_of": self.conn.execute("SELECT url FROM docs WHERE id = ?", (cluster_id,)).fetchone()[0]}
+            self.conn.executemany("INSERT INTO buckets VALUES (?, ?)", [(k, doc) for k in keys])
+            self.inserted += 1
+            self.pending += 1
+            if self.pending >= self.commit_every:
+                self.conn.commit()
+                self.pending = 0
+        return result
+
+    def report(self):
+        rate = 100 * self.duplicates / self.inserted if self.inserted else 0
+        print(f"Near-dup index: {self.inserted} new articles, {self.duplicates} near-duplicates ({rate:.1f}%)")
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,60 @@
+"""On-disk cache of NER output per article text, so re-running NER.py only redoes the cheap steps.
+
+    cache = NerCache("data/NER_processed/ner_cache.db", version="underthesea 6.8.4/spans-1")
+    keys = [cache.key(text) for text in texts]
+    known = cache.get_many(keys)            # {key: spans} for the texts seen before
+    cache.put_many({key: spans, ...})
+
+A key is the sha1 of the version string and the text, so editing an article or upgrading the
+NER model misses the cache by itself. What is stored is up to the caller (NER.py keeps the raw
+entity spans, before the blacklist), as long as it is JSON.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+SQL_BATCH = 500  # stays under SQLite's bound-variable limit
+
+class NerCache:
+    def __init__(self, path="data/NER_processed/ner_cache.db", version=""):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.version = version
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ner (key TEXT PRIMARY KEY, spans TEXT)")
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        return hashlib.sha1(f"{self.version}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), SQL_BATCH):
+                chunk = keys[i:i + SQL_BATCH]
+                rows = self.conn.execute(
+                    f"SELECT key, spans FROM ner WHERE key IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+                found.update((k, json.loads(v)) for k, v in rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO ner (key, spans) VALUES (?, ?)",
+                                  [(k, json.dumps(v, ensure_ascii=False)) for k, v in items.items()])
+            self.conn.commit()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        print(f"NER cache: {self.hits} hits / {self.misses} misses ({rate:.1f}% of NER calls saved)")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,17 +1,30 @@
 import requests
-from bs4 import BeautifulSoup
 import time
 import random
 from datetime import datetime, timedelta
 from fake_useragent import UserAgent
 import json
 import re
-import concurrent.futures
 import os
 import glob
 import threading
-from queue import Queue
 from typing import List, Dict
+from urllib.parse import urlsplit
+from rate_limiter import HostRateLimiter
+from connection_pool import HostConnectionManager
+from resilience import RetryPolicy, SourceBreakers, ProxyPool, RETRYABLE_STATUS, retry_after
+from telemetry import CrawlTelemetry
+from token_provider import TokenProvider, jwt_expiry
+from crawl_scheduler import CrawlScheduler, CrawlBudget, PRIORITY_ARTICLE, PRIORITY_LISTING, PRIORITY_SEED
+from url_frontier import UrlFrontier
+from article_memo import ArticleMemo
+from near_dup import NearDupIndex
+from response_cache import ResponseCache
+from ndjson_store import ShardedNDJSONWriter, compact, compact_options
+from html_parser import parse_html
+
+# In this order; a time-budgeted crawl also searches them in this order (tier 0 first)
+KEYWORD_GROUPS = ("keywords_direct", "keywords_competitors", "keywords_macro")
 
 def load_keywords_from_folder(keywords_folder="data/keywords"):
     keywords_data = []
@@ -22,13 +35,16 @@ def load_keywords_from_folder(keywords_folder="data/keywords"):
                 data = json.load(f)
                 ticker = data.get("ticker", "")
                 all_keywords = []
-                all_keywords.extend(data.get("keywords_direct", []))
-                all_keywords.extend(data.get("keywords_competitors", []))
-                all_keywords.extend(data.get("keywords_macro", []))
+                tiers = {}
+                for tier, group in enumerate(KEYWORD_GROUPS):
+                    for keyword in data.get(group, []):
+                        all_keywords.append(keyword)
+                        tiers.setdefault(keyword, tier)
                 
                 keywords_data.append({
                     "ticker": ticker,
-                    "keywords": all_keywords
+                    "keywords": all_keywords,
+                    "tiers": tiers
                 })
                 print(f"Loaded {len(all_keywords)} keywords for {ticker}")
         return keywords_data
@@ -36,6 +52,32 @@ def load_keywords_from_folder(keywords_folder="data/keywords"):
         print(f"Error loading keywords: {e}")
         return []
 
+def build_keyword_plan(keywords_data):
+    """Union of every ticker's keywords: [(keyword, [tickers])], each keyword crawled once.
+
+    Keywords that differ only in case or spacing are the same search, the first spelling wins.
+    """
+    plan, index = [], {}
+    for ticker_data in keywords_data:
+        for keyword in ticker_data["keywords"]:
+            key = " ".join(keyword.split()).lower()
+            if not key: continue
+            if key not in index:
+                index[key] = (keyword, [])
+                plan.append(index[key])
+            if ticker_data["ticker"] not in index[key][1]:
+                index[key][1].append(ticker_data["ticker"])
+    return plan
+
+def keyword_tiers(keywords_data):
+    """{normalized keyword: best tier any ticker gives it}, matching build_keyword_plan's spelling rule."""
+    tiers = {}
+    for ticker_data in keywords_data:
+        for keyword, tier in ticker_data.get("tiers", {}).items():
+            key = " ".join(keyword.split()).lower()
+            tiers[key] = min(tier, tiers.get(key, tier))
+    return tiers
+
 def load_config(config_file="config.txt"):
     config = {}
     try:
@@ -46,9 +88,15 @@ def load_config(config_file="config.txt"):
                 if "=" in line:
                     key, value = line.split("=", 1)
                     key, value = key.strip(), value.strip()
-                    if key in ["START_YEAR", "MAX_PAGES", "MAX_WORKERS"]:
+                    if key in ["START_YEAR", "MAX_PAGES", "MAX_WORKERS", "ASYNC_CONCURRENCY",
+                               "SCHEDULER_WORKERS", "SCHEDULER_QUEUE_SIZE", "SHARD_MAX_MB", "CHECKPOINT_SECONDS",
+                               "PAGE_WINDOW", "MAX_RETRIES", "BREAKER_THRESHOLD", "BREAKER_COOLDOWN", "REQUEST_TIMEOUT",
+                               "TELEMETRY_SECONDS", "AUTH_TOKEN_TTL",
+                               "PARSE_WORKERS", "PARSE_QUEUE_SIZE",
+                               "JOB_LEASE_SECONDS", "JOB_MAX_ATTEMPTS", "WORKER_THREADS",
+                               "CRAWL_BUDGET_SECONDS", "CRAWL_BUDGET_RESERVE", "DB_COMMIT_EVERY", "MEMO_BODIES"]:
                         config[key] = int(value)
-                    elif key == "USE_PROXY":
+                    elif key in ["USE_PROXY", "INCREMENTAL", "SHARD_GZIP"]:
                         config[key] = value.lower() == "true"
                     else:
                         config[key] = value
@@ -63,48 +111,136 @@ def load_proxies(proxy_file):
             return [line.strip() for line in f if line.strip()]
     except: return []
 
+def make_response(url, status_code, content, headers=None, encoding=None):
+    # Wrap raw bytes in a requests.Response so every engine honours the same request() contract
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.encoding = encoding or requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+def proxy_for_requests(proxy):
+    return {"http": f"http://{proxy}", "https": f"http://{proxy}"} if proxy else None
+
 class CrawlerEngine:
-    def __init__(self, use_proxy=False, proxy_file=""):
+    def __init__(self, use_proxy=False, proxy_file="", rate_limiter=None, local_mirror="", cache=None,
+                 retry=None, breakers=None, proxy_pool=None, timeout=15, telemetry=None, connections=None):
         self.ua = UserAgent()
         self.use_proxy = use_proxy
-        self.proxies = load_proxies(proxy_file) if use_proxy else []
-        self.session_pool = Queue()
-        for _ in range(20):
-            self.session_pool.put(requests.Session())
-
-    def get_session(self):
-        return self.session_pool.get()
-
-    def return_session(self, session):
-        self.session_pool.put(session)
-
-    def get_random_proxy(self):
-        if not self.use_proxy or not self.proxies: return None
-        p = random.choice(self.proxies)
-        return {"http": f"http://{p}", "https": f"http://{p}"}
-
-    def request(self, url, params=None, method="GET", headers=None, data=None, json_data=None):
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool(load_proxies(proxy_file) if use_proxy else [])
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.retry = retry or RetryPolicy(max_retries=0)
+        self.breakers = breakers
+        self.timeout = timeout
+        self.telemetry = telemetry
+        self.local_mirror = local_mirror.rstrip("/")
+        self.connections = connections or HostConnectionManager()
+
+    def get_proxy(self):
+        return self.proxy_pool.pick() if self.use_proxy else None
+
+    def rewrite_url(self, url):
+        # LOCAL_MIRROR=http://127.0.0.1:8000 turns https://cafef.vn/x into http://127.0.0.1:8000/cafef.vn/x
+        if not self.local_mirror: return url
+        parts = urlsplit(url)
+        rest = parts.path + (f"?{parts.query}" if parts.query else "")
+        return f"{self.local_mirror}/{parts.netloc}{rest}"
+
+    def cached_response(self, entry):
+        return make_response(entry["url"], 200, self.cache.load_body(entry), entry["headers"])
+
+    def request(self, url, params=None, method="GET", headers=None, data=None, json_data=None, reauth=None):
         if not headers: headers = {}
         if 'User-Agent' not in headers: headers['User-Agent'] = self.ua.random
-        
-        session = self.get_session()
-        try:
-            time.sleep(random.uniform(0.5, 1.5))
-            if method == "GET":
-                response = session.get(url, params=params, headers=headers, proxies=self.get_random_proxy(), timeout=15)
-            else:
-                response = session.post(url, data=data, json=json_data, headers=headers, proxies=self.get_random_proxy(), timeout=15)
-            return response if response.status_code == 200 else None
-        except:
-            return None
-        finally:
-            self.return_session(session)
+
+        entry = None
+        if self.cache:
+            key = self.cache.key(url, params, method, data, json_data)
+            entry = self.cache.lookup(key)
+            if self.cache.replay:
+                self.cache.count("hits" if entry else "misses")
+                if self.telemetry: self.telemetry.record_request(url, "cache" if entry else "cache_miss")
+                return self.cached_response(entry) if entry else None
+            if entry and method == "GET": headers.update(self.cache.conditional_headers(entry))
+
+        original_url, url = url, self.rewrite_url(url)
+        breaker = self.breakers.breaker(original_url) if self.breakers else None
+
+        for attempt in self.retry.attempts():
+            if attempt:
+                self.retry.count("retried")
+                if self.telemetry: self.telemetry.record_retry(original_url)
+                time.sleep(self.retry.delay(attempt - 1))
+            # A paused source holds its callers here instead of burning timeouts on it
+            while breaker and (wait := breaker.wait_time()) > 0:
+                time.sleep(wait)
+            # Wait for the source's politeness budget before taking a pooled connection
+            if self.rate_limiter: self.rate_limiter.acquire(original_url)
+
+            proxy = self.get_proxy()
+            session = self.connections.session
+            start = time.monotonic()
+            try:
+                if method == "GET":
+                    response = session.get(url, params=params, headers=headers, proxies=proxy_for_requests(proxy), timeout=self.timeout)
+                else:
+                    response = session.post(url, data=data, json=json_data, headers=headers, proxies=proxy_for_requests(proxy), timeout=self.timeout)
+            except Exception:
+                # With proxies a timeout says more about the proxy than about the site
+                self.proxy_pool.report_result(proxy, False, time.monotonic() - start)
+                if breaker: breaker.record("neutral" if proxy else "fail")
+                if self.telemetry: self.telemetry.record_request(original_url, "error", time.monotonic() - start)
+                continue
+
+            self.proxy_pool.report_result(proxy, True, time.monotonic() - start)
+            status = response.status_code
+            if self.telemetry: self.telemetry.record_request(original_url, status, time.monotonic() - start, len(response.content))
+            if breaker: breaker.record("fail" if status in RETRYABLE_STATUS else "ok", retry_after(response.headers))
+            if status in RETRYABLE_STATUS: continue
+            if status in (401, 403) and reauth:
+                # Expired or revoked credential: the spider refreshes it and rebuilds the request, once
+                fresh = reauth()
+                return self.request(**fresh) if fresh else None
+            if status == 304 and entry:
+                self.cache.count("revalidated")
+                return self.cached_response(entry)
+            if status != 200: return None
+            if self.cache:
+                self.cache.count("misses")
+                self.cache.store(key, original_url, 200, response.content, response.headers)
+            return response
+
+        self.retry.count("gave_up")
+        return None
 
 class BaseSpider:
-    def __init__(self, engine, config):
+    source_name = "Base"
+    hosts = ()
+
+    def __init__(self, engine, config, scheduler=None, frontier=None, memo=None, sink=None, ticker="", telemetry=None, tokens=None,
+                 tickers=None, parse_pool=None, budget=None, tier=0):
         self.engine = engine
         self.config = config
-        self.source_name = "Base"
+        self.scheduler = scheduler
+        self.frontier = frontier
+        self.memo = memo
+        self.sink = sink
+        # One crawl of a keyword serves every ticker that asked for it
+        self.tickers = list(tickers) if tickers else [ticker]
+        self.ticker = self.tickers[0]
+        self.telemetry = telemetry
+        self.tokens = tokens
+        self.parse_pool = parse_pool
+        self.budget = budget
+        self.tier = tier
+        self.incremental = bool(frontier) and config.get("INCREMENTAL", False)
+        self.exhausted = False
+        self.page_iter = None
+        self.keyword = None
+        self.listing_requests = 0
         self.crawled_data = []
         self.seen_urls = set()
         self.lock = threading.Lock()
@@ -118,34 +254,221 @@ class BaseSpider:
         except: pass
         return None
 
-    def add_item(self, title, url, pub_date, content, keyword):
+    def add_item(self, title, url, pub_date, content, keyword, source=None, tickers=None):
         try:
             date_std = pub_date.strftime('%Y-%m-%d') if isinstance(pub_date, datetime) else str(pub_date)
         except: date_std = ""
 
-        with self.lock:
-            self.crawled_data.append({
-                "source": self.source_name,
+        records = {}
+        for ticker in tickers or self.tickers:
+            record = {
+                "source": source or self.source_name,
                 "keyword": keyword,
+                "keywords": [keyword],
                 "title": title.strip(),
                 "url": url,
                 "published_date": date_std,
-                "content": content.strip()
-            })
+                "content": content.strip(),
+                "ticker": ticker
+            }
+            if self.sink: self.sink.write(ticker, record)
+            else:
+                with self.lock:
+                    self.crawled_data.append(record)
+            records[ticker] = record
+        if self.frontier: self.frontier.mark(url, source or self.source_name, date_std)
+        if self.telemetry: self.telemetry.record_article(source or self.source_name)
+        return records
+
+    def tag_item(self, record, keyword):
+        with self.lock:
+            if keyword in record["keywords"]: return
+            record["keywords"].append(keyword)
+        # Streamed records can't be edited in place; compaction folds the tag into them
+        ticker = record.get("ticker", self.ticker)
+        if self.sink: self.sink.write(ticker, {"url": record["url"], "ticker": ticker, "keywords": [keyword], "_tag": True})
 
     def is_url_seen(self, url):
         with self.lock:
             if url in self.seen_urls:
                 return True
             self.seen_urls.add(url)
-            return False
+        return self.incremental and self.frontier.seen_before(url)
+
+    def reached_cutoff(self, dt, keyword):
+        # Called with listing-page dates: past START_YEAR, or (incremental) older than the
+        # newest article of the previous run, there is nothing new left to paginate into.
+        if self.frontier: self.frontier.advance_watermark(self.source_name, keyword, dt.strftime('%Y-%m-%d'))
+        cutoff = dt.year < self.config["START_YEAR"]
+        if not cutoff and self.incremental:
+            mark = self.frontier.watermark(self.source_name, keyword)
+            cutoff = bool(mark) and dt.strftime('%Y-%m-%d') < mark
+        if cutoff: self.exhausted = True
+        return cutoff
+
+    def parse_html(self, content):
+        return parse_html(content, self.config.get("HTML_PARSER"))
+
+    def timed(self, kind, fn, *args):
+        if not self.telemetry: return fn(*args)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.telemetry.record_parse(self.source_name, kind, time.perf_counter() - start)
+
+    # The hooks below describe a source without doing any I/O, so the threaded
+    # driver here and the asyncio driver in async_crawler.py share one extractor.
+    def pages(self):
+        return range(1, self.config["MAX_PAGES"] + 1)
+
+    def auth_request(self, keyword):
+        return None
+
+    def parse_auth(self, res, keyword):
+        return {}
 
-    def crawl(self, keyword): pass
+    def auth_context(self, auth, keyword):
+        # Per-keyword request context built from a credential shared by all keywords of the source
+        return dict(auth)
+
+    def page_request(self, keyword, page, ctx):
+        raise NotImplementedError
+
+    def parse_page(self, res, keyword, ctx):
+        return []
+
+    def article_request(self, job, ctx):
+        return {"url": job["url"]}
+
+    def parse_article(self, res, job):
+        return None
+
+    def article_fallback(self, job):
+        return None
+
+    def emit(self, item, keyword):
+        if item: self.add_item(item["title"], item["url"], item["pub_date"], item["content"], keyword)
+
+    def fetch_auth(self, keyword):
+        res = self.engine.request(**self.auth_request(keyword))
+        return self.timed("auth", self.parse_auth, res, keyword) if res else None
+
+    def with_auth(self, auth, keyword):
+        return dict(self.auth_context(auth, keyword), auth=auth) if auth else None
+
+    def prepare(self, keyword):
+        if self.auth_request(keyword) is None: return {}
+        fetch = lambda: self.fetch_auth(keyword)
+        return self.with_auth(self.tokens.get(self.source_name, fetch) if self.tokens else fetch(), keyword)
+
+    def reauth(self, keyword, ctx, rebuild):
+        # Handed to engine.request: on 401/403 refresh the credential, update ctx and rebuild the request
+        if "auth" not in ctx: return None
+        def retry():
+            fetch = lambda: self.fetch_auth(keyword)
+            fresh = self.with_auth(self.tokens.refresh(self.source_name, ctx["auth"], fetch) if self.tokens else fetch(), keyword)
+            if not fresh: return None
+            ctx.update(fresh)
+            return rebuild()
+        return retry
+
+    def submit(self, priority, fn, *args):
+        # Without a scheduler (one-off runs, benchmarks) the spider simply crawls serially
+        if self.scheduler: self.scheduler.submit(priority, fn, *args)
+        else: fn(*args)
+
+    def page_window(self):
+        # Listing pages fetched ahead of the one being parsed; serial runs go strictly page by page
+        return max(1, self.config.get("PAGE_WINDOW", 2)) if self.scheduler else 1
+
+    def page_depth(self, page):
+        return max(0, page - self.pages()[0]) if page is not None else 0
+
+    def priority(self, kind, page=None):
+        # Time-budgeted runs order by (page depth, listing before article, keyword tier): page 1 of
+        # every search first, direct keywords before competitors/macro, deeper pages last
+        if not self.budget: return kind
+        return (self.page_depth(page), 1 if kind == PRIORITY_ARTICLE else 0, self.tier)
+
+    def next_page(self):
+        # Pages are handed out one at a time, so once the spider is exhausted nothing more is fetched
+        with self.lock:
+            if self.exhausted or self.page_iter is None: return None
+            page = next(self.page_iter, None)
+            # Past page 1 a listing is only opened while the budget leaves time to fetch its articles
+            if page is not None and self.budget and self.page_depth(page) and not self.budget.allows_deeper():
+                page = None
+                self.cut_short()
+            if page is not None: self.listing_requests += 1
+            return page
+
+    def cut_short(self):
+        # The budget stopped this listing before its natural end: the pages not reached must still be
+        # crawled by the next incremental run, so this run's newest date must not become the watermark
+        if self.frontier and self.keyword is not None: self.frontier.hold_watermark(self.source_name, self.keyword)
+
+    def page_done(self, res, jobs):
+        # A page with nothing new (no results, only repeats, or last run's articles) ends the listing
+        if res is not None and not jobs: self.exhausted = True
+
+    def crawl(self, keyword):
+        self.keyword = keyword
+        ctx = self.prepare(keyword)
+        if ctx is None: return
+
+        self.page_iter = iter(self.pages())
+        for _ in range(self.page_window()):
+            page = self.next_page()
+            if page is None: break
+            self.submit(self.priority(PRIORITY_LISTING, page), self.crawl_page, keyword, page, ctx)
+
+    def fetch_listing(self, keyword, page, ctx):
+        rebuild = lambda: self.page_request(keyword, page, ctx)
+        res = self.engine.request(**rebuild(), reauth=self.reauth(keyword, ctx, rebuild))
+        jobs = self.timed("page", self.parse_page, res, keyword, ctx) if res else []
+        self.page_done(res, jobs)
+        return res, jobs
+
+    def crawl_page(self, keyword, page, ctx):
+        try:
+            if self.exhausted: return
+            _, jobs = self.fetch_listing(keyword, page, ctx)
+            for job in jobs:
+                self.submit(self.priority(PRIORITY_ARTICLE, page), self.process, job, keyword, ctx)
+        finally:
+            page = self.next_page()
+            if page is not None: self.submit(self.priority(PRIORITY_LISTING, page), self.crawl_page, keyword, page, ctx)
+
+    def process(self, job, keyword, ctx):
+        if self.memo and not self.memo.claim(job["url"], self, keyword, (job, ctx)): return
+        self.fetch_article(job, keyword, ctx)
+
+    def fetch_article(self, job, keyword, ctx):
+        rebuild = lambda: self.article_request(job, ctx)
+        res = self.engine.request(**rebuild(), reauth=self.reauth(keyword, ctx, rebuild))
+        handoff = self.finish(job, res, keyword)
+        if handoff:
+            # This fetch failed; the next spider that was waiting on the URL tries it with its own request
+            spider, keyword, job, ctx = handoff
+            spider.submit(spider.priority(PRIORITY_ARTICLE), spider.fetch_article, job, keyword, ctx)
+
+    def finish(self, job, res, keyword):
+        if res and self.parse_pool:
+            # Hand the raw page to the process pool; this I/O thread goes back to downloading and
+            # emits the item when a later submit() or the final join() picks up the parsed result
+            self.parse_pool.submit(self, job, res, lambda item: self.complete(job, item, True, keyword))
+            return None
+        item = self.timed("article", self.parse_article, res, job) if res else self.article_fallback(job)
+        return self.complete(job, item, res is not None, keyword)
+
+    def complete(self, job, item, fetched, keyword):
+        if self.memo: return self.memo.complete(job["url"], item, fetched, self, keyword)
+        self.emit(item, keyword)
 
 class VnExpressSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "VnExpress"
+    source_name = "VnExpress"
+    hosts = ("vnexpress.net",)
 
     def parse_vnexpress_date(self, raw):
         if not raw: return None
@@ -165,127 +488,96 @@ class VnExpressSpider(BaseSpider):
             except: continue
         return None
 
-    def crawl(self, keyword):
-        base_url = "https://timkiem.vnexpress.net/?q={keyword}&page={page}"
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(1, min(self.config["MAX_PAGES"] + 1, 6)):
-                url = base_url.format(keyword=keyword, page=page)
-                futures.append(executor.submit(self.crawl_page, url, keyword))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+    def pages(self):
+        return range(1, min(self.config["MAX_PAGES"] + 1, 6))
 
-    def crawl_page(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
+    def page_request(self, keyword, page, ctx):
+        return {"url": f"https://timkiem.vnexpress.net/?q={keyword}&page={page}"}
 
-        soup = BeautifulSoup(res.content, 'html.parser')
-        articles = soup.find_all("h3", class_="title-news")
-        if not articles: return
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.content)
+        articles = soup.select("h3.title-news")
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for item in articles:
-                a_tag = item.find("a")
-                if not a_tag: continue
-                url_art = a_tag.get('href')
-                
-                if self.is_url_seen(url_art): continue
+        jobs = []
+        for item in articles:
+            a_tag = item.select_one("a")
+            if not a_tag: continue
+            url_art = a_tag.get('href')
+            
+            if self.is_url_seen(url_art): continue
 
-                time_tag = item.find_next("span", class_="time")
-                if not time_tag and item.parent:
-                    time_tag = item.parent.select_one(".time")
-                
-                if time_tag:
-                    try:
-                        d_str = time_tag.text.strip()
-                        d_check = datetime.strptime(d_str, "%d/%m/%Y")
-                        if d_check.year < self.config["START_YEAR"]:
-                            return
-                    except: pass
-
-                article_futures.append(executor.submit(self.process, url_art, keyword))
+            time_tag = item.find_next("span.time")
+            if not time_tag and item.parent:
+                time_tag = item.parent.select_one(".time")
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            if time_tag:
+                try:
+                    d_str = time_tag.text().strip()
+                    d_check = datetime.strptime(d_str, "%d/%m/%Y")
+                    if self.reached_cutoff(d_check, keyword):
+                        break
+                except: pass
 
-    def process(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+            jobs.append({"url": url_art})
+        return jobs
+
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
         
-        date_tag = soup.find("span", class_="date")
-        pub_date = self.parse_vnexpress_date(date_tag.text if date_tag else None)
+        date_tag = soup.select_one("span.date")
+        pub_date = self.parse_vnexpress_date(date_tag.text() if date_tag else None)
         
         if pub_date and pub_date.year < self.config["START_YEAR"]:
-            return
+            return None
         
-        title_tag = soup.find("h1", class_="title-detail")
-        title = title_tag.text.strip() if title_tag else ""
+        title_tag = soup.select_one("h1.title-detail")
+        title = title_tag.text().strip() if title_tag else ""
         
-        content_tag = soup.find("article", class_="fck_detail")
+        content_tag = soup.select_one("article.fck_detail")
         content = ""
         if content_tag:
-            content = " ".join([p.text.strip() for p in content_tag.find_all("p")])
+            content = " ".join([p.text().strip() for p in content_tag.select("p")])
         
-        if title:
-            self.add_item(title, url, pub_date if pub_date else datetime.now(), content, keyword)
+        if not title: return None
+        return {"title": title, "url": job["url"], "pub_date": pub_date if pub_date else datetime.now(), "content": content}
 
 class ThanhNienSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "ThanhNien"
-    
-    def crawl(self, keyword):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(1, self.config["MAX_PAGES"] + 1):
-                futures.append(executor.submit(self.crawl_page, keyword, page))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
-
-    def crawl_page(self, keyword, page):
-        api_url = f"https://thanhnien.vn/timelinesearch/{keyword}/{page}.htm"
-        headers = {'X-Requested-With': 'XMLHttpRequest'}
-        res = self.engine.request(api_url, params={"sort":0}, headers=headers)
-        if not res: return
-        
-        soup = BeautifulSoup(res.text, 'html.parser')
+    source_name = "ThanhNien"
+    hosts = ("thanhnien.vn",)
+
+    def page_request(self, keyword, page, ctx):
+        return {
+            "url": f"https://thanhnien.vn/timelinesearch/{keyword}/{page}.htm",
+            "params": {"sort": 0},
+            "headers": {'X-Requested-With': 'XMLHttpRequest'}
+        }
+
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.text)
         items = soup.select(".box-category-item")
-        if not items: return
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for item in items:
-                link = item.select_one("a.box-category-link-with-avatar")
-                if not link: continue
-                url = link.get('href')
-                if not url.startswith('http'): url = "https://thanhnien.vn" + url
-                if self.is_url_seen(url): continue
-                
-                time_tag = item.select_one(".box-time")
-                if time_tag and time_tag.get('title'):
-                    try:
-                        dt = datetime.fromisoformat(time_tag.get('title'))
-                        if dt.year < self.config["START_YEAR"]: return
-                    except: pass
-                
-                article_futures.append(executor.submit(self.process, url, keyword))
+        jobs = []
+        for item in items:
+            link = item.select_one("a.box-category-link-with-avatar")
+            if not link: continue
+            url = link.get('href')
+            if not url.startswith('http'): url = "https://thanhnien.vn" + url
+            if self.is_url_seen(url): continue
+            
+            time_tag = item.select_one(".box-time")
+            if time_tag and time_tag.get('title'):
+                try:
+                    dt = datetime.fromisoformat(time_tag.get('title'))
+                    if self.reached_cutoff(dt, keyword): break
+                except: pass
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            jobs.append({"url": url})
+        return jobs
 
-    def process(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
         title = soup.select_one("h1.detail-title span")
-        title = title.text.strip() if title else ""
+        title = title.text().strip() if title else ""
         
         content_div = soup.select_one("div.detail-content")
         if content_div:
@@ -297,316 +589,260 @@ class ThanhNienSpider(BaseSpider):
         date_elem = soup.select_one("[data-role='publishdate']")
         dt = datetime.now()
         if date_elem:
-             match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_elem.text)
+             match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_elem.text())
              if match: dt = datetime.strptime(match.group(1), "%d/%m/%Y")
         
-        self.add_item(title, url, dt, content, keyword)
+        return {"title": title, "url": job["url"], "pub_date": dt, "content": content}
 
 class VnEconomySpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "VnEconomy"
-    
-    def crawl(self, keyword):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(1, self.config["MAX_PAGES"] + 1):
-                futures.append(executor.submit(self.crawl_page, keyword, page))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+    source_name = "VnEconomy"
+    hosts = ("vneconomy.vn",)
 
-    def crawl_page(self, keyword, page):
-        res = self.engine.request("https://vneconomy.vn/tim-kiem.html", params={"Text": keyword, "page": page})
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def page_request(self, keyword, page, ctx):
+        return {"url": "https://vneconomy.vn/tim-kiem.html", "params": {"Text": keyword, "page": page}}
+
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.content)
         items = soup.select(".featured-row_item")
-        if not items: return
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for item in items:
-                link = item.select_one("a.link-layer-imt")
-                if not link: continue
-                url = "https://vneconomy.vn" + link.get('href') if link.get('href').startswith('/') else link.get('href')
-                if self.is_url_seen(url): continue
-                
-                article_futures.append(executor.submit(self.process, url, keyword))
+        jobs = []
+        for item in items:
+            link = item.select_one("a.link-layer-imt")
+            if not link: continue
+            url = "https://vneconomy.vn" + link.get('href') if link.get('href').startswith('/') else link.get('href')
+            if self.is_url_seen(url): continue
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            jobs.append({"url": url})
+        return jobs
 
-    def process(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
         date_tag = soup.select_one(".date-detail .date")
         if date_tag:
-            dt = self.parse_date_common(date_tag.text)
-            if dt and dt.year < self.config["START_YEAR"]: return
+            dt = self.parse_date_common(date_tag.text())
+            if dt and dt.year < self.config["START_YEAR"]: return None
         else: dt = datetime.now()
         
         title = soup.select_one("h1.name-detail")
-        title = title.text.strip() if title else ""
+        title = title.text().strip() if title else ""
         content = soup.select_one(".ct-edtior-web")
         content = content.get_text(separator="\n").strip() if content else ""
-        self.add_item(title, url, dt, content, keyword)
+        return {"title": title, "url": job["url"], "pub_date": dt, "content": content}
 
 class VietnamnetSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "Vietnamnet"
-    
-    def crawl(self, keyword):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(0, self.config["MAX_PAGES"]):
-                futures.append(executor.submit(self.crawl_page, keyword, page))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+    source_name = "Vietnamnet"
+    hosts = ("vietnamnet.vn",)
 
-    def crawl_page(self, keyword, page):
-        url = f"https://vietnamnet.vn/tim-kiem-p{page}?q={keyword}&od=2"
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def pages(self):
+        return range(0, self.config["MAX_PAGES"])
+
+    def page_request(self, keyword, page, ctx):
+        return {"url": f"https://vietnamnet.vn/tim-kiem-p{page}?q={keyword}&od=2"}
+
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.content)
         items = soup.select(".horizontalPost")
-        if not items: return
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for item in items:
-                link = item.select_one(".horizontalPost__main-title a")
-                if not link: continue
-                url_art = link.get('href')
-                if url_art.startswith('/'): url_art = "https://vietnamnet.vn" + url_art
-                if self.is_url_seen(url_art): continue
-                
-                article_futures.append(executor.submit(self.process, url_art, keyword))
+        jobs = []
+        for item in items:
+            link = item.select_one(".horizontalPost__main-title a")
+            if not link: continue
+            url_art = link.get('href')
+            if url_art.startswith('/'): url_art = "https://vietnamnet.vn" + url_art
+            if self.is_url_seen(url_art): continue
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            jobs.append({"url": url_art})
+        return jobs
 
-    def process(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
         date_tag = soup.select_one(".bread-crumb-detail__time")
         if not date_tag: date_tag = soup.select_one(".publish-date")
         if date_tag:
-            dt = self.parse_date_common(date_tag.text)
-            if dt and dt.year < self.config["START_YEAR"]: return
+            dt = self.parse_date_common(date_tag.text())
+            if dt and dt.year < self.config["START_YEAR"]: return None
         else: dt = datetime.now()
         
         title = soup.select_one("h1.content-detail-title")
-        title = title.text.strip() if title else ""
+        title = title.text().strip() if title else ""
         content_tag = soup.select_one("#maincontent")
         content = ""
         if content_tag:
             for t in content_tag.select('table, script, .inner-article'): t.decompose()
             content = content_tag.get_text(separator="\n").strip()
-        self.add_item(title, url, dt, content, keyword)
+        return {"title": title, "url": job["url"], "pub_date": dt, "content": content}
 
 class CafeFSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "CafeF"
-    
-    def crawl(self, keyword):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(1, self.config["MAX_PAGES"] + 1):
-                futures.append(executor.submit(self.crawl_page, keyword, page))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+    source_name = "CafeF"
+    hosts = ("cafef.vn",)
 
-    def crawl_page(self, keyword, page):
-        url = f"https://cafef.vn/tim-kiem.chn?keywords={keyword}&page={page}"
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
+    def page_request(self, keyword, page, ctx):
+        return {"url": f"https://cafef.vn/tim-kiem.chn?keywords={keyword}&page={page}"}
+
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.content)
         items = soup.select(".timeline.list-bytags .item")
-        if not items: return
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for item in items:
-                h3 = item.find("h3")
-                if not h3 or not h3.find("a"): continue
-                link = h3.find("a").get('href')
-                if not link.startswith('http'): link = "https://cafef.vn" + link
-                if self.is_url_seen(link): continue
-                
-                article_futures.append(executor.submit(self.process, link, keyword))
+        jobs = []
+        for item in items:
+            link_tag = item.select_one("h3 a")
+            if not link_tag: continue
+            link = link_tag.get('href')
+            if not link.startswith('http'): link = "https://cafef.vn" + link
+            if self.is_url_seen(link): continue
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            jobs.append({"url": link})
+        return jobs
 
-    def process(self, url, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
-        date_tag = soup.find("span", class_="pdate")
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
+        date_tag = soup.select_one("span.pdate")
         if date_tag:
-            dt = self.parse_date_common(date_tag.text)
-            if dt and dt.year < self.config["START_YEAR"]: return
+            dt = self.parse_date_common(date_tag.text())
+            if dt and dt.year < self.config["START_YEAR"]: return None
         else: dt = datetime.now()
         
-        title = soup.find("h1", class_="title")
-        title = title.text.strip() if title else ""
-        content = soup.find("div", class_="detail-content")
+        title = soup.select_one("h1.title")
+        title = title.text().strip() if title else ""
+        content = soup.select_one("div.detail-content")
         content = content.get_text(separator="\n").strip() if content else ""
-        self.add_item(title, url, dt, content, keyword)
+        return {"title": title, "url": job["url"], "pub_date": dt, "content": content}
 
 class VietstockSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "Vietstock"
-    
-    def crawl(self, keyword):
-        res = self.engine.request(f"https://finance.vietstock.vn/{keyword}/tin-tuc-su-kien.htm")
-        token = ""
-        if res:
-            s = BeautifulSoup(res.content, 'html.parser')
-            inp = s.find("input", {"name": "__RequestVerificationToken"})
-            if inp: token = inp['value']
-        if not token: return
+    source_name = "Vietstock"
+    hosts = ("vietstock.vn",)
+
+    def auth_request(self, keyword):
+        return {"url": f"https://finance.vietstock.vn/{keyword}/tin-tuc-su-kien.htm"}
 
+    def parse_auth(self, res, keyword):
+        s = self.parse_html(res.content)
+        inp = s.select_one("input[name='__RequestVerificationToken']")
+        if not inp or not inp.get('value'): return None
+        # The anti-forgery token only validates together with its cookie, so both travel with the token
+        return {"token": inp.get('value'), "cookie": "; ".join(f"{k}={v}" for k, v in res.cookies.items())}
+
+    def auth_context(self, auth, keyword):
         headers = {'X-Requested-With': 'XMLHttpRequest', 'Referer': f"https://finance.vietstock.vn/{keyword}/tin-tuc-su-kien.htm"}
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(1, self.config["MAX_PAGES"] + 1):
-                futures.append(executor.submit(self.crawl_page, keyword, page, token, headers))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+        if auth["cookie"]: headers['Cookie'] = auth["cookie"]
+        return {"token": auth["token"], "headers": headers}
 
-    def crawl_page(self, keyword, page, token, headers):
+    def page_request(self, keyword, page, ctx):
         payload = {
             'view': '1', 'code': keyword, 'type': '1', 
-            'fromDate': f"01/01/{self.config['START_YEAR']}", 
+            'fromDate': self.from_date(keyword), 
             'toDate': datetime.now().strftime("%d/%m/%Y"), 
             'channelID': '-1', 'page': str(page), 'pageSize': '20', 
-            '__RequestVerificationToken': token
+            '__RequestVerificationToken': ctx["token"]
         }
-        res = self.engine.request("https://finance.vietstock.vn/View/PagingNewsContent", data=payload, method="POST", headers=headers)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
-        rows = soup.find_all("tr")
-        if not rows: return
-        
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for row in rows:
-                cols = row.find_all("td")
-                if len(cols) < 2: continue
-                link = cols[1].find("a")
-                if not link: continue
-                url = link.get('href')
-                if url.startswith("//"): url = "https:" + url
-                elif url.startswith("/"): url = "https://finance.vietstock.vn" + url
-                if self.is_url_seen(url): continue
-                
-                date_str = cols[0].text.strip() 
-                try:
-                    dt = datetime.strptime(date_str.split()[0], "%d/%m/%y")
-                    if dt.year < self.config["START_YEAR"]: return
-                except: dt = datetime.now()
-                
-                article_futures.append(executor.submit(self.process, url, dt, keyword))
+        return {"url": "https://finance.vietstock.vn/View/PagingNewsContent", "data": payload, "method": "POST", "headers": dict(ctx["headers"])}
+
+    def from_date(self, keyword):
+        mark = self.frontier.watermark(self.source_name, keyword) if self.incremental else None
+        if mark: return datetime.strptime(mark, '%Y-%m-%d').strftime("%d/%m/%Y")
+        return f"01/01/{self.config['START_YEAR']}"
+
+    def parse_page(self, res, keyword, ctx):
+        soup = self.parse_html(res.content)
+        rows = soup.select("tr")
+        
+        jobs = []
+        for row in rows:
+            cols = row.select("td")
+            if len(cols) < 2: continue
+            link = cols[1].select_one("a")
+            if not link: continue
+            url = link.get('href')
+            if url.startswith("//"): url = "https:" + url
+            elif url.startswith("/"): url = "https://finance.vietstock.vn" + url
+            if self.is_url_seen(url): continue
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
-
-    def process(self, url, dt, keyword):
-        res = self.engine.request(url)
-        if not res: return
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
-        title = soup.find("h1", class_="article-title")
-        title = title.text.strip() if title else ""
-        content_div = soup.find("div", id="vst_detail")
+            date_str = cols[0].text().strip() 
+            try:
+                dt = datetime.strptime(date_str.split()[0], "%d/%m/%y")
+                if self.reached_cutoff(dt, keyword): break
+            except: dt = datetime.now()
+            
+            jobs.append({"url": url, "date": dt})
+        return jobs
+
+    def parse_article(self, res, job):
+        soup = self.parse_html(res.content)
+        title = soup.select_one("h1.article-title")
+        title = title.text().strip() if title else ""
+        content_div = soup.select_one("div#vst_detail")
         content = content_div.get_text(separator="\n").strip() if content_div else ""
-        self.add_item(title, url, dt, content, keyword)
+        return {"title": title, "url": job["url"], "pub_date": job["date"], "content": content}
 
 class FireAntSpider(BaseSpider):
-    def __init__(self, engine, config): 
-        super().__init__(engine, config)
-        self.source_name = "FireAnt"
-    
-    def crawl(self, keyword):
-        res = self.engine.request(f"https://fireant.vn/ma-chung-khoan/{keyword}")
-        token = None
-        if res:
-            soup = BeautifulSoup(res.content, 'html.parser')
-            script = soup.find("script", id="__NEXT_DATA__")
-            if script:
-                data = json.loads(script.string)
-                token = data.get('props', {}).get('pageProps', {}).get('initialState', {}).get('auth', {}).get('accessToken')
-        if not token: return
-
-        headers = {'Authorization': f"Bearer {token}"}
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for page in range(0, self.config["MAX_PAGES"]):
-                futures.append(executor.submit(self.crawl_page, keyword, page, headers))
-            
-            for future in concurrent.futures.as_completed(futures):
-                future.result()
+    source_name = "FireAnt"
+    hosts = ("fireant.vn",)
+
+    def pages(self):
+        return range(0, self.config["MAX_PAGES"])
+
+    def auth_request(self, keyword):
+        return {"url": f"https://fireant.vn/ma-chung-khoan/{keyword}"}
+
+    def parse_auth(self, res, keyword):
+        soup = self.parse_html(res.content)
+        script = soup.select_one("script#__NEXT_DATA__")
+        if not script: return None
+        data = json.loads(script.text())
+        token = data.get('props', {}).get('pageProps', {}).get('initialState', {}).get('auth', {}).get('accessToken')
+        if not token: return None
+        return {"token": token, "expires_at": jwt_expiry(token)}
 
-    def crawl_page(self, keyword, page, headers):
+    def auth_context(self, auth, keyword):
+        return {"headers": {'Authorization': f"Bearer {auth['token']}"}}
+
+    def page_request(self, keyword, page, ctx):
         params = {'symbol': keyword, 'type': 1, 'limit': 20, 'offset': page * 20}
-        res = self.engine.request("https://restv2.fireant.vn/posts", params=params, headers=headers)
-        if not res: return
-        
+        return {"url": "https://restv2.fireant.vn/posts", "params": params, "headers": dict(ctx["headers"])}
+
+    def parse_page(self, res, keyword, ctx):
         posts = res.json()
-        if not posts: return
         
-        article_futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for post in posts:
-                if not post.get('title'): continue
-                post_id = post.get('postID')
-                url = f"https://fireant.vn/bai-viet/{post_id}"
-                if self.is_url_seen(url): continue
-                
-                date_str = post.get('date')
-                try:
-                    dt = datetime.fromisoformat(date_str)
-                    if dt.year < self.config["START_YEAR"]: return
-                except: dt = datetime.now()
-
-                article_futures.append(executor.submit(self.process, post_id, post.get('title'), url, dt, headers, keyword))
+        jobs = []
+        for post in posts or []:
+            if not post.get('title'): continue
+            post_id = post.get('postID')
+            url = f"https://fireant.vn/bai-viet/{post_id}"
+            if self.is_url_seen(url): continue
             
-            for future in concurrent.futures.as_completed(article_futures):
-                future.result()
+            date_str = post.get('date')
+            try:
+                dt = datetime.fromisoformat(date_str)
+                if self.reached_cutoff(dt, keyword): break
+            except: dt = datetime.now()
 
-    def process(self, post_id, title, url, dt, headers, keyword):
-        res = self.engine.request(f"https://restv2.fireant.vn/posts/{post_id}", headers=headers)
-        content = ""
-        if res:
-            data = res.json()
-            raw = data.get('content', '')
-            if raw: content = BeautifulSoup(raw, 'html.parser').get_text(separator="\n").strip()
-            else: content = data.get('description', '')
-        self.add_item(title, url, dt, content, keyword)
+            jobs.append({"url": url, "post_id": post_id, "title": post.get('title'), "date": dt})
+        return jobs
+
+    def article_request(self, job, ctx):
+        return {"url": f"https://restv2.fireant.vn/posts/{job['post_id']}", "headers": dict(ctx["headers"])}
+
+    def parse_article(self, res, job):
+        data = res.json()
+        raw = data.get('content', '')
+        if raw: content = self.parse_html(raw).get_text(separator="\n").strip()
+        else: content = data.get('description', '')
+        return {"title": job["title"], "url": job["url"], "pub_date": job["date"], "content": content}
+
+    def article_fallback(self, job):
+        return {"title": job["title"], "url": job["url"], "pub_date": job["date"], "content": ""}
+
+SPIDER_CLASSES = [
+    VnExpressSpider, ThanhNienSpider, VnEconomySpider, 
+    VietnamnetSpider, CafeFSpider, VietstockSpider, FireAntSpider
+]
 
 class PipelineManager:
-    def __init__(self):
+    def __init__(self, config_file="config.txt", overrides=None):
         print("Initializing Multi-Thread Pipeline...")
-        self.config = load_config()
+        self.config = load_config(config_file)
         if not self.config: return
+        self.config.update(overrides or {})
         
         self.keywords_data = load_keywords_from_folder(
             self.config.get("KEYWORDS_FOLDER", "data/keywords")
@@ -615,78 +851,142 @@ class PipelineManager:
             print("No keywords found!")
             return
         
-        self.engine = CrawlerEngine(
-            use_proxy=self.config.get("USE_PROXY", False), 
-            proxy_file=self.config.get("PROXY_FILE", "")
+        self.backend = self.config.get("CRAWL_BACKEND", "thread").lower()
+        self.rate_limiter = HostRateLimiter.from_config(self.config, SPIDER_CLASSES)
+        self.retry = RetryPolicy.from_config(self.config)
+        self.breakers = SourceBreakers.from_config(self.config, SPIDER_CLASSES)
+        self.connections = HostConnectionManager.from_config(self.config, SPIDER_CLASSES)
+        self.proxy_pool = ProxyPool(load_proxies(self.config.get("PROXY_FILE", "")) if self.config.get("USE_PROXY", False) else [])
+        self.frontier = UrlFrontier(self.config.get("FRONTIER_DB", "data/crawl_frontier.db"),
+                                    commit_every=self.config.get("DB_COMMIT_EVERY", 200))
+        self.memo = ArticleMemo(self.config.get("MEMO_BODIES", 2000))
+        self.near_dup = NearDupIndex.from_config(self.config)
+        self.tokens = TokenProvider(ttl=self.config.get("AUTH_TOKEN_TTL", 1800))
+        self.telemetry = CrawlTelemetry.from_config(self.config, SPIDER_CLASSES, memo=self.memo, connections=self.connections)
+        self.output_folder = self.config.get("OUTPUT_FOLDER", "data/output")
+        self.writer = ShardedNDJSONWriter(
+            self.output_folder,
+            max_bytes=self.config.get("SHARD_MAX_MB", 64) * 1024 * 1024,
+            compress=self.config.get("SHARD_GZIP", False),
+            checkpoint_seconds=self.config.get("CHECKPOINT_SECONDS", 30)
         )
-        self.spiders = [
-            VnExpressSpider, ThanhNienSpider, VnEconomySpider, 
-            VietnamnetSpider, CafeFSpider, VietstockSpider, FireAntSpider
-        ]
+        cache_mode = self.config.get("CACHE_MODE", "off").lower()
+        self.cache = ResponseCache(self.config.get("CACHE_DIR", "data/http_cache"), cache_mode) if cache_mode != "off" else None
+        self.scheduler = None
+        self.parse_pool = None
+        # Opt-in: parsing is a small share of a crawl's CPU, the pool's IPC can cost more than it saves
+        parse_workers = self.config.get("PARSE_WORKERS", 0)
+        if parse_workers > 0:
+            from parse_pool import ParsePool
+            self.parse_pool = ParsePool(self.config, parse_workers, self.config.get("PARSE_QUEUE_SIZE", 256))
+        if self.backend == "async":
+            import async_crawler
+            self.engine = None
+            self.spiders = async_crawler.ASYNC_SPIDER_CLASSES
+        else:
+            self.engine = CrawlerEngine(
+                use_proxy=self.config.get("USE_PROXY", False), 
+                proxy_file=self.config.get("PROXY_FILE", ""),
+                rate_limiter=self.rate_limiter,
+                local_mirror=self.config.get("LOCAL_MIRROR", ""),
+                cache=self.cache,
+                retry=self.retry,
+                breakers=self.breakers,
+                proxy_pool=self.proxy_pool,
+                timeout=self.config.get("REQUEST_TIMEOUT", 15),
+                telemetry=self.telemetry,
+                connections=self.connections
+            )
+            self.spiders = SPIDER_CLASSES
+            self.scheduler = CrawlScheduler(
+                num_workers=self.config.get("SCHEDULER_WORKERS", self.config.get("MAX_WORKERS", 5) * 4),
+                max_queue=self.config.get("SCHEDULER_QUEUE_SIZE", 1000)
+            )
+            self.telemetry.scheduler = self.scheduler
 
     def run(self):
-        print("="*50 + f"\nSTART CRAWL {len(self.keywords_data)} TICKERS\n" + "="*50)
-        
-        for ticker_data in self.keywords_data:
-            ticker = ticker_data["ticker"]
-            keywords = ticker_data["keywords"]
-            
-            print(f"\n{'='*50}")
-            print(f"TICKER: {ticker} - {len(keywords)} keywords")
-            print(f"{'='*50}")
-            
-            start_time = time.time()
-            ticker_results = []
-            
-            max_workers = min(self.config["MAX_WORKERS"] * 2, len(keywords) * len(self.spiders))
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = []
-                for keyword in keywords:
-                    for SpiderClass in self.spiders:
-                        futures.append(executor.submit(
-                            self.run_spider, SpiderClass, keyword, ticker
-                        ))
-                
-                completed = 0
-                total = len(futures)
-                for future in concurrent.futures.as_completed(futures):
-                    data = future.result()
-                    if data: 
-                        ticker_results.extend(data)
-                    completed += 1
-                    if completed % 10 == 0:
-                        print(f"Progress: {completed}/{total} tasks completed")
-            
-            elapsed = time.time() - start_time
-            print(f"\nCompleted in {elapsed:.2f}s")
-            
-            self.save_results(ticker, ticker_results)
+        plan = build_keyword_plan(self.keywords_data)
+        requested = sum(len(t["keywords"]) for t in self.keywords_data)
+        print("="*50 + f"\nSTART CRAWL {len(self.keywords_data)} TICKERS ({self.backend})\n"
+              f"{requested} ticker keywords -> {len(plan)} unique keywords x {len(self.spiders)} sources\n" + "="*50)
+        # CRAWL_BUDGET_SECONDS: freshest news first, stop at the deadline and save what was crawled
+        budget = None
+        if self.config.get("CRAWL_BUDGET_SECONDS", 0) > 0:
+            budget = CrawlBudget(self.config["CRAWL_BUDGET_SECONDS"],
+                                 self.config.get("CRAWL_BUDGET_RESERVE", self.config.get("REQUEST_TIMEOUT", 15)))
+            tiers = keyword_tiers(self.keywords_data)
+            plan.sort(key=lambda item: tiers.get(" ".join(item[0].split()).lower(), 0))
+            print(f"Time budget: {budget.seconds}s, deeper pages stop {budget.reserve}s before the deadline")
+        if self.scheduler:
+            self.scheduler.budget = budget
+            self.scheduler.start()
+        self.telemetry.start()
+
+        start_time = time.time()
+        if self.backend == "async":
+            import async_crawler
+            async_crawler.run_plan(
+                self.config, self.spiders, plan,
+                engine_kwargs={"rate_limiter": self.rate_limiter, "cache": self.cache, "retry": self.retry,
+                               "breakers": self.breakers, "proxy_pool": self.proxy_pool, "telemetry": self.telemetry},
+                spider_kwargs={"frontier": self.frontier, "memo": self.memo, "sink": self.writer,
+                               "telemetry": self.telemetry, "tokens": self.tokens, "parse_pool": self.parse_pool,
+                               "budget": budget},
+                budget=budget
+            )
+        else:
+            self.crawl_plan(plan, budget)
+
+        elapsed = time.time() - start_time
+        print(f"\nCompleted in {elapsed:.2f}s")
+        self.memo.report()
+        self.tokens.report()
+        if self.cache: self.cache.report()
+        self.retry.report()
+        self.breakers.report()
+        if self.proxy_pool: self.proxy_pool.report()
+        if self.engine: self.connections.report()
+        self.telemetry.report()
 
-    def run_spider(self, SpiderClass, keyword, ticker):
-        spider = SpiderClass(self.engine, self.config)
+        for ticker_data in self.keywords_data:
+            self.save_results(ticker_data["ticker"])
+        if self.near_dup: self.near_dup.report()
+
+        if self.scheduler: self.scheduler.shutdown()
+        if self.parse_pool: self.parse_pool.shutdown()
+        self.frontier.close()
+        if self.near_dup: self.near_dup.close()
+        if self.cache: self.cache.close()
+        self.telemetry.close()
+
+    def crawl_plan(self, plan, budget=None):
+        # Every (keyword, source) is seeded once; its spider writes each article to all requesting tickers
+        tiers = keyword_tiers(self.keywords_data)
+        for keyword, tickers in plan:
+            for SpiderClass in self.spiders:
+                spider = SpiderClass(
+                    self.engine, self.config, scheduler=self.scheduler,
+                    frontier=self.frontier, memo=self.memo, sink=self.writer, tickers=tickers,
+                    telemetry=self.telemetry, tokens=self.tokens, parse_pool=self.parse_pool,
+                    budget=budget, tier=tiers.get(" ".join(keyword.split()).lower(), 0)
+                )
+                self.scheduler.submit(spider.priority(PRIORITY_SEED), self.run_spider, spider, keyword)
+        self.scheduler.join()
+        if self.parse_pool: self.parse_pool.join()
+        self.scheduler.report()
+
+    def run_spider(self, spider, keyword):
         try: 
             spider.crawl(keyword)
         except Exception as e: 
             print(f"Error {spider.source_name} - {keyword}: {e}")
-        
-        for item in spider.crawled_data:
-            item["ticker"] = ticker
-        
-        return spider.crawled_data
 
-    def save_results(self, ticker, results):
-        results.sort(key=lambda x: x.get("published_date", ""), reverse=True)
-        unique_results = {v['url']: v for v in results}.values()
-        
-        output_folder = self.config.get("OUTPUT_FOLDER", "data/output")
-        os.makedirs(output_folder, exist_ok=True)
-        
-        output_file = os.path.join(output_folder, f"{ticker}_news.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(list(unique_results), f, ensure_ascii=False, indent=4)
-        
-        print(f"\n{ticker}: {len(unique_results)} articles -> {output_file}")
+    def save_results(self, ticker):
+        streamed = self.writer.close(ticker)
+        # An incremental run only fetched new articles, so keep what the previous runs saved
+        output_file, total = compact(self.output_folder, ticker, merge_existing=self.config.get("INCREMENTAL", False),
+                                     near_dup=self.near_dup, **compact_options(self.config))
+        print(f"\n{ticker}: {streamed} records streamed, {total} articles -> {output_file}")
 
 if __name__ == "__main__":
     PipelineManager().run()
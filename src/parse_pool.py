@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from news_pipeline_multithread import SPIDER_CLASSES, make_response
+
+WORKER_SPIDERS = {}
+
+def init_worker(config):
+    # Extractors only read config, so one engine-less spider per source serves every article
+    for SpiderClass in SPIDER_CLASSES:
+        WORKER_SPIDERS[SpiderClass.source_name] = SpiderClass(None, config)
+
+def parse_in_worker(source, url, status, content, headers, encoding, job):
+    start = time.perf_counter()
+    item = WORKER_SPIDERS[source].parse_article(make_response(url, status, content, headers, encoding), job)
+    return item, time.perf_counter() - start
+
+class ParsePool:
+    """CPU stage of the crawl: article extraction in worker processes, off the GIL of the I/O threads.
+
+    At most max_pending downloaded pages wait for a parser or for their result to be emitted; past
+    that the threads that fetched them block in submit(), which throttles downloading to the speed
+    of parsing. Parsed items are emitted (memo, near-dup, shard write) by the crawl threads in
+    submit() and join(), never on the executor's single result thread.
+    """
+
+    def __init__(self, config, workers=None, max_pending=256):
+        # Workers start lazily from crawl threads; a fork then would copy held SQLite, SSL and crawl locks
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                            initializer=init_worker, initargs=(config,))
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.pending = 0
+        self.ready = deque()
+
+    def args(self, spider, res, job):
+        return (parse_in_worker, spider.source_name, res.url, res.status_code, res.content,
+                dict(res.headers), res.encoding, job)
+
+    def result(self, future, spider):
+        try:
+            item, seconds = future.result()
+        except Exception as e:
+            print(f"Parse error {spider.source_name}: {e}")
+            return None
+        if spider.telemetry: spider.telemetry.record_parse(spider.source_name, "article", seconds)
+        return item
+
+    def submit(self, spider, job, res, callback):
+        # A thread waiting for a free slot emits finished results meanwhile; emitting is what frees slots
+        while True:
+            self.drain()
+            with self.cond:
+                if self.pending < self.max_pending:
+                    self.pending += 1
+                    break
+                if not self.ready: self.cond.wait()
+        future = self.executor.submit(*self.args(spider, res, job))
+        future.add_done_callback(lambda f: self.done(f, spider, callback))
+
+    def done(self, future, spider, callback):
+        # Runs on the executor's result thread: only queue the result for a crawl thread to emit
+        with self.cond:
+            self.ready.append((future, spider, callback))
+            self.cond.notify_all()
+
+    def drain(self):
+        while True:
+            with self.cond:
+                if not self.ready: return
+                future, spider, callback = self.ready.popleft()
+            try:
+                callback(self.result(future, spider))
+            except Exception as e:
+                print(f"Emit error {spider.source_name}: {e}")
+            finally:
+                with self.cond:
+                    self.pending -= 1
+                    self.cond.notify_all()
+
+    async def parse_async(self, spider, job, res):
+        # The async engine already bounds pages in flight with ASYNC_CONCURRENCY
+        future = self.executor.submit(*self.args(spider, res, job))
+        await asyncio.wrap_future(future)
+        return self.result(future, spider)
+
+    def join(self):
+        while True:
+            self.drain()
+            with self.cond:
+                if not self.pending: return
+                if not self.ready: self.cond.wait()
+
+    def shutdown(self):
+        self.join()
+        self.executor.shutdown()
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+# config.txt:
+#   RATE_LIMIT_DEFAULT = 2,5        -> 2 requests/s, bursts of up to 5, for every source
+#   RATE_LIMIT_VnExpress = 4,8      -> per-source override (key suffix = spider source_name)
+DEFAULT_RATE_LIMIT = "2,5"
+
+def parse_rate_limit(value):
+    rate, _, burst = str(value).partition(",")
+    rate = float(rate)
+    return rate, float(burst) if burst.strip() else max(1.0, rate)
+
+def host_source_map(spider_classes):
+    return {host: SpiderClass.source_name for SpiderClass in spider_classes for host in SpiderClass.hosts}
+
+def source_for_host(host_sources, url):
+    host = (urlsplit(url).hostname or "").lower()
+    for known, name in host_sources.items():
+        if host == known or host.endswith("." + known):
+            return name
+    return host
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        # Take a token now (the balance may go negative) and return how long the caller must wait,
+        # so sleeping happens outside the lock and callers are served in arrival order.
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0: time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0: await asyncio.sleep(wait)
+
+class HostRateLimiter:
+    """One token bucket per source, looked up from the request host."""
+
+    def __init__(self, limits, host_sources, default=(2.0, 5.0)):
+        self.host_sources = host_sources
+        self.default = default
+        self.buckets = {name: TokenBucket(*limit) for name, limit in limits.items()}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, spider_classes):
+        default = parse_rate_limit(config.get("RATE_LIMIT_DEFAULT", DEFAULT_RATE_LIMIT))
+        limits = {S.source_name: parse_rate_limit(config.get(f"RATE_LIMIT_{S.source_name}", "%s,%s" % default))
+                  for S in spider_classes}
+        return cls(limits, host_source_map(spider_classes), default)
+
+    def source_for(self, url):
+        return source_for_host(self.host_sources, url)
+
+    def bucket(self, url):
+        name = self.source_for(url)
+        with self.lock:
+            if name not in self.buckets:
+                self.buckets[name] = TokenBucket(*self.default)
+            return self.buckets[name]
+
+    def acquire(self, url):
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url):
+        await self.bucket(url).acquire_async()
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+
+from rate_limiter import host_source_map, source_for_host
+
+# config.txt:
+#   MAX_RETRIES = 2                 -> extra attempts after a timeout, 429 or 5xx
+#   RETRY_BACKOFF = 0.5,8           -> base,max seconds of the jittered exponential backoff
+#   BREAKER_THRESHOLD = 5           -> consecutive 429/5xx/timeouts before a source is paused
+#   BREAKER_COOLDOWN = 30           -> first pause in seconds, doubled while the site keeps failing
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def retry_after(headers):
+    try:
+        return float(headers.get("Retry-After", ""))
+    except (TypeError, ValueError):
+        return None  # missing, or an HTTP date we don't bother parsing
+
+class RetryPolicy:
+    def __init__(self, max_retries=2, base_delay=0.5, max_delay=8.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.stats = {"retried": 0, "gave_up": 0}
+
+    @classmethod
+    def from_config(cls, config):
+        base, _, cap = str(config.get("RETRY_BACKOFF", "0.5,8")).partition(",")
+        return cls(config.get("MAX_RETRIES", 2), float(base), float(cap or 8))
+
+    def attempts(self):
+        return range(self.max_retries + 1)
+
+    def delay(self, attempt):
+        # "Full jitter": spreads retries of many workers instead of having them hit the site in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def report(self):
+        print(f"Retries: {self.stats['retried']} retried, {self.stats['gave_up']} requests given up")
+
+class CircuitBreaker:
+    """closed -> (threshold failures) open for cooldown -> half-open: one probe decides."""
+
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.open_until = 0.0
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def wait_time(self):
+        # 0 means go ahead; otherwise sleep that long and ask again
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "open":
+                if now < self.open_until: return self.open_until - now
+                self.state = "half_open"  # this caller is the probe
+                return 0.0
+            if self.state == "half_open": return min(1.0, self.cooldown)
+            return 0.0
+
+    def record(self, outcome, pause=None):
+        with self.lock:
+            if outcome == "ok":
+                self.state, self.failures, self.cooldown = "closed", 0, self.base_cooldown
+            elif outcome == "fail":
+                self.failures += 1
+                if self.state == "half_open":
+                    self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                if self.state == "half_open" or self.failures >= self.threshold:
+                    self.trip(max(pause or 0, self.cooldown))
+            elif self.state == "half_open":
+                self.state, self.open_until = "open", 0.0  # probe said nothing about the site: next caller probes
+
+    def trip(self, seconds):
+        if self.state != "open": self.opened += 1
+        self.state = "open"
+        self.open_until = time.monotonic() + seconds
+
+class SourceBreakers:
+    """One CircuitBreaker per source, looked up from the request host like HostRateLimiter."""
+
+    def __init__(self, host_sources, threshold=5, cooldown=30.0):
+        self.host_sources = host_sources
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, spider_classes):
+        return cls(host_source_map(spider_classes), config.get("BREAKER_THRESHOLD", 5), float(config.get("BREAKER_COOLDOWN", 30)))
+
+    def breaker(self, url):
+        name = source_for_host(self.host_sources, url)
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(self.threshold, self.cooldown)
+            return self.breakers[name]
+
+    def report(self):
+        with self.lock:
+            tripped = {name: b for name, b in self.breakers.items() if b.opened}
+        if not tripped: return
+        print("Circuit breakers: " + ", ".join(f"{name} opened {b.opened}x ({b.state})" for name, b in tripped.items()))
+
+class ProxyPool:
+    """Proxies weighted by recent latency and failure rate (EWMA); repeat offenders sit out a while."""
+
+    def __init__(self, proxies, alpha=0.3, bench_after=3, bench_seconds=60.0):
+        self.alpha = alpha
+        self.bench_after = bench_after
+        self.bench_seconds = bench_seconds
+        self.health = {p: {"latency": 1.0, "fail": 0.0, "streak": 0, "benched_until": 0.0, "uses": 0} for p in proxies}
+        self.lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.health)
+
+    def score(self, h):
+        return 1.0 / (max(h["latency"], 0.05) * (1 + 9 * h["fail"]))
+
+    def pick(self):
+        with self.lock:
+            if not self.health: return None
+            now = time.monotonic()
+            ready = [p for p, h in self.health.items() if h["benched_until"] <= now]
+            if not ready:  # every proxy is benched: use the one that comes back first
+                return min(self.health, key=lambda p: self.health[p]["benched_until"])
+            proxy = random.choices(ready, weights=[self.score(self.health[p]) for p in ready])[0]
+            self.health[proxy]["uses"] += 1
+            return proxy
+
+    def report_result(self, proxy, ok, latency):
+        if proxy is None: return
+        with self.lock:
+            h = self.health[proxy]
+            h["latency"] += self.alpha * (latency - h["latency"])
+            h["fail"] += self.alpha * ((0.0 if ok else 1.0) - h["fail"])
+            h["streak"] = 0 if ok else h["streak"] + 1
+            if h["streak"] >= self.bench_after:
+                h["benched_until"] = time.monotonic() + self.bench_seconds * 2 ** min(h["streak"] - self.bench_after, 4)
+
+    def report(self):
+        with self.lock:
+            now = time.monotonic()
+            benched = sum(1 for h in self.health.values() if h["benched_until"] > now)
+            best = sorted(self.health.items(), key=lambda item: -self.score(item[1]))[:3]
+        print(f"Proxies: {len(self.health) - benched}/{len(self.health)} healthy; best "
+              + ", ".join(f"{p} ({h['latency']:.2f}s, {h['fail']:.0%} fail)" for p, h in best))
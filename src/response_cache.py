@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Fields that change between runs without changing what is asked for would make every run miss the
+# cache, so they are left out of the key: per-session anti-forgery tokens, and the "up to today"
+# end date of Vietstock's listing search
+IGNORED_KEY_FIELDS = {"__RequestVerificationToken", "toDate"}
+
+class ResponseCache:
+    """Content-addressed HTTP response cache.
+
+    Bodies are gzip files named by their SHA-256 under <cache_dir>/bodies, so identical pages are
+    stored once; a SQLite index maps each request to its body plus ETag/Last-Modified.
+    Modes: "on" revalidates with conditional GETs, "replay" never touches the network.
+    """
+
+    def __init__(self, cache_dir="data/http_cache", mode="on"):
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        os.makedirs(self.body_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, url TEXT, status INTEGER, body_hash TEXT, headers TEXT,
+            etag TEXT, last_modified TEXT, fetched_at REAL)""")
+        self.conn.commit()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0}
+
+    @property
+    def replay(self):
+        return self.mode == "replay"
+
+    def key(self, url, params=None, method="GET", data=None, json_data=None):
+        def clean(fields):
+            if not isinstance(fields, dict): return fields
+            return sorted((k, str(v)) for k, v in fields.items() if k not in IGNORED_KEY_FIELDS)
+        raw = json.dumps([method, url, clean(params), clean(data), clean(json_data)], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def body_path(self, body_hash):
+        return os.path.join(self.body_dir, body_hash[:2], body_hash + ".gz")
+
+    def lookup(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, status, body_hash, headers, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row: return None
+        url, status, body_hash, headers, etag, last_modified = row
+        return {"url": url, "status": status, "body_hash": body_hash, "headers": json.loads(headers),
+                "etag": etag, "last_modified": last_modified}
+
+    def load_body(self, entry):
+        with gzip.open(self.body_path(entry["body_hash"]), "rb") as f:
+            return f.read()
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key, url, status, body, headers):
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self.body_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(body)
+            os.replace(tmp, path)
+        keep = {k.lower(): v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                key, url, status, body_hash, json.dumps(keep), keep.get("etag"), keep.get("last-modified"), time.time()))
+            self.conn.commit()
+            self.stats["stored"] += 1
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def iter_entries(self, url_prefix=""):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, status, body_hash, headers FROM responses WHERE url LIKE ? ORDER BY url", (url_prefix + "%",)
+            ).fetchall()
+        for url, status, body_hash, headers in rows:
+            yield {"url": url, "status": status, "body_hash": body_hash, "headers": json.loads(headers)}
+
+    def report(self):
+        s = self.stats
+        print(f"Response cache ({self.mode}): {s['hits']} hits, {s['revalidated']} revalidated (304), "
+              f"{s['misses']} misses, {s['stored']} stored")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+if __name__ == "__main__":
+    cache = ResponseCache(sys.argv[1] if len(sys.argv) > 1 else "data/http_cache")
+    entries = list(cache.iter_entries())
+    hashes = {e["body_hash"] for e in entries}
+    size = sum(os.path.getsize(cache.body_path(h)) for h in hashes if os.path.exists(cache.body_path(h)))
+    print(f"{len(entries)} responses, {len(hashes)} unique bodies, {size / 1e6:.1f} MB compressed")
@@ -0,0 +1,206 @@
+"""Synthetic but structurally faithful pages for the seven news sources.
+
+Each source exposes the same markup the spiders select on, wrapped in the menus, sidebars,
+inline scripts and comments real pages carry, so parsing cost is in the right ballpark.
+fixture_response(host, path, query, form) maps a request to (status, content_type, body).
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from html import escape
+from urllib.parse import unquote
+
+BASE_DATE = datetime(2024, 6, 1, 8, 0)
+PER_PAGE = 20
+PAGES = 5
+DAYS_PER_ITEM = 1
+
+WORDS = ("cổ phiếu doanh nghiệp lợi nhuận quý tăng trưởng thị trường ngân hàng vốn hóa nhà đầu tư "
+         "chứng khoán tỷ đồng cổ đông kế hoạch năm nay hợp nhất doanh thu xuất khẩu").split()
+
+def words(seed, n):
+    h = int(hashlib.md5(seed.encode()).hexdigest(), 16)
+    return " ".join(WORDS[(h >> (i % 100)) % len(WORDS)] for i in range(n))
+
+def page_chrome(body, title="Tin tức"):
+    menu = "".join(f'<li class="menu-item"><a href="/chuyen-muc-{i}.htm" title="Mục {i}">Mục {i}</a></li>' for i in range(120))
+    sidebar = "".join(f'<div class="box-news"><a href="/tin-noi-bat-{i}.htm"><img src="/img/{i}.jpg" alt="ảnh {i}"></a>'
+                      f'<h4><a href="/tin-noi-bat-{i}.htm">{words(f"side{i}", 12)}</a></h4></div>' for i in range(40))
+    script = "<script>window.__cfg = " + json.dumps({"ads": list(range(200))}) + ";</script>"
+    return (f'<!DOCTYPE html><html lang="vi"><head><meta charset="utf-8"><title>{escape(title)}</title>{script}'
+            f'<style>.a{{color:red}}</style></head><body><!-- header --><header><ul class="menu">{menu}</ul></header>'
+            f'<main>{body}</main><aside class="sidebar">{sidebar}</aside><footer><p>&copy; 2024 &nbsp;Báo điện tử</p></footer>'
+            f'{script}</body></html>')
+
+def item_date(page, i, first_page=1):
+    return BASE_DATE - timedelta(days=((page - first_page) * PER_PAGE + i) * DAYS_PER_ITEM)
+
+def slug(source, keyword, page, i):
+    return f"{source}-{keyword}-{page}-{i}".replace(" ", "-").lower()
+
+def paragraphs(seed, n=25):
+    return "".join(f"<p>{words(seed + str(i), 40)} &amp; {i}.</p>" for i in range(n))
+
+def listing_range(page, first_page=1):
+    return range(PER_PAGE) if first_page <= page < first_page + PAGES else range(0)
+
+# --- VnExpress ---
+def vnexpress_listing(keyword, page):
+    items = "".join(
+        f'<article class="item-news"><h3 class="title-news"><a href="https://vnexpress.net/{slug("vne", keyword, page, i)}.html">'
+        f'{words(slug("vne", keyword, page, i), 10)}</a></h3><p class="description">{words(str(i), 30)}</p>'
+        f'<span class="time">{item_date(page, i):%d/%m/%Y}</span></article>'
+        for i in listing_range(page))
+    return page_chrome(f'<div class="width_common list-news-subfolder">{items}</div>')
+
+def vnexpress_article(name):
+    dt = BASE_DATE
+    return page_chrome(
+        f'<div class="header-content"><span class="date">Thứ bảy, {dt.day}/{dt.month}/{dt.year}, 08:00 (GMT+7)</span></div>'
+        f'<h1 class="title-detail">{words(name, 12)}</h1><p class="description">{words(name + "d", 30)}</p>'
+        f'<article class="fck_detail">{paragraphs(name)}<p class="Normal" style="text-align:right;"><strong>PV</strong></p></article>')
+
+# --- ThanhNien (timelinesearch returns a bare fragment) ---
+def thanhnien_listing(keyword, page):
+    return "".join(
+        f'<div class="box-category-item"><a class="box-category-link-with-avatar" href="/{slug("tn", keyword, page, i)}.htm">'
+        f'<img src="/i.jpg"></a><h3 class="box-title-text"><a href="/{slug("tn", keyword, page, i)}.htm">{words(str(i), 10)}</a></h3>'
+        f'<span class="box-time time-ago" title="{item_date(page, i):%Y-%m-%dT%H:%M:%S}">{i} giờ trước</span></div>'
+        for i in listing_range(page))
+
+def thanhnien_article(name):
+    return page_chrome(
+        f'<h1 class="detail-title"><span data-role="title">{words(name, 12)}</span></h1>'
+        f'<div class="detail-time"><div data-role="publishdate">{BASE_DATE:%d/%m/%Y %H:%M} GMT+7</div></div>'
+        f'<div class="detail-content afcbc-body">{paragraphs(name)}<div class="detail__related">Xem thêm {words("r", 8)}</div>'
+        f'<div class="VCSortableInPreviewMode"><img src="/x.jpg"><p>Chú thích ảnh</p></div><script>track();</script></div>')
+
+# --- VnEconomy ---
+def vneconomy_listing(keyword, page):
+    items = "".join(
+        f'<div class="featured-row_item"><a class="link-layer-imt" href="/{slug("vnec", keyword, page, i)}.htm"></a>'
+        f'<h3 class="featured-row_item__title">{words(str(i), 10)}</h3></div>'
+        for i in listing_range(page))
+    return page_chrome(f'<section class="featured-row">{items}</section>')
+
+def vneconomy_article(name):
+    return page_chrome(
+        f'<h1 class="name-detail">{words(name, 12)}</h1><div class="date-detail"><span class="date">{BASE_DATE:%H:%M %d/%m/%Y}</span></div>'
+        f'<div class="ct-edtior-web">{paragraphs(name)}<script>ads();</script></div>')
+
+# --- Vietnamnet ---
+def vietnamnet_listing(keyword, page):
+    items = "".join(
+        f'<div class="horizontalPost"><div class="horizontalPost__main"><h3 class="horizontalPost__main-title">'
+        f'<a href="/{slug("vnn", keyword, page, i)}.html">{words(str(i), 10)}</a></h3></div></div>'
+        for i in listing_range(page, first_page=0))
+    return page_chrome(f'<div class="search-result">{items}</div>')
+
+def vietnamnet_article(name):
+    return page_chrome(
+        f'<div class="bread-crumb-detail__time">Thứ Bảy, {BASE_DATE:%d/%m/%Y - %H:%M}</div>'
+        f'<h1 class="content-detail-title">{words(name, 12)}</h1>'
+        f'<div id="maincontent" class="maincontent">{paragraphs(name)}<table><tr><td>Bảng</td></tr></table>'
+        f'<div class="inner-article">Tin liên quan</div><script>x();</script></div>')
+
+# --- CafeF ---
+def cafef_listing(keyword, page):
+    items = "".join(
+        f'<div class="item"><a href="/{slug("cafef", keyword, page, i)}.chn"><img src="/i.jpg"></a>'
+        f'<h3><a href="/{slug("cafef", keyword, page, i)}.chn">{words(str(i), 10)}</a></h3><p class="sapo">{words(str(i), 25)}</p></div>'
+        for i in listing_range(page))
+    return page_chrome(f'<div class="timeline list-bytags">{items}</div>')
+
+def cafef_article(name):
+    return page_chrome(
+        f'<h1 class="title">{words(name, 12)}</h1><span class="pdate">{BASE_DATE:%d-%m-%Y} - 08:00 AM</span>'
+        f'<div class="detail-content afcbc-body">{paragraphs(name)}</div>')
+
+# --- Vietstock ---
+def vietstock_token_page():
+    return page_chrome('<form><input name="__RequestVerificationToken" type="hidden" value="bench-token"></form>')
+
+def vietstock_listing(keyword, page):
+    rows = "".join(
+        f'<tr><td class="col-date">{item_date(page, i):%d/%m/%y %H:%M}</td>'
+        f'<td><a href="/2024/06/{slug("vst", keyword, page, i)}.htm">{words(str(i), 10)}</a></td></tr>'
+        for i in listing_range(page))
+    return f'<table class="table">{rows}</table>' if rows else ""
+
+def vietstock_article(name):
+    return page_chrome(f'<h1 class="article-title">{words(name, 12)}</h1><div id="vst_detail">{paragraphs(name)}</div>')
+
+# --- FireAnt (JSON API) ---
+def fireant_token_page():
+    data = {"props": {"pageProps": {"initialState": {"auth": {"accessToken": "bench-token"}}}}}
+    return page_chrome(f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>')
+
+def fireant_posts(keyword, offset):
+    page = offset // PER_PAGE
+    return json.dumps([
+        {"postID": int(hashlib.md5(slug("fa", keyword, page, i).encode()).hexdigest()[:8], 16),
+         "title": words(slug("fa", keyword, page, i), 10), "date": item_date(page, i, first_page=0).isoformat()}
+        for i in listing_range(page, first_page=0)])
+
+def fireant_post(post_id):
+    return json.dumps({"postID": post_id, "content": paragraphs(str(post_id), 10), "description": ""})
+
+def fixture_response(host, path, query=None, form=None):
+    """Serve a request the way the live site would; host/path are those of the original URL."""
+    query, form = query or {}, form or {}
+    html = "text/html; charset=utf-8"
+    if host == "timkiem.vnexpress.net":
+        return 200, html, vnexpress_listing(query.get("q", ""), int(query.get("page", 1)))
+    if host == "vnexpress.net":
+        return 200, html, vnexpress_article(path.strip("/"))
+    if host == "thanhnien.vn" and path.startswith("/timelinesearch/"):
+        _, _, keyword, page = path.split("/", 3)
+        return 200, html, thanhnien_listing(unquote(keyword), int(page.split(".")[0]))
+    if host == "thanhnien.vn":
+        return 200, html, thanhnien_article(path.strip("/"))
+    if host == "vneconomy.vn" and path == "/tim-kiem.html":
+        return 200, html, vneconomy_listing(query.get("Text", ""), int(query.get("page", 1)))
+    if host == "vneconomy.vn":
+        return 200, html, vneconomy_article(path.strip("/"))
+    if host == "vietnamnet.vn" and path.startswith("/tim-kiem-p"):
+        return 200, html, vietnamnet_listing(query.get("q", ""), int(path[len("/tim-kiem-p"):]))
+    if host == "vietnamnet.vn":
+        return 200, html, vietnamnet_article(path.strip("/"))
+    if host == "cafef.vn" and path == "/tim-kiem.chn":
+        return 200, html, cafef_listing(query.get("keywords", ""), int(query.get("page", 1)))
+    if host == "cafef.vn":
+        return 200, html, cafef_article(path.strip("/"))
+    if host == "finance.vietstock.vn" and path.endswith("/tin-tuc-su-kien.htm"):
+        return 200, html, vietstock_token_page()
+    if host == "finance.vietstock.vn" and path == "/View/PagingNewsContent":
+        return 200, html, vietstock_listing(form.get("code", ""), int(form.get("page", 1)))
+    if host == "finance.vietstock.vn":
+        return 200, html, vietstock_article(path.strip("/"))
+    if host == "fireant.vn" and path.startswith("/ma-chung-khoan/"):
+        return 200, html, fireant_token_page()
+    if host == "restv2.fireant.vn" and path == "/posts":
+        return 200, "application/json", fireant_posts(query.get("symbol", ""), int(query.get("offset", 0)))
+    if host == "restv2.fireant.vn" and path.startswith("/posts/"):
+        return 200, "application/json", fireant_post(int(path.rsplit("/", 1)[1]))
+    return 404, "text/plain", "not found"
+
+# One listing page and one article per source, as (spider source_name, kind, url, body)
+def sample_pages(keyword="FPT"):
+    return [
+        ("VnExpress", "page", "https://timkiem.vnexpress.net/", vnexpress_listing(keyword, 1)),
+        ("VnExpress", "article", "https://vnexpress.net/a.html", vnexpress_article("a")),
+        ("ThanhNien", "page", "https://thanhnien.vn/timelinesearch/", thanhnien_listing(keyword, 1)),
+        ("ThanhNien", "article", "https://thanhnien.vn/a.htm", thanhnien_article("a")),
+        ("VnEconomy", "page", "https://vneconomy.vn/tim-kiem.html", vneconomy_listing(keyword, 1)),
+        ("VnEconomy", "article", "https://vneconomy.vn/a.htm", vneconomy_article("a")),
+        ("Vietnamnet", "page", "https://vietnamnet.vn/tim-kiem-p0", vietnamnet_listing(keyword, 0)),
+        ("Vietnamnet", "article", "https://vietnamnet.vn/a.html", vietnamnet_article("a")),
+        ("CafeF", "page", "https://cafef.vn/tim-kiem.chn", cafef_listing(keyword, 1)),
+        ("CafeF", "article", "https://cafef.vn/a.chn", cafef_article("a")),
+        ("Vietstock", "auth", "https://finance.vietstock.vn/FPT/tin-tuc-su-kien.htm", vietstock_token_page()),
+        ("Vietstock", "page", "https://finance.vietstock.vn/View/PagingNewsContent", vietstock_listing(keyword, 1)),
+        ("Vietstock", "article", "https://finance.vietstock.vn/a.htm", vietstock_article("a")),
+        ("FireAnt", "auth", "https://fireant.vn/ma-chung-khoan/FPT", fireant_token_page()),
+        ("FireAnt", "page", "https://restv2.fireant.vn/posts", fireant_posts(keyword, 0)),
+        ("FireAnt", "article", "https://restv2.fireant.vn/posts/1", fireant_post(1)),
+    ]
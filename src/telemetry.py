@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from rate_limiter import host_source_map, source_for_host
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]: i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, as Prometheus' histogram_quantile roughly does
+        if not self.count: return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank: return bound
+        return float("inf")
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            yield ("+Inf" if bound == float("inf") else repr(bound)), total
+
+class SourceStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.status = Counter()
+        self.bytes = 0
+        self.retries = 0
+        self.articles = 0
+        self.parse = defaultdict(lambda: Histogram(PARSE_BUCKETS))
+
+class CrawlTelemetry:
+    """Per-source request/parse metrics, flushed every few seconds to a JSON snapshot and a
+    Prometheus text file (point node_exporter's textfile collector at the folder to scrape it)."""
+
+    def __init__(self, folder="data/telemetry", host_sources=None, flush_seconds=15, memo=None, scheduler=None, connections=None):
+        self.folder = folder
+        self.host_sources = host_sources or {}
+        self.flush_seconds = flush_seconds
+        self.memo = memo
+        self.scheduler = scheduler
+        self.connections = connections
+        self.started = time.time()
+        self.sources = defaultdict(SourceStats)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        os.makedirs(folder, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config, spider_classes, memo=None, scheduler=None, connections=None):
+        return cls(config.get("TELEMETRY_DIR", "data/telemetry"), host_source_map(spider_classes),
+                   config.get("TELEMETRY_SECONDS", 15), memo, scheduler, connections)
+
+    def start(self):
+        if self.flush_seconds:
+            self.thread = threading.Thread(target=self.flush_loop, name="telemetry-flush", daemon=True)
+            self.thread.start()
+        return self
+
+    def flush_loop(self):
+        while not self.stopped.wait(self.flush_seconds):
+            self.flush()
+
+    def record_request(self, url, status, latency=None, nbytes=0):
+        source = source_for_host(self.host_sources, url)
+        with self.lock:
+            s = self.sources[source]
+            s.status[str(status)] += 1
+            s.bytes += nbytes
+            if latency is not None: s.latency.observe(latency)
+
+    def record_retry(self, url):
+        source = source_for_host(self.host_sources, url)
+        with self.lock:
+            self.sources[source].retries += 1
+
+    def record_parse(self, source, kind, seconds):
+        with self.lock:
+            self.sources[source].parse[kind].observe(seconds)
+
+    def record_article(self, source):
+        with self.lock:
+            self.sources[source].articles += 1
+
+    def snapshot(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        with self.lock:
+            sources = {}
+            for name, s in sorted(self.sources.items()):
+                requests = sum(s.status.values())
+                errors = sum(n for code, n in s.status.items() if code not in ("200", "304", "cache"))
+                sources[name] = {
+                    "requests": requests,
+                    "status": dict(s.status),
+                    "error_rate": round(errors / requests, 4) if requests else 0.0,
+                    "bytes": s.bytes,
+                    "retries": s.retries,
+                    "latency_p50": s.latency.quantile(0.5),
+                    "latency_p95": s.latency.quantile(0.95),
+                    "latency_mean": round(s.latency.sum / s.latency.count, 4) if s.latency.count else 0.0,
+                    "parse_mean_ms": {k: round(1000 * h.sum / h.count, 3) for k, h in s.parse.items() if h.count},
+                    "articles": s.articles,
+                    "articles_per_sec": round(s.articles / elapsed, 3),
+                }
+        snap = {
+            "updated": time.time(),
+            "elapsed_seconds": round(elapsed, 1),
+            "articles": sum(s["articles"] for s in sources.values()),
+            "articles_per_sec": round(sum(s["articles"] for s in sources.values()) / elapsed, 3),
+            "sources": sources,
+        }
+        if self.memo:
+            total = self.memo.fetches + self.memo.hits
+            snap["dedup"] = {"fetches": self.memo.fetches, "hits": self.memo.hits,
+                             "hit_rate": round(self.memo.hits / total, 4) if total else 0.0}
+        if self.connections:
+            snap["connections"] = self.connections.stats.snapshot()
+        if self.scheduler:
+            snap["scheduler"] = dict(self.scheduler.stats, depth=self.scheduler.depth())
+        return snap
+
+    def prometheus(self):
+        lines = []
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            items = sorted(self.sources.items())
+            metric("crawl_request_duration_seconds", "histogram", "HTTP request latency per source")
+            for name, s in items:
+                for le, n in s.latency.cumulative():
+                    lines.append(f'crawl_request_duration_seconds_bucket{{source="{name}",le="{le}"}} {n}')
+                lines.append(f'crawl_request_duration_seconds_sum{{source="{name}"}} {s.latency.sum:.6f}')
+                lines.append(f'crawl_request_duration_seconds_count{{source="{name}"}} {s.latency.count}')
+            metric("crawl_requests_total", "counter", "HTTP requests per source and status (error = timeout/connection failure)")
+            for name, s in items:
+                for code, n in sorted(s.status.items()):
+                    lines.append(f'crawl_requests_total{{source="{name}",status="{code}"}} {n}')
+            metric("crawl_response_bytes_total", "counter", "Response body bytes downloaded per source")
+            lines += [f'crawl_response_bytes_total{{source="{name}"}} {s.bytes}' for name, s in items]
+            metric("crawl_retries_total", "counter", "Request retries per source")
+            lines += [f'crawl_retries_total{{source="{name}"}} {s.retries}' for name, s in items]
+            metric("crawl_parse_duration_seconds", "histogram", "Extractor time per source and page kind")
+            for name, s in items:
+                for kind, h in sorted(s.parse.items()):
+                    for le, n in h.cumulative():
+                        lines.append(f'crawl_parse_duration_seconds_bucket{{source="{name}",kind="{kind}",le="{le}"}} {n}')
+                    lines.append(f'crawl_parse_duration_seconds_sum{{source="{name}",kind="{kind}"}} {h.sum:.6f}')
+                    lines.append(f'crawl_parse_duration_seconds_count{{source="{name}",kind="{kind}"}} {h.count}')
+            metric("crawl_articles_total", "counter", "Articles stored per source")
+            lines += [f'crawl_articles_total{{source="{name}"}} {s.articles}' for name, s in items]
+            articles = sum(s.articles for _, s in items)
+
+        metric("crawl_articles_per_second", "gauge", "Articles stored per second since the run started")
+        lines.append(f"crawl_articles_per_second {articles / max(time.time() - self.started, 1e-9):.3f}")
+        if self.memo:
+            total = self.memo.fetches + self.memo.hits
+            metric("crawl_dedup_hit_ratio", "gauge", "Share of article claims served by the shared memo")
+            lines.append(f"crawl_dedup_hit_ratio {self.memo.hits / total if total else 0.0:.4f}")
+        if self.connections:
+            stats = self.connections.stats.snapshot()
+            metric("crawl_http_requests_total", "counter", "Requests sent over pooled connections per source")
+            lines += [f'crawl_http_requests_total{{source="{name}"}} {s["requests"]}' for name, s in stats.items()]
+            metric("crawl_connections_opened_total", "counter", "New connections (TCP + TLS handshakes) per source")
+            lines += [f'crawl_connections_opened_total{{source="{name}"}} {s["new_connections"]}' for name, s in stats.items()]
+        return "\n".join(lines) + "\n"
+
+    def write_atomic(self, name, text):
+        path = os.path.join(self.folder, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+
+    def flush(self):
+        self.write_atomic("crawl_metrics.json", json.dumps(self.snapshot(), ensure_ascii=False, indent=2))
+        self.write_atomic("crawl_metrics.prom", self.prometheus())
+
+    def report(self):
+        snap = self.snapshot()
+        print(f"{'source':<11} {'requests':>8} {'errors':>7} {'retries':>7} {'p50 s':>6} {'p95 s':>6} {'MB':>7} {'articles/s':>10}")
+        for name, s in snap["sources"].items():
+            print(f"{name:<11} {s['requests']:>8} {s['error_rate']:>7.1%} {s['retries']:>7} {s['latency_p50']:>6} "
+                  f"{s['latency_p95']:>6} {s['bytes'] / 1e6:>7.1f} {s['articles_per_sec']:>10}")
+
+    def close(self):
+        self.stopped.set()
+        if self.thread: self.thread.join()
+        self.flush()
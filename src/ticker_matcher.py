@@ -0,0 +1,99 @@
+"""Aho-Corasick dictionary matcher: every ticker-map key found in one pass over the text.
+
+    matcher = KeywordMatcher({"hòa phát": "HPG", "tập đoàn hòa phát": "HPG", "fpt": "FPT"})
+    matcher.find("Tập đoàn Hòa Phát và FPT ...")  # [(0, 17, "tập đoàn hòa phát", "HPG"), (21, 24, "fpt", "FPT")]
+
+Matching is case-insensitive on NFC text, a hit must sit on word boundaries ("vic" does not match
+inside "victory"), and overlapping hits resolve leftmost-longest, so "ngân hàng tiên phong" wins over
+the "tiên phong" inside it. Uses pyahocorasick (C) when installed, else a pure-Python automaton.
+"""
+import unicodedata
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text).lower()
+
+def is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+class PyAutomaton:
+    """Goto/fail/output tables over characters; iter() yields (end index, key) like pyahocorasick."""
+
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for key in keys:
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(key)
+        # Breadth-first: a state's failure link is the longest proper suffix that is also a prefix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for key in out[state]:
+                yield i, key
+
+class KeywordMatcher:
+    def __init__(self, mapping):
+        """mapping: {dictionary key: value}; keys are matched case-insensitively."""
+        self.values = {}
+        for key, value in mapping.items():
+            k = normalize(key).strip()
+            if k: self.values.setdefault(k, value)
+        if ahocorasick:
+            self.automaton = ahocorasick.Automaton()
+            for key in self.values:
+                self.automaton.add_word(key, key)
+            self.automaton.make_automaton()
+        else:
+            self.automaton = PyAutomaton(self.values)
+
+    def find(self, text):
+        """Non-overlapping (start, end, key, value) hits in text order, longest first among overlaps."""
+        if not text or not self.values: return []
+        text = normalize(text)
+        hits = []
+        for end, key in self.automaton.iter(text):
+            start = end - len(key) + 1
+            if start > 0 and is_word_char(text[start - 1]) and is_word_char(key[0]): continue
+            if end + 1 < len(text) and is_word_char(text[end + 1]) and is_word_char(key[-1]): continue
+            hits.append((start, end + 1, key))
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        result, covered = [], 0
+        for start, end, key in hits:
+            if start < covered: continue
+            result.append((start, end, key, self.values[key]))
+            covered = end
+        return result
+
+    def values_in(self, text):
+        return {value for _, _, _, value in self.find(text)}
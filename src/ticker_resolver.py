@@ -0,0 +1,198 @@
+"""Entity name -> ticker resolution for NER.map_to_tickers, with every index built once.
+
+    resolver = TickerResolver(TICKER_MAP, ALIASES)
+    resolver.resolve("Ngân hàng TMCP Tiên Phong")   # ["TPB"]
+
+Rules, in order (the first three stop at their first hit):
+  0. alias (lower-cased)              -> dict lookup; 'None' means "known, not listed"
+  1. exact name (lower-cased, then NFC + collapsed spaces)
+  2. substring, entities of 10+ chars against names of 15+ chars, either direction;
+     the earliest name in map order wins, as with the old linear scan
+  3. fuzzy token_sort_ratio >= threshold, plus 4. the entity itself being a ticker
+
+Fuzzy results are memoized per entity string in a bounded LRU (optionally saved to disk between
+runs); prefetch() fills it for a whole batch of articles with one rapidfuzz cdist call per chunk.
+"""
+import hashlib
+import json
+import os
+import unicodedata
+from collections import OrderedDict
+
+from rapidfuzz import process, fuzz
+
+from ticker_matcher import ahocorasick, PyAutomaton
+
+SUBSTRING_MIN_ENTITY = 10
+SUBSTRING_MIN_NAME = 15
+SEPARATOR = "\n"  # never inside an entity, so a hit in the haystack can't span two names
+MISSING = object()
+
+def normalize_name(text):
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+class TickerResolver:
+    def __init__(self, ticker_map, aliases=None, memo_size=200000):
+        self.ticker_map = ticker_map
+        self.aliases = {k.lower(): v for k, v in (aliases or {}).items()}
+        self.company_names = list(ticker_map)
+        self.tickers = set(ticker_map.values())
+        # entity -> (best name or None, score, cutoff it was searched with); LRU order, oldest first
+        self.memo = OrderedDict()
+        self.memo_size = memo_size
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.fingerprint = hashlib.md5(SEPARATOR.join(self.company_names).encode("utf-8")).hexdigest()
+        self.exact = {}
+        self.normalized = {}
+        for name, ticker in ticker_map.items():
+            self.exact.setdefault(name.lower(), (name, ticker))
+            self.normalized.setdefault(normalize_name(name), (name, ticker))
+
+        # Names long enough for the substring rule, in map order
+        self.long_names = [(name.lower(), name) for name in ticker_map if len(name) >= SUBSTRING_MIN_NAME]
+        # "entity in name": one C-speed str.find over all long names joined; offsets map a hit back to its name
+        self.haystack = SEPARATOR.join(lower for lower, _ in self.long_names)
+        self.offsets = []
+        pos = 0
+        for lower, _ in self.long_names:
+            self.offsets.append(pos)
+            pos += len(lower) + len(SEPARATOR)
+        # "name in entity": an automaton over the long names finds every one inside the entity in one pass
+        order = {}
+        for i, (lower, _) in enumerate(self.long_names):
+            order.setdefault(lower, i)
+        self.name_order = order
+        if ahocorasick:
+            self.automaton = ahocorasick.Automaton()
+            for lower in order:
+                self.automaton.add_word(lower, lower)
+            if order: self.automaton.make_automaton()
+        else:
+            self.automaton = PyAutomaton(order)
+
+    def name_at(self, pos):
+        lo, hi = 0, len(self.offsets) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.offsets[mid] <= pos: lo = mid
+            else: hi = mid - 1
+        return lo
+
+    def substring_match(self, entity_lower):
+        if not self.long_names or SEPARATOR in entity_lower: return None
+        best = None
+        pos = self.haystack.find(entity_lower)
+        if pos >= 0: best = self.name_at(pos)
+        if len(entity_lower) >= SUBSTRING_MIN_NAME:
+            for _, lower in self.automaton.iter(entity_lower):
+                i = self.name_order[lower]
+                if best is None or i < best: best = i
+        return None if best is None else self.long_names[best][1]
+
+    def rule_match(self, entity, debug=False):
+        """Tickers from rules 0-2, or None when the entity falls through to the fuzzy rule."""
+        entity_lower = entity.lower().strip()
+
+        if entity_lower in self.aliases:
+            ticker = self.aliases[entity_lower]
+            if debug: print(f"    '{entity}' -> ALIAS {ticker}")
+            return [ticker] if ticker and ticker != 'None' else []
+
+        hit = self.exact.get(entity_lower) or self.normalized.get(normalize_name(entity))
+        if hit:
+            if debug: print(f"    '{entity}' -> '{hit[0]}' (EXACT) -> {hit[1]}")
+            return [hit[1]]
+
+        if len(entity) >= SUBSTRING_MIN_ENTITY:
+            name = self.substring_match(entity_lower)
+            if name:
+                if debug: print(f"    '{entity}' -> '{name}' (SUBSTRING) -> {self.ticker_map[name]}")
+                return [self.ticker_map[name]]
+        return None
+
+    def remember(self, entity, match):
+        self.memo[entity] = match
+        self.memo.move_to_end(entity)
+        if len(self.memo) > self.memo_size: self.memo.popitem(last=False)
+
+    def memoized(self, entity, cutoff):
+        # A miss searched with a higher cutoff says nothing about a lower one
+        match = self.memo.get(entity)
+        if match is None or (match[0] is None and match[2] > cutoff): return MISSING
+        self.memo.move_to_end(entity)
+        return match
+
+    def fuzzy(self, entity, cutoff=0):
+        """(best company name or None, score) for entity, memoized."""
+        match = self.memoized(entity, cutoff)
+        if match is not MISSING:
+            self.memo_hits += 1
+            return match[:2]
+        self.memo_misses += 1
+        found = process.extractOne(entity, self.company_names, scorer=fuzz.token_sort_ratio, score_cutoff=cutoff)
+        match = (found[0], found[1], cutoff) if found else (None, 0.0, cutoff)
+        self.remember(entity, match)
+        return match[:2]
+
+    def prefetch(self, entities, threshold=90, batch_size=1000):
+        """Fuzzy-match every distinct, not yet memoized entity that rules 0-2 leave unresolved, in
+        one cdist call per batch_size entities (choices preprocessed once, all cores). Returns how many."""
+        pending, seen = [], set()
+        for entity in entities:
+            if entity in seen: continue
+            seen.add(entity)
+            if entity in self.memo and self.memoized(entity, threshold) is not MISSING: continue
+            if self.rule_match(entity) is None: pending.append(entity)
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            scores = process.cdist(chunk, self.company_names, scorer=fuzz.token_sort_ratio,
+                                   score_cutoff=threshold, workers=-1)
+            # argmax takes the first of equal scores, the same tie-break as extractOne
+            for entity, row, j in zip(chunk, scores, scores.argmax(axis=1)):
+                score = float(row[j])
+                self.remember(entity, (self.company_names[j], score, threshold) if score and score >= threshold
+                              else (None, 0.0, threshold))
+        return len(pending)
+
+    def resolve(self, entity, threshold=90, debug=False):
+        """Tickers an entity refers to (possibly the article's own ticker; the caller drops it)."""
+        found = self.rule_match(entity, debug)
+        if found is not None: return found
+
+        found = []
+        best_match_name, score = self.fuzzy(entity, min(threshold, 70) if debug else threshold)
+        if best_match_name:
+            if debug and score >= 70:
+                print(f"    '{entity}' -> '{best_match_name}' (fuzzy: {score:.1f})")
+            if score >= threshold:
+                found.append(self.ticker_map[best_match_name])
+
+        if entity.upper() in self.tickers:
+            if debug: print(f"    '{entity}' -> TICKER {entity.upper()}")
+            found.append(entity.upper())
+        return found
+
+    def load_memo(self, path):
+        """Reuse a memo saved by an earlier run, unless the ticker map changed since."""
+        if not path or not os.path.exists(path): return 0
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("fingerprint") != self.fingerprint: return 0
+        for entity, match in data.get("entries", []):
+            self.remember(entity, tuple(match))
+        return len(self.memo)
+
+    def save_memo(self, path):
+        if not path: return
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": [[e, list(m)] for e, m in self.memo.items()]},
+                      f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def report(self):
+        total = self.memo_hits + self.memo_misses
+        rate = 100 * self.memo_hits / total if total else 0
+        print(f"Fuzzy memo: {len(self.memo)} entities, {self.memo_hits} hits / {self.memo_misses} misses ({rate:.1f}% hit rate)")
@@ -0,0 +1,102 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+
+def jwt_expiry(token):
+    # exp claim of a JWT, without verifying it; None when the token is opaque
+    try:
+        payload = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"])
+    except Exception:
+        return None
+
+class TokenProvider:
+    """Auth credentials shared by every spider of a run, one per source.
+
+    A credential is reused until its TTL (or its own "expires_at") runs out. Only one caller
+    refreshes a source at a time; the others wait for and reuse its result (single flight).
+    refresh() after a 401/403 only refetches if nobody replaced the stale credential meanwhile.
+    """
+
+    def __init__(self, ttl=1800, margin=60):
+        self.ttl = ttl
+        self.margin = margin
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.source_locks = {}
+        self.async_locks = {}
+        self.stats = {"fetches": 0, "reused": 0, "refreshes": 0}
+
+    def valid(self, source):
+        entry = self.entries.get(source)
+        if entry and entry["expires"] - self.margin > time.time(): return entry["auth"]
+        return None
+
+    def store(self, source, auth):
+        if not auth: return None
+        expires = auth.get("expires_at") or time.time() + self.ttl
+        self.entries[source] = {"auth": auth, "expires": expires}
+        return auth
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def source_lock(self, source):
+        with self.lock:
+            return self.source_locks.setdefault(source, threading.Lock())
+
+    def async_lock(self, source):
+        # asyncio locks belong to one event loop; each run_plan (asyncio.run) gets a new one, and one
+        # TokenProvider can outlive several of them (benchmarks and scripts calling run_plan repeatedly)
+        key = (source, id(asyncio.get_running_loop()))
+        with self.lock:
+            return self.async_locks.setdefault(key, asyncio.Lock())
+
+    def get(self, source, fetch):
+        auth = self.valid(source)
+        if auth:
+            self.count("reused")
+            return auth
+        with self.source_lock(source):
+            auth = self.valid(source)
+            if auth:
+                self.count("reused")
+                return auth
+            self.count("fetches")
+            return self.store(source, fetch())
+
+    def refresh(self, source, stale, fetch):
+        with self.source_lock(source):
+            entry = self.entries.get(source)
+            if entry and entry["auth"] is not stale and self.valid(source): return entry["auth"]
+            self.entries.pop(source, None)
+            self.count("refreshes")
+            return self.store(source, fetch())
+
+    async def get_async(self, source, fetch):
+        auth = self.valid(source)
+        if auth:
+            self.count("reused")
+            return auth
+        async with self.async_lock(source):
+            auth = self.valid(source)
+            if auth:
+                self.count("reused")
+                return auth
+            self.count("fetches")
+            return self.store(source, await fetch())
+
+    async def refresh_async(self, source, stale, fetch):
+        async with self.async_lock(source):
+            entry = self.entries.get(source)
+            if entry and entry["auth"] is not stale and self.valid(source): return entry["auth"]
+            self.entries.pop(source, None)
+            self.count("refreshes")
+            return self.store(source, await fetch())
+
+    def report(self):
+        s = self.stats
+        print(f"Auth tokens: {s['fetches']} fetched, {s['reused']} reused, {s['refreshes']} refreshed after 401/403")
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+import time
+
+class UrlFrontier:
+    """SQLite index of every article URL ever stored, plus a publish-date high-water mark per (source, keyword).
+
+    Watermarks only move forward in close(), after the run's results are saved, so a crashed
+    run never hides articles it did not finish fetching.
+
+    Writes are batched commit_every at a time, and the batch holds the database's write lock until it
+    commits; processes sharing one file (distributed workers) use commit_every=1.
+    """
+
+    def __init__(self, path="data/crawl_frontier.db", commit_every=200, timeout=60):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.run_id = str(time.time_ns())
+        self.commit_every = commit_every
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS urls (
+            url TEXT PRIMARY KEY, source TEXT, published_date TEXT, run_id TEXT)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS watermarks (
+            source TEXT, keyword TEXT, published_date TEXT, PRIMARY KEY (source, keyword))""")
+        self.conn.commit()
+        self.watermarks = {(s, k): d for s, k, d in self.conn.execute("SELECT source, keyword, published_date FROM watermarks")}
+        self.new_watermarks = {}
+        self.held = set()
+
+    def seen_before(self, url):
+        # Only URLs stored by an earlier run count; this run's own URLs are handled in memory
+        with self.lock:
+            row = self.conn.execute("SELECT run_id FROM urls WHERE url = ?", (url,)).fetchone()
+        return row is not None and row[0] != self.run_id
+
+    def mark(self, url, source, published_date):
+        with self.lock:
+            # Take the write lock up front: upgrading a read lock fails at once, without waiting out the timeout
+            if not self.conn.in_transaction: self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?)", (url, source, published_date, self.run_id))
+            self.pending += 1
+            if self.pending >= self.commit_every:
+                self.conn.commit()
+                self.pending = 0
+
+    def watermark(self, source, keyword):
+        return self.watermarks.get((source, keyword))
+
+    def advance_watermark(self, source, keyword, published_date):
+        if not published_date: return
+        with self.lock:
+            key = (source, keyword)
+            if published_date > self.new_watermarks.get(key, ""):
+                self.new_watermarks[key] = published_date
+
+    def hold_watermark(self, source, keyword):
+        """Keep (source, keyword)'s watermark where it is: this run did not reach the end of its listing."""
+        with self.lock:
+            self.held.add((source, keyword))
+
+    def close(self):
+        with self.lock:
+            for (source, keyword), date in self.new_watermarks.items():
+                if (source, keyword) in self.held: continue
+                if date > (self.watermarks.get((source, keyword)) or ""):
+                    self.watermarks[(source, keyword)] = date
+                    # MAX(): another process sharing the file may have stored a newer one meanwhile
+                    self.conn.execute(
+                        """INSERT INTO watermarks VALUES (?, ?, ?) ON CONFLICT (source, keyword)
+                           DO UPDATE SET published_date = MAX(published_date, excluded.published_date)""", (source, keyword, date))
+            self.new_watermarks = {}
+            self.conn.commit()
+            self.conn.close()